@@ -0,0 +1,131 @@
+"""
+Microbenchmark del scorer de ventanas CURP de RobustExtractor
+
+Uso:
+    python benchmark_curp_scorer.py [export.csv ...] [--chars N] [--count N]
+                                    [--repeat N] [--seed S]
+
+Compara el recorrido original de find_curp_fuzzy (score_curp_candidate por
+cada offset) contra RobustExtractor.window_scores, que puntúa todas las
+ventanas de una vez con NumPy. Los textos son los TEXTO_CRUDO del export de
+REGISTRO_MASTER más textos sintéticos de ruido OCR con y sin CURP. Antes de
+medir verifica que ambas versiones den exactamente el mismo score por
+offset y la misma CURP; si alguna difiere termina con código 1.
+"""
+import argparse
+import logging
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_text_replay import DEFAULT_EXPORT, iter_entries
+from src.robust_extractor import RobustExtractor
+
+# Ruido típico de Tesseract sobre una credencial
+NOISE_CHARS = string.ascii_uppercase + string.digits + ' \n.,:;-/|()$' + 'ÑÁÉÍÓÚ°²'
+
+
+def scalar_scores(text):
+    """Score de cada offset con el recorrido original (una llamada por ventana)"""
+    return [RobustExtractor.score_curp_candidate(text[i:i+18])[0] for i in range(len(text) - 17)]
+
+
+def scalar_best(text):
+    """Mejor ventana como la buscaba find_curp_fuzzy antes de vectorizar"""
+    best_curp = None
+    best_score = 0
+    for i in range(len(text) - 17):
+        score, corrected = RobustExtractor.score_curp_candidate(text[i:i+18])
+        if score > 0.8 and score > best_score:
+            best_score = score
+            best_curp = corrected
+    return best_curp
+
+
+def vector_best(text):
+    scores = RobustExtractor.window_scores(text)
+    if not scores.size:
+        return None
+    best = int(scores.argmax())
+    if scores[best] <= 0.8:
+        return None
+    return RobustExtractor.score_curp_candidate(text[best:best+18])[1]
+
+
+def synthetic_texts(count, chars, seed):
+    """Textos de ruido OCR, la mitad con una CURP (con errores típicos) insertada"""
+    rng = random.Random(seed)
+    texts = []
+    for n in range(count):
+        text = ''.join(rng.choice(NOISE_CHARS) for _ in range(chars))
+        if n % 2 == 0:
+            curp = 'GOMC850312HDFRRL0' + rng.choice('0123456789')
+            curp = ''.join(RobustExtractor.COMMON_SUBS.get(c, c) if rng.random() < 0.1 else c for c in curp)
+            pos = rng.randrange(chars)
+            text = text[:pos] + curp + text[pos:]
+        texts.append(text)
+    return texts
+
+
+def despace(text):
+    return ''.join(text.upper().split())
+
+
+def timed(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('exports', nargs='*', default=[DEFAULT_EXPORT])
+    parser.add_argument('--chars', type=int, default=1500, help="Largo de los textos sintéticos")
+    parser.add_argument('--count', type=int, default=200, help="Textos sintéticos")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    real = []
+    for path in args.exports:
+        if Path(path).exists():
+            real += [despace(entry['text']) for entry in iter_entries(path)]
+    synthetic = [despace(text) for text in synthetic_texts(args.count, args.chars, args.seed)]
+    sets = [('TEXTO_CRUDO', real), (f'sintético {args.chars} chars', synthetic)]
+
+    # Equivalencia exacta antes de medir
+    mismatches = 0
+    for _, texts in sets:
+        for text in texts:
+            if list(RobustExtractor.window_scores(text)) != scalar_scores(text) or \
+                    vector_best(text) != scalar_best(text):
+                mismatches += 1
+    total = sum(len(texts) for _, texts in sets)
+    print("=" * 72)
+    print(f"🔬 CURP WINDOW SCORER ({total} textos, {mismatches} con resultado distinto)")
+    print("=" * 72)
+    if mismatches:
+        print("❌ El scorer vectorizado no coincide con el original")
+        sys.exit(1)
+
+    print(f"{'Textos':<26} {'n':>5} {'escalar µs':>12} {'numpy µs':>10} {'speedup':>9}")
+    for name, texts in sets:
+        if not texts:
+            continue
+        scalar = timed(scalar_best, texts, args.repeat)
+        vector = timed(vector_best, texts, args.repeat)
+        print(f"{name:<26} {len(texts):>5} {scalar * 1e6:>12.1f} {vector * 1e6:>10.1f} "
+              f"{scalar / vector:>8.1f}x")
+    print("=" * 72)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark de validación masiva de CURPs (validate_curps)
+
+Uso:
+    python benchmark_curp_validation.py [--count N] [--unique N] [--repeat N] [--seed S]
+
+Genera CURPs sintéticas (válidas y con los errores que aparecen en el Sheet:
+formato, fecha, dígito verificador, vacías, minúsculas/espacios, Ñ y dígitos
+Unicode), verifica que validate_curps dé el mismo resultado que
+validate_curp_complete para cada una y mide CURPs/segundo de ambas en un
+solo núcleo. Termina con código 1 si los resultados difieren.
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import CURP_STATE_CODES
+from src.curp_validator import (
+    REASON_CHECK_DIGIT, REASON_DATE, REASON_EMPTY, REASON_FORMAT, REASON_OK,
+    calculate_curp_check_digit, validate_curp_complete, validate_curps
+)
+
+TARGET_PER_SECOND = 1_000_000
+
+
+def random_curp(rng):
+    """CURP sintética con fecha, entidad y dígito verificador válidos"""
+    yy = rng.randrange(100)
+    curp17 = (
+        ''.join(rng.choice(string.ascii_uppercase) for _ in range(4))
+        + f"{yy:02d}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+        + rng.choice('HM') + rng.choice(CURP_STATE_CODES)
+        + ''.join(rng.choice(string.ascii_uppercase) for _ in range(3))
+        + rng.choice(string.digits if yy > 30 else string.ascii_uppercase)
+    )
+    return curp17 + calculate_curp_check_digit(curp17)
+
+
+def corrupt(curp, rng):
+    """Variante con alguno de los errores típicos (o la misma CURP)"""
+    kind = rng.randrange(10)
+    if kind == 0:
+        return curp[:rng.randrange(18)]
+    if kind == 1:
+        return curp[:8] + rng.choice(['13', '00', '31']) + curp[10:]
+    if kind == 2:
+        return curp[:17] + str((int(curp[17]) + rng.randint(1, 9)) % 10)
+    if kind == 3:
+        return rng.choice([None, '', '   ', 'X'])
+    if kind == 4:
+        return f"  {curp.lower()} "
+    if kind == 5:
+        return curp[:rng.randrange(4)] + 'Ñ' + curp[rng.randrange(4) + 1:]
+    if kind == 6:
+        return curp[:5] + '٣' + curp[6:]
+    if kind == 7:
+        return curp + rng.choice(string.ascii_uppercase)
+    return curp
+
+
+def generate(count, unique, seed):
+    rng = random.Random(seed)
+    base = [corrupt(random_curp(rng), rng) for _ in range(unique)]
+    return base, (base * (count // unique + 1))[:count]
+
+
+def reason_of(message):
+    """Código REASON_* equivalente a un mensaje de validate_curp_complete"""
+    for reason, prefix in ((REASON_OK, "CURP válida"), (REASON_EMPTY, "CURP vacía"),
+                           (REASON_FORMAT, "Formato"), (REASON_DATE, "Fecha")):
+        if message.startswith(prefix):
+            return reason
+    return REASON_CHECK_DIGIT
+
+
+def parity(curps):
+    """Índices donde validate_curps difiere de validate_curp_complete"""
+    bulk = validate_curps(curps)
+    mismatches = []
+    for i, curp in enumerate(curps):
+        valid, confidence, message = validate_curp_complete(curp)
+        if (bulk.valid[i] != valid or abs(bulk.confidence[i] - confidence) > 1e-6
+                or bulk.reason[i] != reason_of(message)):
+            mismatches.append(i)
+    return mismatches
+
+
+def best_rate(func, curps, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(curps)
+        best = min(best, time.perf_counter() - start)
+    return len(curps) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000, help="CURPs por lote de validate_curps")
+    parser.add_argument('--unique', type=int, default=50_000, help="CURPs distintas generadas")
+    parser.add_argument('--repeat', type=int, default=3, help="Corridas por medición (se toma la mejor)")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    base, curps = generate(args.count, args.unique, args.seed)
+
+    mismatches = parity(base)
+    valid = int(validate_curps(base).valid.sum())
+    print("=" * 72)
+    print(f"🪪 CURP VALIDATION ({len(base)} distintas, {valid} válidas, "
+          f"{len(mismatches)} con resultado distinto)")
+    print("=" * 72)
+    if mismatches:
+        for i in mismatches[:10]:
+            print(f"   {base[i]!r}: {validate_curp_complete(base[i])}")
+        print("❌ validate_curps no coincide con validate_curp_complete")
+        sys.exit(1)
+
+    scalar = best_rate(lambda items: [validate_curp_complete(c) for c in items], base, args.repeat)
+    bulk = best_rate(validate_curps, curps, args.repeat)
+    bulk_state = best_rate(lambda items: validate_curps(items, check_state=True), curps, args.repeat)
+    print(f"validate_curp_complete      {scalar:>14,.0f} CURPs/s")
+    print(f"validate_curps              {bulk:>14,.0f} CURPs/s  ({bulk / scalar:.1f}x, lote de {len(curps):,})")
+    print(f"validate_curps check_state  {bulk_state:>14,.0f} CURPs/s")
+    print("=" * 72)
+    print(("✅" if bulk >= TARGET_PER_SECOND else "⚠️ ") + f" objetivo {TARGET_PER_SECOND:,} CURPs/s")
+
+
+if __name__ == '__main__':
+    main()
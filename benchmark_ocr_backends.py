@@ -0,0 +1,93 @@
+"""
+Benchmark de latencia: backend pytesseract (CLI) vs tesserocr (en proceso)
+
+Uso:
+    python benchmark_ocr_backends.py [imagen ...] [--runs N]
+
+Mide las mismas llamadas que hace OCREngine.process_file (zona CURP con
+psm 6 y página completa) sobre la imagen ya preprocesada.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import TESSERACT_CONFIG
+from src.ocr_backends import BACKENDS
+from src.ocr_engine import OCREngine, ZONAL_TESSERACT_CONFIG
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def time_calls(backend, crops, full_images, runs):
+    """Retorna latencias (ms) por tipo de llamada"""
+    timings = {'zona': [], 'pagina': []}
+    for _ in range(runs):
+        for crop in crops:
+            start = time.perf_counter()
+            backend.image_to_string(crop, ZONAL_TESSERACT_CONFIG)
+            timings['zona'].append((time.perf_counter() - start) * 1000)
+        for image in full_images:
+            start = time.perf_counter()
+            backend.image_to_string(image, TESSERACT_CONFIG)
+            timings['pagina'].append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('images', nargs='*', default=['test_ine.jpg'])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    engine = OCREngine()
+    crops, full_images = [], []
+    for path in args.images:
+        processed = engine.preprocess_image(path)
+        if processed is None:
+            print(f"❌ No se pudo preprocesar {path}")
+            sys.exit(1)
+        crops.append(engine.crop_zone(processed, 'CURP'))
+        full_images.append(processed)
+
+    print("=" * 80)
+    print(f"⏱️  BENCHMARK BACKENDS OCR ({len(args.images)} imágenes x {args.runs} corridas)")
+    print("=" * 80)
+
+    results = {}
+    for name, backend_cls in BACKENDS.items():
+        try:
+            backend = backend_cls()
+        except ImportError as e:
+            print(f"\n⚠️  {name}: no disponible ({e})")
+            continue
+
+        # Calentamiento (carga de modelo) fuera de la medición
+        backend.image_to_string(crops[0], ZONAL_TESSERACT_CONFIG)
+        results[name] = time_calls(backend, crops, full_images, args.runs)
+
+        print(f"\n🔧 {name}")
+        for kind, values in results[name].items():
+            print(f"   {kind:<7} mean={statistics.mean(values):8.1f} ms  "
+                  f"p50={percentile(values, 50):8.1f} ms  p95={percentile(values, 95):8.1f} ms")
+
+    if len(results) == 2:
+        base = results['pytesseract']
+        fast = results['tesserocr']
+        print("\n📊 Speedup tesserocr vs pytesseract:")
+        for kind in base:
+            ratio = statistics.mean(base[kind]) / statistics.mean(fast[kind])
+            print(f"   {kind:<7} x{ratio:.2f}")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == '__main__':
+    main()
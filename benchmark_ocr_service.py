@@ -0,0 +1,106 @@
+"""
+Prueba de carga del servicio HTTP de OCR (src/ocr_service.py)
+
+Uso:
+    python benchmark_ocr_service.py [imagen ...] [--requests N] [--concurrency C]
+                                    [--url http://host:port] [--unique]
+
+Sin --url levanta el servicio en este mismo proceso (puerto libre), sin
+credenciales ni servicios externos. Con --unique cada request lleva bytes
+distintos (se agrega un sufijo después de la imagen) para no medir la caché OCR.
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import OCR_SERVICE_WORKERS, OCR_SERVICE_QUEUE_SIZE, OCR_SERVICE_TIMEOUT
+from src.ocr_service import build_server
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def post_image(url, body):
+    """Retorna (código HTTP, latencia en ms)"""
+    request = urllib.request.Request(
+        f"{url}/ocr", data=body, method='POST',
+        headers={'Content-Type': 'application/octet-stream'}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    return status, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('images', nargs='*', default=['test_ine.jpg'])
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--url', help="Servicio ya corriendo (default: levantar uno local)")
+    parser.add_argument('--workers', type=int, default=OCR_SERVICE_WORKERS)
+    parser.add_argument('--unique', action='store_true', help="Evitar aciertos de la caché OCR")
+    args = parser.parse_args()
+
+    images = [Path(path).read_bytes() for path in args.images]
+    bodies = [
+        images[i % len(images)] + (f"\n#{i}".encode() if args.unique else b'')
+        for i in range(args.requests)
+    ]
+
+    server = None
+    url = args.url
+    if not url:
+        server = build_server('127.0.0.1', 0, args.workers, OCR_SERVICE_QUEUE_SIZE, OCR_SERVICE_TIMEOUT)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(lambda body: post_image(url, body), bodies))
+        wall = time.perf_counter() - start
+    finally:
+        if server:
+            health = server.service.health()
+            server.shutdown()
+            server.service.close()
+
+    by_status = {}
+    for status, latency in results:
+        by_status.setdefault(status, []).append(latency)
+
+    print("=" * 80)
+    print(f"{args.requests} requests, concurrencia {args.concurrency}, {wall:.1f}s "
+          f"({args.requests / wall:.1f} req/s)")
+    print("-" * 80)
+    print(f"{'HTTP':<6} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'media ms':>10}")
+    for status, latencies in sorted(by_status.items()):
+        print(f"{status:<6} {len(latencies):>5} {percentile(latencies, 50):>10.0f} "
+              f"{percentile(latencies, 95):>10.0f} {max(latencies):>10.0f} "
+              f"{statistics.mean(latencies):>10.0f}")
+    if server:
+        print("-" * 80)
+        print(f"Servicio: {json.dumps(health)}")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,400 @@
+"""
+Benchmark reproducible de throughput y precisión con credenciales INE sintéticas
+
+Uso:
+    python benchmark_synthetic_ine.py [--count N] [--variants clean,blur,...]
+                                      [--layouts E,G,H] [--seed S]
+                                      [--output resultado.json] [--compare base.json]
+                                      [--save-dir carpeta]
+
+Genera credenciales tipo INE con PIL, sin red ni archivos de muestra: CURPs
+conocidas (con dígito verificador válido), nombres, y la línea de CURP dentro
+de OCREngine.ZONES['CURP'] con variantes de layout tipo E/G/H. Cada variante
+aplica degradaciones controladas (desenfoque, rotación, reflejo, calidad
+JPEG, resolución). Corre INEOCRProcessor.process_ine_image sobre cada imagen
+y reporta imágenes/s, latencia por etapa (src/run_profile.py), RSS pico y
+tasa de coincidencia exacta de CURP, en total y por variante.
+
+Con la misma semilla las imágenes son idénticas entre commits: --output
+guarda el resultado en JSON y --compare muestra la diferencia contra uno anterior.
+"""
+import argparse
+import io
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.curp_validator import calculate_curp_check_digit
+from src.ine_processor import INEOCRProcessor
+from src.ocr_engine import OCREngine
+from src.run_profile import collect, percentile, span
+
+CARD_WIDTH = 1280
+CARD_HEIGHT = 807  # Proporción de una tarjeta CR80 (85.6 x 54 mm)
+BACKGROUND = (236, 226, 232)
+INK = (35, 35, 45)
+
+NOMBRES = ['JUAN', 'MARIA', 'JOSE', 'GUADALUPE', 'FRANCISCO', 'VERONICA', 'ALEJANDRO',
+           'ROSA', 'MIGUEL', 'LETICIA', 'JESUS', 'PATRICIA', 'RICARDO', 'ELENA', 'ARTURO']
+APELLIDOS = ['HERNANDEZ', 'GARCIA', 'MARTINEZ', 'LOPEZ', 'GONZALEZ', 'PEREZ', 'RODRIGUEZ',
+             'SANCHEZ', 'RAMIREZ', 'CRUZ', 'FLORES', 'GOMEZ', 'MORALES', 'VAZQUEZ', 'REYES',
+             'JIMENEZ', 'TORRES', 'DIAZ', 'GUTIERREZ', 'RUIZ', 'MENDOZA', 'AGUILAR', 'ORTIZ']
+ENTIDADES = ['AS', 'BC', 'BS', 'CC', 'CL', 'CM', 'CS', 'CH', 'DF', 'DG', 'GT', 'GR', 'HG',
+             'JC', 'MC', 'MN', 'MS', 'NT', 'NL', 'OC', 'PL', 'QT', 'QR', 'SP', 'SL', 'SR',
+             'TC', 'TS', 'TL', 'VZ', 'YN', 'ZS']
+VOWELS = 'AEIOU'
+
+# Posición (fracción del ancho/alto) de cada bloque de texto por tipo de
+# credencial. La línea de la CURP cae dentro de OCREngine.ZONES['CURP']
+# (y 0.30-0.50, x 0.35-0.95) a distinta altura según el tipo.
+LAYOUTS = {
+    'E': {'nombre': (0.33, 0.20), 'domicilio': (0.33, 0.52), 'clave': (0.33, 0.66),
+          'curp': (0.36, 0.44), 'nacimiento': (0.33, 0.76), 'sexo': (0.78, 0.20)},
+    'G': {'nombre': (0.33, 0.19), 'domicilio': (0.33, 0.54), 'clave': (0.33, 0.63),
+          'curp': (0.36, 0.39), 'nacimiento': (0.33, 0.70), 'sexo': (0.80, 0.19)},
+    'H': {'nombre': (0.33, 0.18), 'domicilio': (0.33, 0.57), 'clave': (0.33, 0.68),
+          'curp': (0.38, 0.34), 'nacimiento': (0.33, 0.47), 'sexo': (0.82, 0.18)},
+}
+
+# Degradaciones controladas; 'mixed' sortea una combinación por imagen
+VARIANTS = {
+    'clean': {},
+    'blur': {'blur': 1.6},
+    'rotation': {'rotation': 4.0},
+    'glare': {'glare': 0.65},
+    'jpeg': {'jpeg_quality': 30},
+    'lowres': {'width': 640},
+    'mixed': None,
+}
+
+
+def load_font(size, bold=False):
+    """DejaVu si está instalada; si no, la fuente por defecto de Pillow"""
+    name = 'DejaVuSans-Bold.ttf' if bold else 'DejaVuSans.ttf'
+    for path in (name, f'/usr/share/fonts/truetype/dejavu/{name}'):
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def first_internal(word, letters):
+    """Primera letra interna (después de la inicial) que está en letters"""
+    return next((c for c in word[1:] if c in letters), 'X')
+
+
+def make_person(rng):
+    """
+    Persona sintética con CURP coherente (nombre, fecha, sexo, entidad) y
+    dígito verificador válido.
+
+    Returns:
+        dict: {'nombre', 'paterno', 'materno', 'nacimiento', 'sexo', 'entidad', 'curp'}
+    """
+    nombre, paterno, materno = rng.choice(NOMBRES), rng.choice(APELLIDOS), rng.choice(APELLIDOS)
+    nacimiento = date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 55))
+    sexo = rng.choice('HM')
+    entidad = rng.choice(ENTIDADES)
+    consonants = ''.join(c for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ' if c not in VOWELS)
+
+    curp17 = (
+        paterno[0] + first_internal(paterno, VOWELS) + materno[0] + nombre[0]
+        + nacimiento.strftime('%y%m%d') + sexo + entidad
+        + first_internal(paterno, consonants) + first_internal(materno, consonants)
+        + first_internal(nombre, consonants)
+        # Homoclave: dígito para nacidos antes de 2000, letra después
+        + (rng.choice('0123456789') if nacimiento.year < 2000 else rng.choice('ABCDEFGHJ'))
+    )
+    return {
+        'nombre': nombre, 'paterno': paterno, 'materno': materno,
+        'nacimiento': nacimiento, 'sexo': sexo, 'entidad': entidad,
+        'curp': curp17 + calculate_curp_check_digit(curp17),
+    }
+
+
+def render_card(person, layout, rng):
+    """Dibuja la credencial limpia (PIL RGB de CARD_WIDTH x CARD_HEIGHT)"""
+    card = Image.new('RGB', (CARD_WIDTH, CARD_HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(card)
+    label_font, text_font, curp_font = load_font(20), load_font(30, bold=True), load_font(34, bold=True)
+    positions = LAYOUTS[layout]
+
+    def at(key, dx=0.0, dy=0.0):
+        x, y = positions[key]
+        return (x + dx) * CARD_WIDTH, (y + dy) * CARD_HEIGHT
+
+    # Fondo con textura (guilloché simplificado) y encabezado
+    for i in range(0, CARD_WIDTH, 24):
+        draw.line([(i, 0), (i + CARD_HEIGHT // 2, CARD_HEIGHT)], fill=(228, 214, 224), width=2)
+    draw.rectangle([0, 0, CARD_WIDTH, int(0.13 * CARD_HEIGHT)], fill=(120, 30, 70))
+    draw.text((0.03 * CARD_WIDTH, 0.03 * CARD_HEIGHT), "MÉXICO   INSTITUTO NACIONAL ELECTORAL",
+              font=load_font(34, bold=True), fill=(255, 255, 255))
+    draw.text((0.62 * CARD_WIDTH, 0.085 * CARD_HEIGHT), "CREDENCIAL PARA VOTAR",
+              font=label_font, fill=(255, 255, 255))
+
+    # Foto
+    tone = rng.randint(120, 190)
+    draw.rectangle([0.03 * CARD_WIDTH, 0.20 * CARD_HEIGHT, 0.29 * CARD_WIDTH, 0.80 * CARD_HEIGHT],
+                   fill=(tone, tone - 20, tone - 35))
+    draw.ellipse([0.09 * CARD_WIDTH, 0.27 * CARD_HEIGHT, 0.23 * CARD_WIDTH, 0.55 * CARD_HEIGHT],
+                 fill=(tone + 30, tone + 10, tone - 10))
+
+    draw.text(at('nombre'), "NOMBRE", font=label_font, fill=INK)
+    for i, line in enumerate((person['paterno'], person['materno'], person['nombre'])):
+        draw.text(at('nombre', dy=0.03 + 0.045 * i), line, font=text_font, fill=INK)
+    draw.text(at('sexo'), f"SEXO {person['sexo']}", font=text_font, fill=INK)
+
+    draw.text(at('domicilio'), "DOMICILIO", font=label_font, fill=INK)
+    draw.text(at('domicilio', dy=0.03), f"C {rng.choice(APELLIDOS)} {rng.randint(1, 999)}",
+              font=text_font, fill=INK)
+
+    clave = (person['paterno'][:2] + person['materno'][:2] + person['nombre'][:2]
+             + person['nacimiento'].strftime('%y%m%d') + f"{rng.randint(1, 32):02d}"
+             + person['sexo'] + f"{rng.randint(100, 999)}")
+    draw.text(at('clave'), f"CLAVE DE ELECTOR {clave}", font=text_font, fill=INK)
+    draw.text(at('curp'), f"CURP {person['curp']}", font=curp_font, fill=INK)
+    draw.text(at('nacimiento'), f"FECHA DE NACIMIENTO {person['nacimiento'].strftime('%d/%m/%Y')}",
+              font=text_font, fill=INK)
+    return card
+
+
+def random_degradation(rng):
+    """Combinación aleatoria de degradaciones (variante 'mixed')"""
+    return {
+        'blur': rng.uniform(0, 1.5),
+        'rotation': rng.uniform(-3, 3),
+        'glare': rng.choice([0, 0, 0.4, 0.6]),
+        'jpeg_quality': rng.randint(35, 90),
+        'width': rng.choice([800, 1024, 1280]),
+    }
+
+
+def degrade(card, rng, blur=0.0, rotation=0.0, glare=0.0, jpeg_quality=90, width=CARD_WIDTH):
+    """
+    Aplica las degradaciones y codifica como JPEG.
+
+    Returns:
+        bytes: Imagen JPEG (como la subiría la app de captura)
+    """
+    image = card
+    if glare:
+        # Reflejo: elipse blanca difusa en una posición aleatoria
+        mask = Image.new('L', image.size, 0)
+        cx, cy = rng.uniform(0.3, 0.8) * image.width, rng.uniform(0.2, 0.6) * image.height
+        ImageDraw.Draw(mask).ellipse(
+            [cx - 0.2 * image.width, cy - 0.15 * image.height,
+             cx + 0.2 * image.width, cy + 0.15 * image.height], fill=int(255 * glare)
+        )
+        mask = mask.filter(ImageFilter.GaussianBlur(60))
+        image = Image.composite(Image.new('RGB', image.size, (255, 255, 255)), image, mask)
+    if rotation:
+        image = image.rotate(rotation, resample=Image.BICUBIC, expand=True, fillcolor=(90, 90, 90))
+    if blur:
+        image = image.filter(ImageFilter.GaussianBlur(blur))
+    if width != image.width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=jpeg_quality)
+    return buffer.getvalue()
+
+
+def generate(count, variants, layouts, seed):
+    """
+    Returns:
+        list: [{'variant', 'layout', 'curp', 'degradation', 'bytes'}], determinista por semilla
+    """
+    rng = random.Random(seed)
+    samples = []
+    for variant in variants:
+        for i in range(count):
+            layout = layouts[i % len(layouts)]
+            person = make_person(rng)
+            degradation = VARIANTS[variant]
+            if degradation is None:
+                degradation = random_degradation(rng)
+            card = render_card(person, layout, rng)
+            samples.append({
+                'variant': variant, 'layout': layout, 'curp': person['curp'],
+                'degradation': degradation, 'bytes': degrade(card, rng, **degradation),
+            })
+    return samples
+
+
+def peak_rss_mb():
+    """RSS pico de este proceso y de sus hijos (tesseract CLI), en MB"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux reporta KB (macOS reporta bytes)
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(own / scale, 1), round(children / scale, 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(samples):
+    """Corre process_ine_image sobre cada muestra y junta tiempos y aciertos"""
+    processor = INEOCRProcessor(debug=False)
+    records = []
+    start = time.perf_counter()
+    for sample in samples:
+        image_start = time.perf_counter()
+        error = None
+        found = ''
+        with collect() as timings:
+            try:
+                with span('decode'):
+                    image = cv2.imdecode(np.frombuffer(sample['bytes'], np.uint8), cv2.IMREAD_COLOR)
+                results = processor.process_ine_image(image=image)
+                found = results['fields']['curp'].value
+                strategy = results['strategy']
+            except Exception as e:
+                error, strategy = str(e), 'Error'
+        records.append({
+            'variant': sample['variant'], 'layout': sample['layout'],
+            'expected': sample['curp'], 'found': found, 'match': found == sample['curp'],
+            'strategy': strategy, 'error': error,
+            'seconds': time.perf_counter() - image_start, 'stages': timings,
+        })
+    return records, time.perf_counter() - start
+
+
+def latency_stats(values):
+    ordered = sorted(values)
+    return {
+        'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+        'total_s': round(sum(ordered), 3),
+    }
+
+
+def summarize(records, wall, args):
+    """Resultado JSON (comparable entre commits con la misma semilla)"""
+    stages = {}
+    for record in records:
+        for stage, seconds in record['stages'].items():
+            stages.setdefault(stage, []).append(seconds)
+
+    by_variant = {}
+    for variant in dict.fromkeys(record['variant'] for record in records):
+        subset = [record for record in records if record['variant'] == variant]
+        by_variant[variant] = {
+            'images': len(subset),
+            'curp_exact_match': round(sum(r['match'] for r in subset) / len(subset), 4),
+            'errors': sum(1 for r in subset if r['error']),
+            'latency': latency_stats([r['seconds'] for r in subset]),
+        }
+
+    strategies = {}
+    for record in records:
+        strategies[record['strategy']] = strategies.get(record['strategy'], 0) + 1
+
+    rss_self, rss_children = peak_rss_mb()
+    return {
+        'commit': git_commit(),
+        'params': {'count': args.count, 'variants': args.variants, 'layouts': args.layouts,
+                   'seed': args.seed, 'zones': OCREngine().ZONES['CURP']},
+        'images': len(records),
+        'wall_s': round(wall, 3),
+        'images_per_s': round(len(records) / wall, 3) if wall else 0.0,
+        'curp_exact_match': round(sum(r['match'] for r in records) / len(records), 4),
+        'errors': sum(1 for r in records if r['error']),
+        'peak_rss_mb': rss_self,
+        'peak_rss_children_mb': rss_children,
+        'latency': latency_stats([r['seconds'] for r in records]),
+        'stages': {stage: latency_stats(values) for stage, values in sorted(stages.items())},
+        'strategies': strategies,
+        'variants': by_variant,
+    }
+
+
+def print_report(result, baseline=None):
+    def delta(key, fmt):
+        if not baseline or key not in baseline:
+            return ''
+        return f"  (antes {format(baseline[key], fmt)})"
+
+    print("=" * 80)
+    print(f"🧪 BENCHMARK INE SINTÉTICAS ({result['images']} imágenes, commit {result['commit']})")
+    print("=" * 80)
+    print(f"Imágenes/s:         {result['images_per_s']:.2f}{delta('images_per_s', '.2f')}")
+    print(f"CURP exacta:        {result['curp_exact_match'] * 100:.1f}%"
+          f"{delta('curp_exact_match', '.1%')}")
+    print(f"Latencia p50/p95:   {result['latency']['p50_ms']:.0f} / {result['latency']['p95_ms']:.0f} ms")
+    print(f"RSS pico:           {result['peak_rss_mb']} MB (hijos {result['peak_rss_children_mb']} MB)")
+    print(f"Errores:            {result['errors']}")
+    print(f"Estrategias:        {result['strategies']}")
+    print("-" * 80)
+    print(f"{'Variante':<10} {'n':>4} {'CURP ok':>9} {'p50 ms':>9} {'p95 ms':>9}"
+          + ("  CURP ok antes" if baseline else ""))
+    for variant, stats in result['variants'].items():
+        before = (baseline or {}).get('variants', {}).get(variant)
+        print(f"{variant:<10} {stats['images']:>4} {stats['curp_exact_match'] * 100:>8.1f}% "
+              f"{stats['latency']['p50_ms']:>9.0f} {stats['latency']['p95_ms']:>9.0f}"
+              + (f"  {before['curp_exact_match'] * 100:>8.1f}%" if before else ""))
+    print("-" * 80)
+    print(f"{'Etapa':<16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'total s':>9}")
+    for stage, stats in result['stages'].items():
+        print(f"{stage:<16} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+              f"{stats['p99_ms']:>9.1f} {stats['total_s']:>9.2f}")
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=10, help="Imágenes por variante")
+    parser.add_argument('--variants', default=','.join(VARIANTS))
+    parser.add_argument('--layouts', default=','.join(LAYOUTS))
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--output', help="Guardar el resultado en JSON")
+    parser.add_argument('--compare', help="JSON de una corrida anterior para comparar")
+    parser.add_argument('--save-dir', help="Guardar las imágenes generadas (para inspección)")
+    args = parser.parse_args()
+
+    variants = args.variants.split(',')
+    layouts = args.layouts.split(',')
+    unknown = [v for v in variants if v not in VARIANTS] + [l for l in layouts if l not in LAYOUTS]
+    if unknown:
+        parser.error(f"desconocido: {', '.join(unknown)}")
+    args.variants, args.layouts = variants, layouts
+
+    samples = generate(args.count, variants, layouts, args.seed)
+    if args.save_dir:
+        save_dir = Path(args.save_dir)
+        save_dir.mkdir(parents=True, exist_ok=True)
+        for i, sample in enumerate(samples):
+            (save_dir / f"{i:04d}_{sample['variant']}_{sample['layout']}_{sample['curp']}.jpg").write_bytes(
+                sample['bytes']
+            )
+
+    records, wall = run(samples)
+    result = summarize(records, wall, args)
+
+    baseline = json.loads(Path(args.compare).read_text(encoding='utf-8')) if args.compare else None
+    print_report(result, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"💾 Resultado guardado en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
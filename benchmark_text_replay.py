@@ -0,0 +1,280 @@
+"""
+Replay offline de TEXTO_CRUDO histórico por los extractores de CURP
+
+Uso:
+    python benchmark_text_replay.py [export.csv ...] [--repeat N] [--sin-referencia]
+                                    [--output resultado.json] [--baseline anterior.json]
+
+Recorre el export de REGISTRO_MASTER (por defecto "REGISTRO_MASTER -
+REGISTRO_MASTER.csv", o cualquier export con el mismo formato) sin cargarlo
+completo y pasa cada TEXTO_CRUDO por cada variante de extractor
+(RobustExtractor.find_curp_fuzzy, extract_curp_from_text) y por
+validate_curp_complete. Reporta latencia por texto (p50/p95/p99),
+textos/s y cuántas CURPs encuentra y valida cada variante frente al
+resultado que quedó registrado en la hoja. Termina con código 1 si ningún
+texto tiene una CURP válida registrada (salvo con --sin-referencia).
+
+Sin Tesseract ni credenciales de Google: sirve como benchmark y prueba de
+regresión del lado de texto del pipeline. --output guarda el resultado por
+texto y --baseline muestra qué textos cambiaron de resultado contra una
+corrida anterior.
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import REGISTRO_HEADERS
+from src.curp_validator import extract_curp_from_text, validate_curp_complete
+from src.robust_extractor import RobustExtractor
+from src.run_profile import percentile
+
+DEFAULT_EXPORT = "REGISTRO_MASTER - REGISTRO_MASTER.csv"
+
+# Valores de STATUS que escribe el pipeline (ancla para exports "en escalera")
+KNOWN_STATUSES = ('PENDIENTE_OCR', 'EN_PROCESO', 'COMPLETADO', 'REVISION', 'SIN_CURP', 'ERROR')
+
+TIMESTAMP_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}')
+
+STATUS_COL = REGISTRO_HEADERS.index('STATUS')
+TEXT_COL = REGISTRO_HEADERS.index('TEXTO_CRUDO')
+
+
+def first_or_none(matches):
+    return matches[0] if matches else None
+
+
+# Variantes de extractor: nombre -> texto -> CURP o None
+EXTRACTORS = {
+    'find_curp_fuzzy': RobustExtractor.find_curp_fuzzy,
+    'extract_curp_from_text': lambda text: first_or_none(extract_curp_from_text(text)),
+}
+
+
+def is_status(value):
+    value = value.strip().upper()
+    return any(value.startswith(status) for status in KNOWN_STATUSES)
+
+
+def iter_entries(path):
+    """
+    Recorre el export fila por fila y genera las entradas con TEXTO_CRUDO.
+
+    Si la primera fila trae TEXTO_CRUDO y STATUS se usan esas columnas. Si
+    no, el export no tiene fila de headers (export directo del Sheet) y las
+    columnas son las de REGISTRO_HEADERS, contadas desde la celda de STATUS
+    de cada entrada: así se leen también las filas desplazadas por appends
+    mal anclados (TEXTO_CRUDO es la celda anterior a STATUS).
+
+    Yields:
+        dict: {'line', 'timestamp', 'filename', 'curp', 'status', 'text'}
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return
+
+        if 'TEXTO_CRUDO' in first and 'STATUS' in first:
+            header = {name: first.index(name) for name in first}
+            for row in reader:
+                cell = lambda name: row[header[name]] if header.get(name, len(row)) < len(row) else ''
+                if cell('TEXTO_CRUDO').strip():
+                    yield {
+                        'line': reader.line_num, 'timestamp': cell('FECHA_HORA'),
+                        'filename': cell('NOMBRE_ARCHIVO'), 'curp': cell('CURP_DETECTADA'),
+                        'status': cell('STATUS'), 'text': cell('TEXTO_CRUDO'),
+                    }
+            return
+
+        for row in itertools.chain([first], reader):
+            for k, value in enumerate(row):
+                start = k - STATUS_COL
+                if start < 0 or not is_status(value) or not row[k - 1].strip():
+                    continue
+                fields = dict(zip(REGISTRO_HEADERS, row[start:]))
+                entry = {
+                    'line': reader.line_num, 'timestamp': fields['FECHA_HORA'],
+                    'filename': fields['NOMBRE_ARCHIVO'], 'curp': fields['CURP_DETECTADA'],
+                    'status': value, 'text': fields['TEXTO_CRUDO'],
+                }
+                if not TIMESTAMP_PATTERN.match(entry['timestamp']):
+                    # Entrada encimada con otra: solo el texto y el STATUS son confiables
+                    entry.update(timestamp='', filename='', curp='')
+                yield entry
+
+
+def text_key(text):
+    """Identificador estable de un texto (para comparar corridas)"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def timed(func, text, repeat):
+    """Retorna (resultado, segundos por llamada) promediando repeat llamadas"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(text)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def replay(paths, repeat):
+    """
+    Returns:
+        tuple: (registros por texto, segundos totales de extracción)
+    """
+    records = []
+    total = 0.0
+    for path in paths:
+        for entry in iter_entries(path):
+            results = {}
+            for name, extractor in EXTRACTORS.items():
+                curp, extract_seconds = timed(extractor, entry['text'], repeat)
+                (valid, _, message), validate_seconds = timed(
+                    validate_curp_complete, curp or '', repeat
+                )
+                total += extract_seconds + validate_seconds
+                results[name] = {
+                    'curp': curp, 'valid': valid, 'message': message,
+                    'extract_us': extract_seconds * 1e6, 'validate_us': validate_seconds * 1e6,
+                }
+            # La hoja guarda marcadores como 'X' cuando no hubo CURP
+            recorded_curp = entry['curp'].strip().upper()
+            if len(recorded_curp) != 18:
+                recorded_curp = ''
+            records.append({
+                'key': text_key(entry['text']), 'source': f"{Path(path).name}:{entry['line']}",
+                'filename': entry['filename'], 'recorded_curp': recorded_curp,
+                'recorded_status': entry['status'].split(':')[0].strip(),
+                'chars': len(entry['text']), 'results': results,
+            })
+    return records, total
+
+
+def latency_stats(values):
+    ordered = sorted(values)
+    return {
+        'p50_us': round(percentile(ordered, 50), 1),
+        'p95_us': round(percentile(ordered, 95), 1),
+        'p99_us': round(percentile(ordered, 99), 1),
+        'mean_us': round(sum(ordered) / len(ordered), 1),
+    }
+
+
+def summarize(records, total_seconds):
+    recorded_valid = sum(1 for r in records if validate_curp_complete(r['recorded_curp'])[0])
+    variants = {}
+    for name in EXTRACTORS:
+        results = [r['results'][name] for r in records]
+        extract = [res['extract_us'] for res in results]
+        variants[name] = {
+            'found': sum(1 for res in results if res['curp']),
+            'valid': sum(1 for res in results if res['valid']),
+            # Textos donde la variante da una CURP distinta a la registrada en la hoja
+            'differs_from_recorded': sum(
+                1 for r, res in zip(records, results) if (res['curp'] or '') != r['recorded_curp']
+            ),
+            'extract': latency_stats(extract),
+            'validate': latency_stats([res['validate_us'] for res in results]),
+            'texts_per_s': round(len(extract) / (sum(extract) / 1e6), 1) if sum(extract) else 0.0,
+        }
+    return {
+        'texts': len(records),
+        'chars': sum(r['chars'] for r in records),
+        'recorded_valid': recorded_valid,
+        'texts_per_s': round(len(records) * len(EXTRACTORS) / total_seconds, 1) if total_seconds else 0.0,
+        'variants': variants,
+    }
+
+
+def changes_against(records, baseline):
+    """Textos cuyo resultado cambió respecto a la corrida base: {variante: [(clave, antes, ahora)]}"""
+    before = {r['key']: r['results'] for r in baseline.get('records', [])}
+    changes = {}
+    for record in records:
+        old = before.get(record['key'])
+        if old is None:
+            continue
+        for name, result in record['results'].items():
+            if name in old and old[name]['curp'] != result['curp']:
+                changes.setdefault(name, []).append(
+                    (record['key'], record['source'], old[name]['curp'], result['curp'])
+                )
+    return changes
+
+
+def print_report(summary, changes=None):
+    print("=" * 80)
+    print(f"📜 REPLAY TEXTO_CRUDO ({summary['texts']} textos, {summary['chars']} caracteres, "
+          f"{summary['recorded_valid']} con CURP válida registrada)")
+    print("=" * 80)
+    print(f"Throughput total: {summary['texts_per_s']:.1f} textos/s (extracción + validación)")
+    print("-" * 80)
+    print(f"{'Variante':<24} {'CURP':>5} {'válida':>7} {'≠ hoja':>7} {'p50 µs':>9} "
+          f"{'p95 µs':>9} {'p99 µs':>9} {'textos/s':>10}")
+    for name, stats in summary['variants'].items():
+        extract = stats['extract']
+        print(f"{name:<24} {stats['found']:>5} {stats['valid']:>7} {stats['differs_from_recorded']:>7} "
+              f"{extract['p50_us']:>9.1f} {extract['p95_us']:>9.1f} {extract['p99_us']:>9.1f} "
+              f"{stats['texts_per_s']:>10.1f}")
+    if changes is not None:
+        print("-" * 80)
+        if not changes:
+            print("Sin cambios de resultado contra la corrida base")
+        for name, items in changes.items():
+            print(f"⚠️  {name}: {len(items)} textos cambiaron")
+            for key, source, old, new in items:
+                print(f"   {key} ({source}): {old} → {new}")
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('exports', nargs='*', default=[DEFAULT_EXPORT])
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="Llamadas por texto y variante (se promedia la latencia)")
+    parser.add_argument('--output', help="Guardar resumen y resultados por texto en JSON")
+    parser.add_argument('--baseline', help="JSON de una corrida anterior para detectar cambios")
+    parser.add_argument('--sin-referencia', action='store_true',
+                        help="No exigir CURPs registradas en la hoja (solo latencia)")
+    args = parser.parse_args()
+
+    # Los extractores loguean cada hallazgo; no medir el logging
+    logging.disable(logging.INFO)
+
+    records, total_seconds = replay(args.exports, args.repeat)
+    if not records:
+        print("❌ No se encontraron textos en el export")
+        sys.exit(1)
+    summary = summarize(records, total_seconds)
+    if not summary['recorded_valid'] and not args.sin_referencia:
+        # Sin CURPs de referencia las columnas "válida" y "≠ hoja" no miden nada
+        print(f"❌ Ninguno de los {len(records)} textos tiene una CURP válida registrada en la hoja "
+              f"(¿columnas mal leídas?). Usa --sin-referencia para medir solo latencia.")
+        sys.exit(1)
+
+    changes = None
+    if args.baseline:
+        changes = changes_against(records, json.loads(Path(args.baseline).read_text(encoding='utf-8')))
+    print_report(summary, changes)
+
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps({'summary': summary, 'records': records}, indent=2, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        print(f"💾 Resultado guardado en {args.output}")
+    if changes:
+        # Código distinto de cero para usarlo como prueba de regresión
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
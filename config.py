@@ -34,7 +34,9 @@ REGISTRO_HEADERS = [
     "DOSIS",
     "OCR_STRATEGY",
     "OCR_TIMESTAMP",
-    "OCR_ISSUES"
+    "OCR_ISSUES",
+    "OCR_LEASE",
+    "CURP_CAPTURA"
 ]
 
 # Headers para el dashboard
@@ -52,6 +54,21 @@ TESSERACT_CONFIG = '--oem 3 --psm 3 -l spa'
 TESSERACT_CONFIG_SPARSE = '--oem 3 --psm 11 -l spa'  # For sparse text (INE, cards)
 TESSERACT_LANG = 'spa'
 
+# Una sola pasada de Tesseract por imagen (image_to_data de página completa).
+# La zona CURP y el fallback de texto completo se obtienen de las mismas cajas,
+# en lugar de OCR zonal + segundo OCR de página completa.
+OCR_SINGLE_PASS = False
+
+# Preprocesamiento ROI-first: la zona CURP se recorta de la foto cruda y solo
+# esa ROI pasa por CLAHE/bilateral/upscaling. La imagen completa se procesa
+# únicamente si se llega al fallback de página completa.
+OCR_ROI_FIRST = True
+
+# Backend de Tesseract (ver src/ocr_backends.py):
+# 'pytesseract' = binario CLI (un subproceso por llamada)
+# 'tesserocr'   = libtesseract en proceso con handles persistentes (opcional)
+OCR_BACKEND = 'pytesseract'
+
 # Configuración de EasyOCR
 EASYOCR_LANGS = ['es', 'en']
 EASYOCR_GPU = False  # GitHub Actions no tiene GPU
@@ -61,6 +78,26 @@ USE_EASYOCR_FALLBACK = False  # DESHABILITADO por defecto (ocupa mucho espacio e
 # Formato: 4 letras + 6 dígitos (YYMMDD) + H/M + 5 letras + 1 alfanumérico + 1 dígito
 CURP_REGEX = r'\b[A-Z]{4}\d{6}[HM][A-Z]{5}[A-Z0-9]\d\b'
 
+# Claves de entidad federativa válidas en la CURP (posiciones 12-13; NE = nacido en el extranjero)
+CURP_STATE_CODES = (
+    'AS', 'BC', 'BS', 'CC', 'CL', 'CM', 'CS', 'CH', 'DF', 'DG', 'GT', 'GR', 'HG',
+    'JC', 'MC', 'MN', 'MS', 'NT', 'NL', 'OC', 'PL', 'QT', 'QR', 'SP', 'SL', 'SR',
+    'TC', 'TS', 'TL', 'VZ', 'YN', 'ZS', 'NE'
+)
+
+# Corrección de caracteres ambiguos con dígito verificador (RobustExtractor):
+# cambios dudosos permitidos respecto a la lectura (reemplazar un carácter que no
+# puede ir en su posición por su confusión más común no cuenta), combinaciones que
+# se evalúan como máximo por bloque de posiciones y ventanas candidatas (de mayor
+# a menor score) que se intentan corregir por texto
+CURP_CORRECTION_MAX_COST = 1
+CURP_CORRECTION_MAX_COMBOS = 256
+CURP_CORRECTION_MAX_WINDOWS = 5
+
+# Confianza máxima (0-1) de un resultado sin CURP o con una CURP que no pasa
+# validate_curp_complete: queda bajo el umbral de COMPLETADO y va a REVISION
+CURP_UNVERIFIED_MAX_CONFIDENCE = 0.75
+
 # Umbral de confianza para marcar como "REVISIÓN"
 CONFIDENCE_THRESHOLD = 0.7
 
@@ -72,5 +109,117 @@ LOG_LEVEL = 'INFO'
 # Límite de archivos a procesar por ejecución (para evitar timeout en GitHub Actions)
 MAX_FILES_PER_RUN = 50
 
+# Presupuesto de tiempo por ejecución (segundos): pasado este tiempo no se toman
+# filas nuevas y se sale limpio antes de que el runner mate el job
+# (timeout-minutes: 15 en el workflow, menos instalación de dependencias)
+RUN_TIME_BUDGET = 600
+
+# Procesos OCR en paralelo por ejecución (1 = secuencial, sin pool)
+# Se puede sobrescribir con la variable de entorno OCR_WORKERS
+OCR_WORKERS = 1
+
+# Imágenes por invocación de Tesseract en modo lote (backfills).
+# 1 = una invocación por imagen/zona. Se puede sobrescribir con OCR_BATCH_SIZE
+OCR_BATCH_SIZE = 1
+
+# Pipeline por etapas: hilos que descargan por adelantado mientras corre el OCR
+# y capacidad de cada cola entre etapas (acota la memoria en uso)
+PIPELINE_PREFETCH = 4
+PIPELINE_QUEUE_SIZE = 8
+
+# CURP sugerida por la app de captura (columna CURP_CAPTURA, que solo escribe la
+# app, o curp_hint en el servicio HTTP): se acepta si pasa validate_curp_complete y
+# un OCR zonal la confirma. Nunca se toma de CURP_DETECTADA: es la salida del
+# propio pipeline y se confirmaría a sí misma.
+# Por defecto la lectura zonal debe coincidir exactamente (salvo confusiones
+# 0/O, 1/I...). Con N > 0 se toleran N caracteres distintos, pero solo donde
+# el dígito verificador detectaría el cambio (la posición 9, peso 10, nunca), y
+# ese resultado se reporta con CURP_HINT_PARTIAL_CONFIDENCE (< umbral de
+# COMPLETADO, queda en REVISION)
+CURP_HINT_MAX_MISMATCHES = 0
+CURP_HINT_PARTIAL_CONFIDENCE = 0.75
+
+# Caché de resultados OCR por hash SHA-256 de la imagen (archivo SQLite único,
+# persistido entre ejecuciones con actions/cache)
+OCR_CACHE_ENABLED = True
+OCR_CACHE_PATH = ".ocr_cache/ocr_results.sqlite3"
+OCR_CACHE_MAX_MB = 64
+# Incrementar cuando cambie el motor OCR o la extracción de campos de forma que
+# invalide resultados previos (2: corrección de la CURP por dígito verificador)
+OCR_CACHE_VERSION = 2
+
+# Almacén local de imágenes por md5Checksum de Drive: evita volver a descargar
+# archivos ya vistos (re-procesos, upgrades del motor) y verifica integridad
+BLOB_STORE_ENABLED = True
+BLOB_STORE_DIR = ".ocr_cache/blobs"
+BLOB_STORE_MAX_MB = 256
+# Al pasar del máximo se desaloja hasta esta fracción: el tamaño se lleva como
+# total acumulado y el directorio solo se recorre al desalojar
+BLOB_STORE_EVICT_TO = 0.9
+
+# Índice nombre → archivo de la carpeta ENTRADAS (refresco incremental con el Changes API)
+DRIVE_INDEX_PATH = ".ocr_cache/drive_index.json"
+
+# Escritura agrupada en Sheets (values.batchUpdate): flush al juntar N rangos,
+# si el más antiguo lleva M segundos esperando, y al final de la ejecución.
+# Lo no confirmado se guarda en un spool local y se reenvía en la siguiente ejecución.
+SHEETS_WRITE_BATCH_RANGES = 100
+SHEETS_WRITE_MAX_AGE = 30
+SHEETS_SPOOL_DIR = ".ocr_cache"
+# Tras un flush fallido no se reintenta en cada add(): se espera SHEETS_WRITE_MAX_AGE
+# y se duplica la espera en cada fallo seguido hasta este máximo (segundos). Los
+# rangos que el API rechaza (4xx) se aíslan partiendo el lote y se apartan en
+# pending_writes_*_rejected.jsonl para no bloquear al resto
+SHEETS_WRITE_RETRY_MAX = 300
+
+# Planificador de llamadas a Google APIs (src/api_scheduler.py).
+# Cuotas por minuto y por proceso, por debajo de las publicadas
+# (Sheets: 60 lecturas y 60 escrituras/min por usuario; Drive: 12,000/min por usuario)
+API_QUOTAS = {
+    'drive': 600,
+    'sheets_read': 50,
+    'sheets_write': 50,
+}
+# Reintentos en 429 / 5xx con backoff exponencial + jitter (segundos)
+API_MAX_RETRIES = 5
+API_BACKOFF_BASE = 1.0
+API_BACKOFF_MAX = 64
+# Circuit breaker: tras N llamadas fallidas seguidas se pausa (duplicando la pausa);
+# si la pausa acumulada supera el máximo se detiene la ejecución sin marcar filas como ERROR
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 60
+CIRCUIT_MAX_PAUSE = 600
+
+# Modo daemon (main_ocr.py --watch): intervalo de sondeo adaptativo en segundos.
+# Vuelve al mínimo al encontrar filas y se multiplica por el factor en cada
+# sondeo vacío hasta el máximo. Con la hoja llena de trabajo no espera.
+WATCH_POLL_MIN = 5
+WATCH_POLL_MAX = 300
+WATCH_POLL_BACKOFF = 2
+
+# Servicio HTTP local de OCR para la PWA (src/ocr_service.py): procesos de OCR,
+# requests en espera antes de responder 503 y presupuesto de latencia (504)
+OCR_SERVICE_HOST = "127.0.0.1"
+OCR_SERVICE_PORT = 8765
+OCR_SERVICE_WORKERS = 2
+OCR_SERVICE_QUEUE_SIZE = 8
+OCR_SERVICE_TIMEOUT = 10
+OCR_SERVICE_MAX_UPLOAD_MB = 10
+
+# Leases para repartir filas entre varias instancias sobre el mismo Sheet
+# (src/row_leases.py). El lease debe durar más que RUN_TIME_BUDGET; la espera
+# de asentamiento da tiempo a que una escritura concurrente quede visible
+LEASE_ENABLED = True
+LEASE_SECONDS = 900
+LEASE_SETTLE_SECONDS = 2
+
+# Perfil de tiempos por etapa (src/run_profile.py): un registro JSONL por imagen
+# y percentiles p50/p95/p99 por etapa al final de cada ejecución. Con una ruta en
+# PROFILE_PROMETHEUS_PATH (o la variable de entorno OCR_PROMETHEUS_TEXTFILE) se
+# escriben además las métricas para el textfile collector del node exporter
+PROFILE_ENABLED = True
+PROFILE_JSONL_PATH = "run_profile.jsonl"
+PROFILE_PROMETHEUS_PATH = None
+
 # Timeout para procesamiento de cada imagen (segundos)
 IMAGE_TIMEOUT = 30
@@ -0,0 +1,81 @@
+"""
+Hoja de REGISTRO_MASTER en memoria para los scripts test_*.py.
+
+Implementa solo lo que usa el pipeline de gspread.Worksheet: batch_get y
+batch_update con rangos A1 de una columna ('B2:B', 'H5') o de una fila
+('C5:H5'), con las mismas respuestas recortadas que da la API (sin celdas
+vacías al final).
+"""
+import re
+
+from gspread.utils import a1_to_rowcol
+
+from config import REGISTRO_HEADERS
+
+_RANGE = re.compile(r'([A-Z]+)(\d+)(?::([A-Z]+)(\d*))?')
+
+
+class FakeWorksheet:
+    """Worksheet con las filas en una lista de listas (fila 1 = headers)"""
+
+    def __init__(self, rows=()):
+        """
+        Args:
+            rows: Filas de datos como dicts {header: valor}
+        """
+        self.rows = [list(REGISTRO_HEADERS)]
+        self.read_calls = 0
+        self.write_calls = 0
+        for row in rows:
+            self.append(row)
+
+    def append(self, values):
+        """Agrega una fila ({header: valor}) al final, como la app de captura"""
+        self.rows.append([str(values.get(header, '')) for header in REGISTRO_HEADERS])
+        return len(self.rows)
+
+    def delete_row(self, row_num):
+        """Borra una fila y recorre las siguientes hacia arriba (como clean_sheet.py)"""
+        del self.rows[row_num - 1]
+
+    def cell(self, row_num, header):
+        row = self.rows[row_num - 1] if row_num <= len(self.rows) else []
+        col = REGISTRO_HEADERS.index(header)
+        return row[col] if col < len(row) else ''
+
+    def _get(self, row_num, col):
+        row = self.rows[row_num - 1] if row_num <= len(self.rows) else []
+        return row[col - 1] if col <= len(row) else ''
+
+    def batch_get(self, ranges):
+        self.read_calls += 1
+        result = []
+        for a1_range in ranges:
+            first_col, first_row, last_col, last_row = _RANGE.fullmatch(a1_range).groups()
+            col = a1_to_rowcol(f'{first_col}1')[1]
+            start = int(first_row)
+            if last_col is None:
+                end = start
+            else:
+                end = int(last_row) if last_row else len(self.rows)
+            values = [[value] if value else [] for value in
+                      (self._get(row_num, col) for row_num in range(start, end + 1))]
+            while values and not values[-1]:
+                values.pop()
+            result.append(values)
+        return result
+
+    def batch_update(self, data, value_input_option=None):
+        self.write_calls += 1
+        for entry in data:
+            if set(entry) != {'range', 'values'}:
+                raise ValueError(f"Unknown fields in value range: {sorted(entry)}")
+            first_col, first_row, _, _ = _RANGE.fullmatch(entry['range']).groups()
+            row_num, col = int(first_row), a1_to_rowcol(f'{first_col}1')[1]
+            while len(self.rows) < row_num:
+                self.rows.append([])
+            row = self.rows[row_num - 1]
+            for offset, value in enumerate(entry['values'][0]):
+                while len(row) < col + offset:
+                    row.append('')
+                row[col + offset - 1] = value
@@ -0,0 +1,232 @@
+"""
+Capa única de planificación de llamadas a Google APIs (Drive / Sheets).
+
+Toda llamada pasa por APIScheduler.call / execute, que aplica:
+1. Rate limiting por API con token bucket (cuotas publicadas, ver config.API_QUOTAS)
+2. Reintentos con backoff exponencial + jitter en 429 / 5xx / errores de red
+3. Circuit breaker: tras varios fallos agotados seguidos se PAUSA el pipeline
+   (en vez de marcar filas como ERROR una tras otra); si la pausa total
+   excede el máximo se lanza CircuitOpenError y la ejecución se detiene
+   dejando las filas pendientes para la siguiente.
+4. Contadores de llamadas, reintentos y tiempo de espera por throttling
+"""
+import logging
+import random
+import socket
+import threading
+import time
+
+import httplib2
+from requests import exceptions as requests_exceptions
+
+from config import (
+    API_QUOTAS,
+    API_MAX_RETRIES,
+    API_BACKOFF_BASE,
+    API_BACKOFF_MAX,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_COOLDOWN,
+    CIRCUIT_MAX_PAUSE,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Errores de red de cada cliente: googleapiclient va sobre httplib2 y gspread
+# sobre requests, y ninguno de los dos hereda de ConnectionError/TimeoutError.
+# De requests no se toma RequestException completo: incluye HTTPError (4xx).
+NETWORK_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    socket.timeout,
+    httplib2.HttpLib2Error,
+    requests_exceptions.ConnectionError,
+    requests_exceptions.Timeout,
+    requests_exceptions.ChunkedEncodingError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Las APIs de Google siguen fallando tras la pausa máxima: detener la ejecución"""
+
+
+def _status_code(exc):
+    """Código HTTP de un HttpError (googleapiclient) o APIError (gspread)"""
+    resp = getattr(exc, 'resp', None)
+    if resp is not None and getattr(resp, 'status', None) is not None:
+        return int(resp.status)
+    response = getattr(exc, 'response', None)
+    if response is not None and getattr(response, 'status_code', None) is not None:
+        return int(response.status_code)
+    return None
+
+
+def is_retryable(exc):
+    """True para errores transitorios: 429, 5xx, 403 por rate limit y errores de red"""
+    if isinstance(exc, NETWORK_ERRORS):
+        return True
+    code = _status_code(exc)
+    if code in RETRYABLE_STATUS:
+        return True
+    # Drive reporta parte de sus límites como 403 (userRateLimitExceeded / rateLimitExceeded)
+    return code == 403 and 'ratelimitexceeded' in str(exc).lower()
+
+
+def is_rejected(exc):
+    """True si el API rechazó el request en sí (4xx no transitorio): reintentarlo no sirve"""
+    code = _status_code(exc)
+    return code is not None and 400 <= code < 500 and not is_retryable(exc)
+
+
+class TokenBucket:
+    """Token bucket thread-safe con reservas (los tokens pueden quedar en negativo)"""
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60.0
+        # Ráfaga de ~10 s de cuota para no exceder la ventana por minuto
+        self.capacity = max(1.0, per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Toma un token, durmiendo lo necesario. Retorna los segundos esperados."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class APIScheduler:
+    """Planificador compartido de llamadas a Google APIs"""
+
+    def __init__(self, quotas, max_retries, backoff_base, backoff_max,
+                 failure_threshold, cooldown, max_pause):
+        """
+        Args:
+            quotas (dict): {api: llamadas por minuto}
+            max_retries (int): Reintentos por llamada en errores transitorios
+            backoff_base (float): Primer intervalo de backoff (segundos)
+            backoff_max (float): Tope del backoff (segundos)
+            failure_threshold (int): Fallos agotados seguidos que abren el circuito
+            cooldown (float): Pausa inicial con el circuito abierto (se duplica)
+            max_pause (float): Pausa total máxima antes de lanzar CircuitOpenError
+        """
+        self.buckets = {api: TokenBucket(per_minute) for api, per_minute in quotas.items()}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_pause = max_pause
+
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.current_cooldown = cooldown
+        self.total_paused = 0.0
+        self.stats = {
+            api: {'calls': 0, 'retries': 0, 'failures': 0, 'throttle_wait': 0.0}
+            for api in quotas
+        }
+
+    def execute(self, api, request):
+        """Ejecuta un request de googleapiclient (request.execute())"""
+        return self.call(api, request.execute)
+
+    def call(self, api, func, *args, **kwargs):
+        """
+        Ejecuta func(*args, **kwargs) respetando cuota, reintentos y circuito.
+
+        Raises:
+            CircuitOpenError: si el circuito sigue abierto tras la pausa máxima
+            Exception: el error original si no es transitorio o se agotaron los reintentos
+        """
+        stats = self.stats[api]
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_circuit()
+            waited = self.buckets[api].acquire()
+            with self.lock:
+                stats['calls'] += 1
+                stats['throttle_wait'] += waited
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                if attempt == self.max_retries:
+                    self._record_failure(api)
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                with self.lock:
+                    stats['retries'] += 1
+                logger.warning(f"⚠️ {api}: {_status_code(e) or type(e).__name__}, "
+                               f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            self._record_success()
+            return result
+
+    def _record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.current_cooldown = self.cooldown
+            # El API se recuperó: la pausa máxima vuelve a contar desde cero
+            self.total_paused = 0.0
+
+    def _record_failure(self, api):
+        with self.lock:
+            self.stats[api]['failures'] += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.open_until = time.monotonic() + self.current_cooldown
+                logger.error(f"🔌 Circuit open after {self.consecutive_failures} failed calls, "
+                             f"pausing {self.current_cooldown:.0f}s")
+                self.current_cooldown = min(self.current_cooldown * 2, self.max_pause)
+
+    def _wait_for_circuit(self):
+        with self.lock:
+            pause = self.open_until - time.monotonic()
+            if pause <= 0:
+                return
+            if self.total_paused + pause > self.max_pause:
+                raise CircuitOpenError(
+                    f"Google APIs unavailable after {self.total_paused:.0f}s of pauses"
+                )
+            self.total_paused += pause
+        time.sleep(pause)
+
+    def log_summary(self):
+        for api, stats in self.stats.items():
+            if stats['calls']:
+                logger.info(
+                    f"📡 {api}: {stats['calls']} calls, {stats['retries']} retries, "
+                    f"{stats['failures']} failures, {stats['throttle_wait']:.1f}s throttled"
+                )
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    """Planificador compartido del proceso (cada worker del pool tiene el suyo)"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = APIScheduler(
+            API_QUOTAS,
+            API_MAX_RETRIES,
+            API_BACKOFF_BASE,
+            API_BACKOFF_MAX,
+            CIRCUIT_FAILURE_THRESHOLD,
+            CIRCUIT_COOLDOWN,
+            CIRCUIT_MAX_PAUSE,
+        )
+    return _scheduler
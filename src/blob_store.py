@@ -0,0 +1,144 @@
+"""
+Almacén local de imágenes direccionado por el md5Checksum de Drive.
+
+Permite saltarse descargas de archivos que ya tenemos (re-procesos de filas
+REVISION/ERROR, upgrades del motor OCR) y verificar la integridad de lo que
+sí se descarga. Tamaño acotado con desalojo del menos usado recientemente
+(la fecha de modificación se actualiza en cada lectura).
+
+El tamaño total se lleva en memoria (un recorrido del directorio al primer
+put) y solo se vuelve a recorrer para desalojar, bajando a BLOB_STORE_EVICT_TO
+del máximo para que un almacén lleno no se recorra en cada put.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from config import BLOB_STORE_EVICT_TO
+
+logger = logging.getLogger(__name__)
+
+
+def md5_hex(data):
+    return hashlib.md5(data).hexdigest()
+
+
+class BlobStore:
+    """Blobs en disco: <root>/<md5[:2]>/<md5>"""
+
+    def __init__(self, root, max_bytes, evict_to=BLOB_STORE_EVICT_TO):
+        """
+        Args:
+            root (str): Directorio raíz del almacén
+            max_bytes (int): Tamaño máximo total antes de desalojar
+            evict_to (float): Fracción de max_bytes hasta la que se desaloja
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.evict_to = evict_to
+        # Bytes en disco (None hasta el primer put); las descargas en hilos comparten el total
+        self._total = None
+        self._lock = threading.Lock()
+
+    def _path(self, md5):
+        return os.path.join(self.root, md5[:2], md5)
+
+    def get(self, md5):
+        """
+        Retorna los bytes guardados para md5, o None. Un blob corrupto
+        (contenido que ya no coincide con su md5) se descarta.
+        """
+        if not md5:
+            return None
+        path = self._path(md5)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        if md5_hex(data) != md5:
+            logger.warning(f"⚠️ Blob corrupto descartado: {md5}")
+            if self._remove(path):
+                self._add_size(-len(data))
+            return None
+
+        # Marcar como usado recientemente (orden LRU)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, md5, data):
+        """
+        Guarda data bajo md5 (escritura atómica). Lanza ValueError si el
+        contenido no coincide con el checksum.
+        """
+        if md5_hex(data) != md5:
+            raise ValueError(f"El contenido no coincide con md5Checksum {md5}")
+
+        path = self._path(md5)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            previous = os.path.getsize(path)
+        except FileNotFoundError:
+            previous = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan()[1]
+            else:
+                self._total += len(data) - previous
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _add_size(self, delta):
+        with self._lock:
+            if self._total is not None:
+                self._total += delta
+
+    def _scan(self):
+        """Recorre el almacén: ([(mtime, tamaño, ruta)], tamaño total)"""
+        entries = []
+        total = 0
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def _evict(self):
+        # Se recorre de nuevo: corrige el total si otro proceso tocó el directorio
+        entries, total = self._scan()
+        target = self.max_bytes * self.evict_to
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+        self._total = total
+        if evicted:
+            logger.debug(f"Blob store: {evicted} archivos desalojados (LRU)")
+
+    @staticmethod
+    def _remove(path):
+        """Borra un archivo; False si ya no existía"""
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,200 @@
+"""
+Corrección de CURPs leídas por OCR usando el dígito verificador.
+
+score_curp_candidate corrige cada carácter confundible (0/O, 1/I, 5/S, 8/B...)
+según la clase de su posición, sin mirar el resto de la CURP. Aquí se listan
+las alternativas de cada posición ambigua y se busca la combinación más
+probable (menos cambios respecto a esa lectura) que tenga fecha válida, sexo
+H/M, clave de entidad existente y dígito verificador correcto. La homoclave
+prefiere dígito para nacidos antes de 2000 y letra después.
+
+La búsqueda es una programación dinámica sobre el residuo módulo 10 de la suma
+ponderada del dígito verificador, con la tabla de aportes por posición y
+carácter precalculada: cada bloque de posiciones (letra, fecha + homoclave,
+entidad...) aporta sus combinaciones válidas y por residuo solo se conserva la
+de menor costo. El trabajo por candidato queda acotado por
+CURP_CORRECTION_MAX_COMBOS, así que puede correr sobre cada ventana.
+"""
+import itertools
+import logging
+
+from config import CURP_STATE_CODES, CURP_CORRECTION_MAX_COMBOS, CURP_CORRECTION_MAX_COST
+from src.curp_validator import CURP_CHAR_VALUES, VALID_YYMMDD
+
+logger = logging.getLogger(__name__)
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+DIGITS = '0123456789'
+
+# Confusiones típicas de Tesseract: carácter leído -> alternativas, la más
+# probable primero (coincide con COMMON_SUBS / NUM_SUBS de RobustExtractor)
+CONFUSABLE = {
+    '0': 'OQD', 'O': '0QD', 'Q': 'O0', 'D': 'O0',
+    '1': 'IL', 'I': '1L', 'L': 'I1', '|': 'I1', '/': 'I1', '!': 'I1',
+    '2': 'Z', 'Z': '2', '5': 'S', 'S': '5', '$': 'S5', '8': 'B', 'B': '8',
+    '6': 'G', 'G': '6', '7': 'T', 'T': '7', '4': 'A', 'A': '4', '(': 'C',
+}
+
+# Aporte (mod 10) de cada carácter en cada posición a la suma del dígito verificador
+CHECK_TABLE = [
+    {char: value * (18 - i) % 10 for char, value in CURP_CHAR_VALUES.items()}
+    for i in range(17)
+]
+
+# Bloques de posiciones que se validan juntos, en el orden de la búsqueda
+LETTER_POSITIONS = (0, 1, 2, 3, 13, 14, 15)
+DATE_POSITIONS = (4, 5, 6, 7, 8, 9)
+SEX_POSITION = 10
+STATE_POSITIONS = (11, 12)
+HOMOCLAVE_POSITION = 16
+CHECK_POSITION = 17
+
+STATE_CODES = frozenset(CURP_STATE_CODES)
+
+
+def options_for(char, allowed):
+    """
+    Alternativas de un carácter leído dentro de las permitidas en su posición.
+
+    Returns:
+        list: [(carácter, costo)] de la más a la menos probable; costo 0 para la
+              lectura (o su corrección obvia si no es válida ahí), 1 por cambio
+    """
+    alternatives = [c for c in CONFUSABLE.get(char, '') if c in allowed and c != char]
+    if char in allowed:
+        return [(char, 0)] + [(c, 1) for c in alternatives]
+    return [(c, int(k > 0)) for k, c in enumerate(alternatives)]
+
+
+def _trim(option_lists, max_combos):
+    """Descarta las alternativas menos probables hasta que el producto quepa en max_combos"""
+    option_lists = [list(options) for options in option_lists]
+    while True:
+        total = 1
+        for options in option_lists:
+            total *= len(options)
+        if total <= max_combos:
+            return option_lists
+        widest = max(option_lists, key=len)
+        widest.pop()
+
+
+def _block_combos(candidate):
+    """
+    Combinaciones válidas de cada bloque de posiciones.
+
+    Returns:
+        list: Por bloque, [(aporte mod 10, costo, ((pos, carácter), ...))];
+              None si alguna posición no tiene ninguna alternativa válida
+    """
+    blocks = []
+
+    for pos in LETTER_POSITIONS:
+        blocks.append([(CHECK_TABLE[pos][c], cost, ((pos, c),))
+                       for c, cost in options_for(candidate[pos], LETTERS)])
+
+    # Una N puede ser H o M por igual; H y M aportan lo mismo al dígito
+    # verificador, así que ese caso queda ambiguo
+    sex = candidate[SEX_POSITION]
+    sex_options = options_for(sex, 'HM') if sex != 'N' else [('H', 1), ('M', 1)]
+    blocks.append([(CHECK_TABLE[SEX_POSITION][c], cost, ((SEX_POSITION, c),))
+                   for c, cost in sex_options])
+
+    state_combos = []
+    state_options = _trim([options_for(candidate[pos], LETTERS) for pos in STATE_POSITIONS],
+                          CURP_CORRECTION_MAX_COMBOS)
+    for combo in itertools.product(*state_options):
+        if ''.join(c for c, _ in combo) in STATE_CODES:
+            state_combos.append((
+                sum(CHECK_TABLE[pos][c] for pos, (c, _) in zip(STATE_POSITIONS, combo)),
+                sum(cost for _, cost in combo),
+                tuple((pos, c) for pos, (c, _) in zip(STATE_POSITIONS, combo)),
+            ))
+    blocks.append(state_combos)
+
+    # Fecha y homoclave van juntas: el siglo decide si la homoclave es dígito o letra
+    date_combos = []
+    homoclave = candidate[HOMOCLAVE_POSITION]
+    date_options = _trim([options_for(candidate[pos], DIGITS) for pos in DATE_POSITIONS],
+                         CURP_CORRECTION_MAX_COMBOS)
+    for combo in itertools.product(*date_options):
+        yymmdd = ''.join(c for c, _ in combo)
+        if not VALID_YYMMDD[int(yymmdd)]:
+            continue
+        expected = DIGITS if int(yymmdd[:2]) > 30 else LETTERS
+        weight = sum(CHECK_TABLE[pos][c] for pos, (c, _) in zip(DATE_POSITIONS, combo))
+        cost = sum(cost for _, cost in combo)
+        assigned = tuple((pos, c) for pos, (c, _) in zip(DATE_POSITIONS, combo))
+        homoclave_options = options_for(homoclave, expected)
+        if homoclave.isalnum() and homoclave not in expected and homoclave in CURP_CHAR_VALUES:
+            # Homoclave fuera de la regla del siglo: se acepta, pero como cambio dudoso
+            homoclave_options.append((homoclave, 1))
+        for c, c_cost in homoclave_options:
+            date_combos.append((
+                weight + CHECK_TABLE[HOMOCLAVE_POSITION][c],
+                cost + c_cost,
+                assigned + ((HOMOCLAVE_POSITION, c),),
+            ))
+    blocks.append(date_combos)
+
+    if not all(blocks):
+        return None
+    return blocks
+
+
+def correct_curp(candidate):
+    """
+    Corrige una ventana de 18 caracteres a la CURP válida más probable.
+
+    Args:
+        candidate (str): Ventana de texto OCR en mayúsculas (18 caracteres)
+
+    Returns:
+        str: CURP con fecha, sexo, entidad y dígito verificador válidos, o None
+             si ninguna combinación con a lo más CURP_CORRECTION_MAX_COST
+             cambios los cumple o si hay dos igual de probables (ambigua)
+    """
+    if len(candidate) != 18:
+        return None
+    blocks = _block_combos(candidate)
+    if blocks is None:
+        return None
+
+    # residuo -> (costo, asignación, única con ese costo)
+    states = {0: (0, (), True)}
+    for combos in blocks:
+        merged = {}
+        for residue, (cost, assigned, unique) in states.items():
+            for weight, combo_cost, combo in combos:
+                total = cost + combo_cost
+                if total > CURP_CORRECTION_MAX_COST:
+                    continue
+                key = (residue + weight) % 10
+                current = merged.get(key)
+                if current is None or total < current[0]:
+                    merged[key] = (total, assigned + combo, unique)
+                elif total == current[0]:
+                    merged[key] = (current[0], current[1], False)
+        states = merged
+        if not states:
+            return None
+
+    # El dígito verificador cierra la suma: (10 - suma % 10) % 10
+    solutions = []
+    for digit, digit_cost in options_for(candidate[CHECK_POSITION], DIGITS):
+        state = states.get((10 - int(digit)) % 10)
+        if state and state[0] + digit_cost <= CURP_CORRECTION_MAX_COST:
+            solutions.append((state[0] + digit_cost, state[2], state[1] + ((CHECK_POSITION, digit),)))
+    if not solutions:
+        return None
+
+    best_cost = min(cost for cost, _, _ in solutions)
+    best = [solution for solution in solutions if solution[0] == best_cost]
+    if len(best) > 1 or not best[0][1]:
+        logger.debug(f"CURP ambigua tras corrección: {candidate}")
+        return None
+
+    corrected = list(candidate)
+    for pos, char in best[0][2]:
+        corrected[pos] = char
+    return ''.join(corrected)
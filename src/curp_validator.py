@@ -1,14 +1,104 @@
 """
 Módulo de validación de CURP con cálculo de dígito verificador
 """
+import calendar
 import re
 import logging
+from dataclasses import dataclass
 from datetime import datetime
 
-from config import CURP_REGEX
+import numpy as np
+
+from config import CURP_REGEX, CURP_STATE_CODES
 
 logger = logging.getLogger(__name__)
 
+CURP_PATTERN = re.compile(CURP_REGEX)
+
+# Valores de cada carácter para el dígito verificador
+CURP_CHAR_VALUES = {
+    '0': 0, '1': 1, '2': 2, '3': 3, '4': 4,
+    '5': 5, '6': 6, '7': 7, '8': 8, '9': 9,
+    'A': 10, 'B': 11, 'C': 12, 'D': 13, 'E': 14,
+    'F': 15, 'G': 16, 'H': 17, 'I': 18, 'J': 19,
+    'K': 20, 'L': 21, 'M': 22, 'N': 23, 'Ñ': 24,
+    'O': 25, 'P': 26, 'Q': 27, 'R': 28, 'S': 29,
+    'T': 30, 'U': 31, 'V': 32, 'W': 33, 'X': 34,
+    'Y': 35, 'Z': 36
+}
+
+# Tablas para validate_curps, indexadas por código de carácter en uint8. Los
+# caracteres fuera de ASCII se reubican según su upper(): en su código si es
+# ASCII, un dígito Unicode (que \d e int() aceptan) en 128 + su valor, un
+# espacio o lo que cambia de largo con upper() ('ß' → 'SS') en _NORMALIZE_CODE
+# y cualquier otro en _OTHER_CODE
+_UNICODE_DIGIT_CODE, _NORMALIZE_CODE, _OTHER_CODE = 128, 254, 255
+# _NORMALIZE: la fila necesita upper().strip() de Python antes de validarse
+_LETTER, _DIGIT, _UNICODE_DIGIT, _NORMALIZE = 1, 2, 4, 8
+_CLASS_LUT = np.zeros(256, dtype=np.uint8)
+_CLASS_LUT[ord('A'):ord('Z') + 1] = _LETTER
+_CLASS_LUT[ord('0'):ord('9') + 1] = _DIGIT
+_CLASS_LUT[_UNICODE_DIGIT_CODE:_UNICODE_DIGIT_CODE + 10] = _UNICODE_DIGIT
+_CLASS_LUT[[ord(c) for c in map(chr, range(128)) if c.isspace()] + [_NORMALIZE_CODE]] = _NORMALIZE
+
+_UPPER_LUT = np.arange(256, dtype=np.uint8)
+_UPPER_LUT[ord('a'):ord('z') + 1] -= ord('a') - ord('A')
+
+_DIGIT_VALUE_LUT = np.zeros(256, dtype=np.int32)
+_DIGIT_VALUE_LUT[ord('0'):ord('9') + 1] = range(10)
+_DIGIT_VALUE_LUT[_UNICODE_DIGIT_CODE:_UNICODE_DIGIT_CODE + 10] = range(10)
+
+# Clase esperada por posición (mismo formato que CURP_REGEX); la 10 además debe ser H/M
+_NUMBER = _DIGIT | _UNICODE_DIGIT
+_EXPECTED_CLASS = [_LETTER] * 4 + [_NUMBER] * 6 + [_LETTER] * 6 + [_LETTER | _DIGIT, _NUMBER]
+
+# Aporte (mod 10) de cada carácter en cada posición a la suma del dígito verificador
+# (0 para lo que no está en CURP_CHAR_VALUES, como calculate_curp_check_digit)
+_CHECK_LUT = np.zeros((17, 256), dtype=np.uint8)
+for _char, _value in CURP_CHAR_VALUES.items():
+    if ord(_char) < 128:
+        _CHECK_LUT[:, ord(_char)] = [_value * (18 - i) % 10 for i in range(17)]
+# Suma de aportes (< 256) -> código del dígito verificador esperado
+_CHECK_DIGIT_LUT = np.array([ord('0') + (10 - total % 10) % 10 for total in range(256)], dtype=np.uint8)
+
+_DATE_WEIGHTS = (100000, 10000, 1000, 100, 10, 1)
+
+# Clave de entidad: [letra1, letra2] -> existe
+_STATE_LUT = np.zeros((256, 256), dtype=bool)
+for _state in CURP_STATE_CODES:
+    _STATE_LUT[ord(_state[0]), ord(_state[1])] = True
+
+# Fechas YYMMDD válidas, mismo criterio de siglo que validate_curp_date
+VALID_YYMMDD = np.zeros(1000000, dtype=bool)
+for _yy in range(100):
+    _year = 1900 + _yy if _yy > 30 else 2000 + _yy
+    for _month in range(1, 13):
+        _first = _yy * 10000 + _month * 100 + 1
+        VALID_YYMMDD[_first:_first + calendar.monthrange(_year, _month)[1]] = True
+
+# Códigos de motivo de validate_curps
+REASON_OK, REASON_EMPTY, REASON_FORMAT, REASON_DATE, REASON_STATE, REASON_CHECK_DIGIT = range(6)
+REASON_MESSAGES = (
+    "CURP válida", "CURP vacía", "Formato inválido", "Fecha inválida",
+    "Entidad inválida", "Dígito verificador incorrecto",
+)
+# Confianza por motivo (la misma que da validate_curp_complete)
+_REASON_CONFIDENCE = np.array([1.0, 0.0, 0.0, 0.3, 0.4, 0.6], dtype=np.float32)
+
+
+@dataclass
+class CurpValidation:
+    """Resultado columnar de validate_curps (un elemento por CURP de entrada)"""
+    valid: np.ndarray       # bool
+    confidence: np.ndarray  # float32, 0.0 - 1.0
+    reason: np.ndarray      # uint8, REASON_*
+
+    def __len__(self):
+        return len(self.valid)
+
+    def message(self, i):
+        return REASON_MESSAGES[self.reason[i]]
+
 
 def extract_curp_from_text(text):
     """
@@ -27,7 +117,7 @@ def extract_curp_from_text(text):
     text_clean = text.upper().strip()
     
     # Buscar todas las coincidencias
-    matches = re.findall(CURP_REGEX, text_clean)
+    matches = CURP_PATTERN.findall(text_clean)
     
     if matches:
         logger.debug(f"CURPs encontradas: {matches}")
@@ -48,7 +138,7 @@ def validate_curp_format(curp):
     if not curp or len(curp) != 18:
         return False
     
-    return bool(re.match(CURP_REGEX, curp.upper()))
+    return bool(CURP_PATTERN.match(curp.upper()))
 
 
 def validate_curp_date(curp):
@@ -111,18 +201,6 @@ def calculate_curp_check_digit(curp):
     if len(curp) < 17:
         return None
     
-    # Diccionario de valores para caracteres
-    char_values = {
-        '0': 0, '1': 1, '2': 2, '3': 3, '4': 4,
-        '5': 5, '6': 6, '7': 7, '8': 8, '9': 9,
-        'A': 10, 'B': 11, 'C': 12, 'D': 13, 'E': 14,
-        'F': 15, 'G': 16, 'H': 17, 'I': 18, 'J': 19,
-        'K': 20, 'L': 21, 'M': 22, 'N': 23, 'Ñ': 24,
-        'O': 25, 'P': 26, 'Q': 27, 'R': 28, 'S': 29,
-        'T': 30, 'U': 31, 'V': 32, 'W': 33, 'X': 34,
-        'Y': 35, 'Z': 36
-    }
-    
     try:
         # Tomar solo los primeros 17 caracteres
         curp_17 = curp[:17].upper()
@@ -131,7 +209,7 @@ def calculate_curp_check_digit(curp):
         total = 0
         for i, char in enumerate(curp_17):
             position = 18 - i  # Posición descendente
-            value = char_values.get(char, 0)
+            value = CURP_CHAR_VALUES.get(char, 0)
             total += value * position
         
         # Calcular dígito verificador
@@ -186,6 +264,106 @@ def validate_curp_complete(curp):
     return True, 1.0, "CURP válida"
 
 
+def _unicode_code(char):
+    """Código uint8 con el que se valida un carácter fuera de ASCII"""
+    upper = char.upper()
+    if len(upper) != 1 or upper.isspace():
+        return _NORMALIZE_CODE
+    if ord(upper) < 128:
+        return ord(upper)
+    if upper.isdecimal():
+        return _UNICODE_DIGIT_CODE + int(upper)
+    return _OTHER_CODE
+
+
+def _validate_codes(curps, check_state):
+    """
+    Validación vectorizada de CURPs.
+
+    Returns:
+        tuple: (reason por CURP, filas que necesitan upper().strip() (espacios o
+                caracteres que cambian de largo con upper()), filas vacías)
+    """
+    count = len(curps)
+    # 19 caracteres: lo que no cabe ya no es de largo 18
+    codes = np.array(curps, dtype='<U19').view(np.uint32).reshape(count, 19)
+    empty = codes[:, 0] == 0
+
+    high = codes > 127
+    if high.any():
+        unique, inverse = np.unique(codes[high], return_inverse=True)
+        codes[high] = np.array([_unicode_code(chr(code)) for code in unique], dtype=np.uint32)[inverse]
+    # Una fila de uint8 por posición (contiguas para los lookups), en mayúsculas
+    cols = _UPPER_LUT[np.ascontiguousarray(codes.astype(np.uint8).T)]
+
+    # 1. Formato: largo 18, clase de cada posición y sexo H/M. Una fila de 19+
+    # caracteres sin espacios sigue siendo de 19+ tras upper().strip(): no se normaliza
+    normalize = _CLASS_LUT[cols[18]] == _NORMALIZE
+    format_ok = cols[18] == 0
+    for pos, expected in enumerate(_EXPECTED_CLASS):
+        classes = _CLASS_LUT[cols[pos]]
+        normalize |= (classes & _NORMALIZE) != 0
+        format_ok &= (classes & expected) != 0
+    format_ok &= (cols[10] == ord('H')) | (cols[10] == ord('M'))
+
+    # 2. Fecha YYMMDD
+    yymmdd = np.zeros(count, dtype=np.int32)
+    for pos, weight in zip(range(4, 10), _DATE_WEIGHTS):
+        yymmdd += _DIGIT_VALUE_LUT[cols[pos]] * weight
+    date_ok = format_ok & VALID_YYMMDD[yymmdd]
+
+    # 3. Entidad (opcional)
+    state_ok = date_ok & _STATE_LUT[cols[11], cols[12]] if check_state else date_ok
+
+    # 4. Dígito verificador
+    total = np.zeros(count, dtype=np.uint8)
+    for pos in range(17):
+        total += _CHECK_LUT[pos][cols[pos]]
+    check_ok = state_ok & (_CHECK_DIGIT_LUT[total] == cols[17])
+
+    reason = np.full(count, REASON_CHECK_DIGIT, dtype=np.uint8)
+    reason[~state_ok] = REASON_STATE
+    reason[~date_ok] = REASON_DATE
+    reason[~format_ok] = REASON_FORMAT
+    reason[check_ok] = REASON_OK
+    return reason, normalize & ~empty, empty
+
+
+def validate_curps(curps, check_state=False):
+    """
+    Validación completa de muchas CURPs a la vez (auditorías del Sheet,
+    deduplicación). Mismo criterio que validate_curp_complete, pero con
+    tablas precalculadas y operaciones sobre todo el lote con NumPy.
+
+    Args:
+        curps (iterable): CURPs (str o None)
+        check_state (bool): Además exigir una clave de entidad de
+            CURP_STATE_CODES (validate_curp_complete no la revisa)
+
+    Returns:
+        CurpValidation: valid, confidence y reason (REASON_*) por CURP
+    """
+    filled = [curp or '' for curp in curps]
+    reason, normalize, empty = _validate_codes(filled, check_state)
+
+    # Espacios, texto largo o mayúsculas que cambian de largo: la misma
+    # normalización que validate_curp_complete y otra pasada solo para esas filas
+    rows = np.flatnonzero(normalize)
+    if rows.size:
+        normalized = [filled[i].upper().strip() for i in rows]
+        reason[rows] = _validate_codes(normalized, check_state)[0]
+
+    reason[empty] = REASON_EMPTY
+    # NumPy recorta los '\x00' finales de cada fila: se marcan aparte (nunca son válidas)
+    if '\x00' in ''.join(filled):
+        reason[[i for i, curp in enumerate(filled) if '\x00' in curp]] = REASON_FORMAT
+    return CurpValidation(
+        valid=reason == REASON_OK,
+        confidence=_REASON_CONFIDENCE[reason],
+        reason=reason,
+    )
+
+
 def extract_info_from_curp(curp):
     """
     Extrae información de una CURP válida.
@@ -0,0 +1,171 @@
+"""
+Índice nombre → archivo de Drive para la carpeta ENTRADAS.
+
+Sustituye la búsqueda global `name = '...'` por fila: se construye con un
+único listado paginado de ENTRADAS, se persiste entre ejecuciones y se
+refresca de forma incremental con el Changes API de Drive. A diferencia de un
+filtro por modifiedTime, los cambios incluyen archivos movidos o copiados a
+ENTRADAS (conservan su modifiedTime) y los que salieron de la carpeta, se
+mandaron a la papelera o se borraron, que se quitan del índice.
+
+Se vuelve a listar la carpeta completa si no hay token de cambios (primera
+ejecución o índice de una versión anterior), si el API lo rechaza, o si un
+archivo pendiente sigue sin aparecer después de aplicar los cambios.
+"""
+import json
+import logging
+import os
+import tempfile
+
+from config import FOLDER_ENTRADA_NAME, ROOT_FOLDER_NAME
+
+logger = logging.getLogger(__name__)
+
+INDEX_FIELDS = 'id, name, md5Checksum, size, modifiedTime'
+# En un cambio hace falta además saber si el archivo sigue en ENTRADAS
+CHANGE_FIELDS = INDEX_FIELDS + ', parents, trashed'
+
+
+class DriveFileIndex:
+    """Índice persistente de los archivos de ENTRADAS por nombre"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Archivo JSON donde se persiste el índice
+        """
+        self.path = path
+        self.folder_id = None
+        self.page_token = None  # Changes API: cambios posteriores a la última sincronización
+        self.files = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Índice de Drive ilegible, se reconstruye: {e}")
+            return
+
+        self.folder_id = data.get('folder_id')
+        self.page_token = data.get('page_token')
+        self.files = data.get('files', {})
+
+    def save(self):
+        """Escritura atómica del índice"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({
+                'folder_id': self.folder_id,
+                'page_token': self.page_token,
+                'files': self.files,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, drive_manager, filenames=()):
+        """
+        Sincroniza el índice con Drive: un listado completo la primera vez y
+        solo los cambios desde page_token en las siguientes.
+
+        Args:
+            drive_manager: DriveManager (se usa initialize_folders solo si el
+                           ID de ENTRADAS no está ya persistido)
+            filenames (iterable): Archivos que se van a buscar; si alguno no
+                                  aparece con los cambios se relista la carpeta
+
+        Returns:
+            bool: True si el índice quedó sincronizado
+        """
+        folder_key = FOLDER_ENTRADA_NAME.lower()
+        if self.folder_id:
+            drive_manager.folder_ids.setdefault(folder_key, self.folder_id)
+        elif drive_manager.initialize_folders(ROOT_FOLDER_NAME):
+            self.folder_id = drive_manager.folder_ids[folder_key]
+        else:
+            return False
+
+        if self.page_token and self._apply_changes(drive_manager):
+            missing = [name for name in filenames if name not in self.files]
+            if not missing:
+                self.save()
+                return True
+            logger.info(f"🗂️ {len(missing)} archivos pendientes no están en el índice, "
+                        f"se relista {FOLDER_ENTRADA_NAME}")
+        return self._relist(drive_manager)
+
+    def _relist(self, drive_manager):
+        """Reconstruye el índice con un listado completo de ENTRADAS"""
+        # Token antes del listado: lo que cambie mientras se lista llega en la siguiente
+        token = drive_manager.get_changes_start_token()
+        files = drive_manager.list_all_files(FOLDER_ENTRADA_NAME, INDEX_FIELDS)
+        if files is None:
+            return False
+
+        self.files = {}
+        for file in files:
+            self._add(file)
+        self.page_token = token
+
+        logger.info(f"🗂️ Índice de Drive: {len(self.files)} archivos (listado completo)")
+        self.save()
+        return True
+
+    def _apply_changes(self, drive_manager):
+        """
+        Aplica los cambios desde page_token.
+
+        Returns:
+            bool: False si no se pudieron obtener (hay que relistar)
+        """
+        changes, token = drive_manager.list_changes(self.page_token, CHANGE_FIELDS)
+        if changes is None:
+            return False
+
+        names = {meta['id']: name for name, meta in self.files.items()}
+        updated = pruned = 0
+        for change in changes:
+            file = change.get('file') or {}
+            in_folder = (not change.get('removed') and not file.get('trashed')
+                         and self.folder_id in file.get('parents', []))
+            name = names.pop(change['fileId'], None)
+            if name is not None and (not in_folder or file['name'] != name):
+                # Borrado, en la papelera, movido fuera de ENTRADAS o renombrado
+                del self.files[name]
+                pruned += 1
+            if in_folder:
+                self._add(file)
+                names[file['id']] = file['name']
+                updated += 1
+        self.page_token = token
+
+        logger.info(f"🗂️ Índice de Drive: {len(self.files)} archivos "
+                    f"({updated} nuevos/modificados, {pruned} descartados)")
+        return True
+
+    def _add(self, file):
+        name = file['name']
+        current = self.files.get(name)
+        if current and current['id'] != file['id']:
+            logger.warning(f"⚠️ Nombre duplicado en {FOLDER_ENTRADA_NAME}: '{name}', se usa el más reciente")
+            if current.get('modifiedTime', '') > file['modifiedTime']:
+                return
+        self.files[name] = {
+            'id': file['id'],
+            'md5Checksum': file.get('md5Checksum'),
+            'size': file.get('size'),
+            'modifiedTime': file['modifiedTime'],
+        }
+
+    def lookup(self, filename):
+        """Metadata del archivo ({'id', 'md5Checksum', ...}) o None"""
+        return self.files.get(filename)
+
+    def forget(self, filename):
+        """Descarta una entrada obsoleta (ej: el archivo ya no se puede descargar)"""
+        self.files.pop(filename, None)
@@ -6,6 +6,10 @@ import logging
 from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
 from googleapiclient.errors import HttpError
 
+from src.api_scheduler import get_scheduler
+from src.blob_store import md5_hex
+from src.run_profile import span
+
 from config import (
     FOLDER_ENTRADA_NAME,
     FOLDER_PROCESADAS_NAME,
@@ -19,16 +23,23 @@ logger = logging.getLogger(__name__)
 class DriveManager:
     """Gestor de operaciones con Google Drive"""
     
-    def __init__(self, service):
+    def __init__(self, service, blob_store=None):
         """
         Inicializa el gestor de Drive.
         
         Args:
             service: Servicio de Google Drive API
+            blob_store: BlobStore opcional (descargas por md5Checksum)
         """
         self.service = service
+        self.blob_store = blob_store
+        self.scheduler = get_scheduler()
         self.folder_ids = {}
         
+    def _execute(self, request):
+        """Ejecuta un request de Drive a través del planificador compartido"""
+        return self.scheduler.execute('drive', request)
+    
     def find_folder_by_name(self, folder_name, parent_id=None):
         """
         Busca una carpeta por nombre.
@@ -46,11 +57,11 @@ class DriveManager:
             if parent_id:
                 query += f" and '{parent_id}' in parents"
             
-            results = self.service.files().list(
+            results = self._execute(self.service.files().list(
                 q=query,
                 spaces='drive',
                 fields='files(id, name)'
-            ).execute()
+            ))
             
             items = results.get('files', [])
             
@@ -127,12 +138,12 @@ class DriveManager:
         try:
             query = f"'{folder_id}' in parents and trashed=false and mimeType contains 'image/'"
             
-            results = self.service.files().list(
+            results = self._execute(self.service.files().list(
                 q=query,
                 pageSize=max_files,
-                fields='files(id, name, mimeType, createdTime, size)',
+                fields='files(id, name, mimeType, createdTime, size, md5Checksum)',
                 orderBy='createdTime'
-            ).execute()
+            ))
             
             files = results.get('files', [])
             logger.info(f"📁 {len(files)} archivos encontrados en '{folder_name}'")
@@ -143,6 +154,104 @@ class DriveManager:
             logger.error(f"❌ Error al listar archivos en '{folder_name}': {e}")
             return []
     
+    def list_all_files(self, folder_name, fields, modified_after=None):
+        """
+        Lista TODOS los archivos de una carpeta paginando (pageSize máximo),
+        pidiendo solo los campos indicados.
+        
+        Args:
+            folder_name (str): Nombre de la carpeta (entrada, procesadas, etc.)
+            fields (str): Campos por archivo (ej: 'id, name, md5Checksum')
+            modified_after (str, optional): RFC 3339; solo archivos modificados después
+        
+        Returns:
+            list: Lista de diccionarios con info de archivos (None si hubo error)
+        """
+        folder_key = folder_name.lower()
+        folder_id = self.folder_ids.get(folder_key)
+        
+        if not folder_id:
+            logger.error(f"❌ Carpeta '{folder_name}' no inicializada")
+            return None
+        
+        query = f"'{folder_id}' in parents and trashed=false"
+        if modified_after:
+            query += f" and modifiedTime > '{modified_after}'"
+        
+        files = []
+        page_token = None
+        calls = 0
+        try:
+            while True:
+                results = self._execute(self.service.files().list(
+                    q=query,
+                    pageSize=1000,
+                    pageToken=page_token,
+                    fields=f'nextPageToken, files({fields})'
+                ))
+                calls += 1
+                files.extend(results.get('files', []))
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
+        except HttpError as e:
+            logger.error(f"❌ Error al listar archivos en '{folder_name}': {e}")
+            return None
+        
+        logger.info(f"📁 {len(files)} archivos listados en '{folder_name}' ({calls} llamadas)")
+        return files
+    
+    def get_changes_start_token(self):
+        """
+        Token del Changes API a partir del cual list_changes reporta cambios.
+        
+        Returns:
+            str: startPageToken, None si hubo error
+        """
+        try:
+            results = self._execute(self.service.changes().getStartPageToken())
+            return results['startPageToken']
+        except HttpError as e:
+            logger.error(f"❌ Error al obtener el token de cambios de Drive: {e}")
+            return None
+    
+    def list_changes(self, page_token, fields):
+        """
+        Lista TODOS los cambios desde page_token paginando: altas, ediciones,
+        movimientos entre carpetas, papelera y borrados definitivos.
+        
+        Args:
+            page_token (str): Token de get_changes_start_token o de la llamada anterior
+            fields (str): Campos del archivo en cada cambio (ej: 'id, name, parents')
+        
+        Returns:
+            tuple: (lista de cambios {'fileId', 'removed', 'file'}, token para la
+                   siguiente llamada), o (None, None) si hubo error (ej: token vencido)
+        """
+        changes = []
+        calls = 0
+        try:
+            while True:
+                results = self._execute(self.service.changes().list(
+                    pageToken=page_token,
+                    pageSize=1000,
+                    includeRemoved=True,
+                    spaces='drive',
+                    fields=f'nextPageToken, newStartPageToken, changes(fileId, removed, file({fields}))'
+                ))
+                calls += 1
+                changes.extend(results.get('changes', []))
+                if 'newStartPageToken' in results:
+                    page_token = results['newStartPageToken']
+                    break
+                page_token = results['nextPageToken']
+        except HttpError as e:
+            logger.error(f"❌ Error al listar cambios de Drive: {e}")
+            return None, None
+        
+        logger.info(f"🔄 {len(changes)} cambios en Drive ({calls} llamadas)")
+        return changes, page_token
+    
     def find_file_by_name(self, filename, folder_name):
         """
         Busca un archivo específico por nombre en una carpeta.
@@ -166,11 +275,11 @@ class DriveManager:
             escaped_filename = filename.replace("'", "\\'")
             query = f"name='{escaped_filename}' and '{folder_id}' in parents and trashed=false"
             
-            results = self.service.files().list(
+            results = self._execute(self.service.files().list(
                 q=query,
                 pageSize=1,
-                fields='files(id, name, mimeType, createdTime, size)'
-            ).execute()
+                fields='files(id, name, mimeType, createdTime, size, md5Checksum)'
+            ))
             
             files = results.get('files', [])
             
@@ -183,33 +292,79 @@ class DriveManager:
             logger.error(f"❌ Error al buscar archivo '{filename}' en '{folder_name}': {e}")
             return None
     
-    def download_file(self, file_id, destination_path):
+    def download_bytes(self, file_id, md5_checksum=None):
         """
-        Descarga un archivo de Drive.
+        Descarga un archivo de Drive a memoria.
+        
+        Si se conoce su md5Checksum y el blob ya está en el almacén local,
+        no hay transferencia de red. Lo descargado se verifica contra el
+        checksum y se guarda en el almacén.
         
         Args:
             file_id (str): ID del archivo en Drive
-            destination_path (str): Ruta local donde guardar el archivo
+            md5_checksum (str, optional): md5Checksum de la metadata de Drive
         
         Returns:
-            bool: True si la descarga fue exitosa
+            bytes: Contenido del archivo, None si falló la descarga
         """
-        try:
-            request = self.service.files().get_media(fileId=file_id)
-            
-            with io.FileIO(destination_path, 'wb') as fh:
-                downloader = MediaIoBaseDownload(fh, request)
-                done = False
+        if self.blob_store and md5_checksum:
+            data = self.blob_store.get(md5_checksum)
+            if data is not None:
+                logger.debug(f"✅ Archivo {file_id} servido desde blob store ({md5_checksum})")
+                return data
+        
+        # Un reintento si el contenido llega corrupto
+        for attempt in range(2):
+            try:
+                with span('download'):
+                    request = self.service.files().get_media(fileId=file_id)
+                    buffer = io.BytesIO()
+                    downloader = MediaIoBaseDownload(buffer, request)
+                    done = False
+                    
+                    while not done:
+                        status, done = self.scheduler.call('drive', downloader.next_chunk)
                 
-                while not done:
-                    status, done = downloader.next_chunk()
+            except HttpError as e:
+                logger.error(f"❌ Error al descargar archivo {file_id}: {e}")
+                return None
             
-            logger.debug(f"✅ Archivo descargado: {destination_path}")
-            return True
+            data = buffer.getvalue()
+            if not md5_checksum:
+                return data
             
-        except HttpError as e:
-            logger.error(f"❌ Error al descargar archivo {file_id}: {e}")
+            if md5_hex(data) == md5_checksum:
+                if self.blob_store:
+                    self.blob_store.put(md5_checksum, data)
+                return data
+            
+            logger.warning(f"⚠️ Checksum incorrecto al descargar {file_id} (intento {attempt + 1})")
+        
+        logger.error(f"❌ Archivo {file_id} no coincide con md5Checksum {md5_checksum}")
+        return None
+    
+    def download_file(self, file_id, destination_path, md5_checksum=None):
+        """
+        Descarga un archivo de Drive.
+        
+        Args:
+            file_id (str): ID del archivo en Drive
+            destination_path (str): Ruta local donde guardar el archivo
+            md5_checksum (str, optional): md5Checksum de Drive (habilita blob store
+                                          y verificación de integridad)
+        
+        Returns:
+            bool: True si la descarga fue exitosa
+        """
+        data = self.download_bytes(file_id, md5_checksum)
+        if data is None:
             return False
+        
+        with open(destination_path, 'wb') as fh:
+            fh.write(data)
+        
+        logger.debug(f"✅ Archivo descargado: {destination_path}")
+        return True
     
     def move_file(self, file_id, destination_folder_name):
         """
@@ -231,20 +386,20 @@ class DriveManager:
         
         try:
             # Obtener padres actuales
-            file = self.service.files().get(
+            file = self._execute(self.service.files().get(
                 fileId=file_id,
                 fields='parents'
-            ).execute()
+            ))
             
             previous_parents = ",".join(file.get('parents', []))
             
             # Mover archivo
-            self.service.files().update(
+            self._execute(self.service.files().update(
                 fileId=file_id,
                 addParents=destination_folder_id,
                 removeParents=previous_parents,
                 fields='id, parents'
-            ).execute()
+            ))
             
             logger.debug(f"✅ Archivo {file_id} movido a '{destination_folder_name}'")
             return True
@@ -4,9 +4,11 @@ Adapta el motor de OCR robusto (ocr_engine.py) a la interfaz requerida por INESh
 """
 import logging
 from dataclasses import dataclass
-from src.ocr_engine import extract_text_hybrid
+from src.ocr_engine import extract_text_hybrid, extract_text_hybrid_batch, verify_curp_hint
 from src.robust_extractor import RobustExtractor
-from src.curp_validator import extract_info_from_curp
+from src.curp_validator import extract_info_from_curp, validate_curp_complete
+from config import CURP_UNVERIFIED_MAX_CONFIDENCE
+from src.run_profile import span
 
 logger = logging.getLogger(__name__)
 
@@ -19,17 +21,26 @@ class INEOCRProcessor:
     def __init__(self, debug=False):
         self.debug = debug
 
-    def process_ine_image(self, image_path=None, raw_text=None):
+    def process_ine_image(self, image_path=None, raw_text=None, image=None, curp_hint=None):
         """
         Procesa una imagen de INE y retorna datos estructurados.
         
         Args:
             image_path (str): Ruta al archivo de imagen.
             raw_text (str): Texto crudo (opcional, ignorado si se pasa image_path para usar Zonal OCR).
+            image (numpy.ndarray): Imagen ya decodificada (alternativa a image_path,
+                                   evita escribir/leer archivos temporales).
+            curp_hint (str): CURP leída por la app de captura (opcional). Si se
+                             confirma, no se corre el OCR híbrido completo.
             
         Returns:
             dict: Resultados estructurados con confianza.
         """
+        if curp_hint and (image is not None or image_path):
+            results = self.verify_curp_hint(image if image is not None else image_path, curp_hint)
+            if results:
+                return results
+
         # 1. Ejecutar OCR Híbrido (Zonal + Preprocessing)
         # Si se pasa image_path, extract_text_hybrid usará Zonal OCR.
         # Si solo se pasa raw_text (caso legacy), no podemos usar Zonal.
@@ -38,14 +49,67 @@ class INEOCRProcessor:
         confidence = 0.0
         text_to_process = raw_text or ""
         
-        if image_path:
-            text_to_process, confidence, strategy = extract_text_hybrid(None, image_path=image_path)
+        if image is not None or image_path:
+            text_to_process, confidence, strategy = extract_text_hybrid(image, image_path=image_path)
         
+        return self._build_results(text_to_process, confidence, strategy)
+
+    def verify_curp_hint(self, image, curp_hint):
+        """
+        Valida la CURP sugerida (formato, fecha y dígito verificador) y la
+        confirma con un solo OCR zonal restringido a la línea de la CURP.
+        
+        Args:
+            image: Ruta al archivo o ndarray ya decodificado.
+            curp_hint (str): CURP candidata.
+            
+        Returns:
+            dict: Resultados como process_ine_image, o None si no se confirmó.
+        """
+        try:
+            output = verify_curp_hint(image, curp_hint)
+        except Exception as e:
+            logger.warning(f"⚠️ CURP hint verification failed: {e}")
+            return None
+        return self._build_results(*output) if output else None
+
+    def process_ine_images(self, images):
+        """
+        Versión por lote de process_ine_image: el OCR zonal de todas las
+        imágenes se hace en una sola invocación de Tesseract.
+        
+        Args:
+            images (list): Rutas a los archivos de imagen o ndarrays decodificados.
+            
+        Returns:
+            list: Por cada imagen, el dict de process_ine_image o la
+                  excepción que la hizo fallar.
+        """
+        outputs = []
+        for output in extract_text_hybrid_batch(images):
+            if isinstance(output, Exception):
+                outputs.append(output)
+            else:
+                outputs.append(self._build_results(*output))
+        return outputs
+
+    def _build_results(self, text_to_process, confidence, strategy):
+        """Extrae entidades del texto OCR y arma el dict de resultados"""
         # 2. Extraer Entidades usando RobustExtractor
         # CURP
-        curp = RobustExtractor.find_curp_fuzzy(text_to_process)
+        with span('extract'):
+            curp = RobustExtractor.find_curp_fuzzy(text_to_process)
         curp_conf = confidence if curp else 0.0
         
+        # Sin CURP válida (formato, fecha y dígito verificador) el
+        # resultado no puede quedar COMPLETADO: se manda a REVISION
+        valid, _, message = validate_curp_complete(curp or "")
+        if not valid:
+            if curp:
+                logger.warning(f"⚠️ CURP extraída no válida ({message}): {curp}")
+            confidence = min(confidence, CURP_UNVERIFIED_MAX_CONFIDENCE)
+            curp_conf = min(curp_conf, CURP_UNVERIFIED_MAX_CONFIDENCE)
+        
         # Info derivada de CURP
         sexo = ""
         fecha_nacimiento = ""
@@ -5,6 +5,8 @@ Punto de entrada para GitHub Actions.
 import os
 import sys
 import logging
+import argparse
+import signal
 import tempfile
 from pathlib import Path
 
@@ -12,7 +14,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.sheets_manager import INESheetsManager
-from config import LOG_FILE, LOG_FORMAT, LOG_LEVEL
+from config import (
+    LOG_FILE, LOG_FORMAT, LOG_LEVEL, OCR_WORKERS, OCR_BATCH_SIZE, MAX_FILES_PER_RUN, RUN_TIME_BUDGET,
+    WATCH_POLL_MIN, WATCH_POLL_MAX, WATCH_POLL_BACKOFF
+)
 
 # Configurar logging
 logging.basicConfig(
@@ -25,11 +30,89 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main():
+def parse_row_list(value):
+    """'15,20-23' -> [15, 20, 21, 22, 23]"""
+    rows = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            rows.extend(range(int(first), int(last) + 1))
+        else:
+            rows.append(int(part))
+    return rows
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline OCR de INE (Drive -> OCR -> Sheets)")
+    parser.add_argument('--retry-rows', type=parse_row_list, default=[],
+                        help="Filas a reprocesar aunque estén bajo la marca de agua (ej: 15,20-23)")
+    parser.add_argument('--full-scan', action='store_true',
+                        help="Ignorar la marca de agua y revisar toda la hoja")
+    parser.add_argument('--shard-index', type=int,
+                        default=int(os.environ.get('OCR_SHARD_INDEX', 0)),
+                        help="Shard de esta instancia, 0..shard-count-1 (env: OCR_SHARD_INDEX)")
+    parser.add_argument('--shard-count', type=int,
+                        default=int(os.environ.get('OCR_SHARD_COUNT', 1)),
+                        help="Total de instancias en paralelo (env: OCR_SHARD_COUNT)")
+    parser.add_argument('--watch', action='store_true',
+                        help="Modo daemon: mantener clientes y motor OCR cargados y sondear la hoja")
+    args = parser.parse_args(argv)
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index must be between 0 and --shard-count - 1")
+    return args
+
+def next_poll_interval(interval, rows, max_files):
+    """
+    Intervalo de sondeo adaptativo del modo daemon.
+
+    Args:
+        interval (float): Intervalo actual (segundos)
+        rows (int): Filas procesadas en el último ciclo
+        max_files (int): Tope de filas por ciclo
+
+    Returns:
+        float: Segundos a esperar antes del siguiente ciclo
+    """
+    if rows >= max_files:
+        return 0  # Quedan más filas: seguir sin esperar
+    if rows:
+        return WATCH_POLL_MIN
+    return min(WATCH_POLL_MAX, max(interval, WATCH_POLL_MIN) * WATCH_POLL_BACKOFF)
+
+def run_daemon(manager, **run_kwargs):
+    """
+    Procesa la hoja en ciclos hasta recibir SIGTERM/SIGINT. Los clientes
+    autenticados, el motor OCR y el pool de procesos se reutilizan.
+    Al recibir la señal se terminan las filas en vuelo y se sale.
+    """
+    def request_stop(signum, frame):
+        logger.info(f"🛑 Received {signal.Signals(signum).name}, finishing in-flight rows...")
+        manager.stop_requested.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    logger.info(f"👀 Watch mode: polling every {WATCH_POLL_MIN}-{WATCH_POLL_MAX}s")
+    interval = WATCH_POLL_MIN
+    while not manager.stop_requested.is_set():
+        rows = manager.process_pending_rows(**run_kwargs)
+        interval = next_poll_interval(interval, rows, run_kwargs['max_files'])
+        if interval:
+            logger.debug(f"Next poll in {interval:.0f}s")
+        # wait() regresa en cuanto llega la señal
+        manager.stop_requested.wait(interval)
+    logger.info("👋 Watch mode stopped")
+
+def main(argv=None):
     """
     Entry point para GitHub Actions.
     """
+    args = parse_args(argv)
     logger.info("🚀 Starting OCR Pipeline (Professional Architecture)")
+    if args.shard_count > 1:
+        logger.info(f"🧩 Shard {args.shard_index + 1}/{args.shard_count}")
     
     # Obtener credentials desde env variable o archivo
     # En local, usamos el archivo directo. En GitHub Actions, la variable de entorno.
@@ -54,13 +137,35 @@ def main():
             is_temp_creds = True
             
     sheet_name = os.environ.get('SPREADSHEET_NAME', 'REGISTRO_INE') # Usar nombre por defecto o variable
+    workers = int(os.environ.get('OCR_WORKERS', OCR_WORKERS))
+    batch_size = int(os.environ.get('OCR_BATCH_SIZE', OCR_BATCH_SIZE))
+    max_files = int(os.environ.get('MAX_FILES_PER_RUN', MAX_FILES_PER_RUN))
+    time_budget = float(os.environ.get('RUN_TIME_BUDGET', RUN_TIME_BUDGET))
     
     try:
         # Inicializar manager
-        manager = INESheetsManager(creds_path, sheet_name)
+        manager = INESheetsManager(
+            creds_path, sheet_name, worker_id=os.environ.get('OCR_WORKER_ID'),
+            shard_index=args.shard_index, shard_count=args.shard_count,
+            prometheus_path=os.environ.get('OCR_PROMETHEUS_TEXTFILE')
+        )
+        
+        if args.full_scan:
+            manager.scanner.reset()
+        if args.retry_rows:
+            manager.scanner.flag_for_retry(args.retry_rows)
         
-        # Procesar pending rows
-        manager.process_pending_rows()
+        run_kwargs = dict(
+            workers=workers, batch_size=batch_size, max_files=max_files, time_budget=time_budget
+        )
+        try:
+            if args.watch:
+                run_daemon(manager, **run_kwargs)
+            else:
+                # Procesar pending rows
+                manager.process_pending_rows(**run_kwargs)
+        finally:
+            manager.close()
         
         logger.info("✅ Pipeline execution completed")
         
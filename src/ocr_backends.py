@@ -0,0 +1,183 @@
+"""
+Backends de Tesseract intercambiables para OCREngine.
+
+- PytesseractBackend: usa el binario `tesseract` (un subproceso + archivo
+  temporal + carga de spa.traineddata por llamada). Es el comportamiento
+  histórico y no requiere nada extra.
+- TesserocrBackend: usa libtesseract en el mismo proceso mediante `tesserocr`.
+  Mantiene un handle TessBaseAPI caliente por (idioma, oem) y por hilo, y le
+  pasa los buffers numpy directamente, sin archivos temporales.
+"""
+import logging
+import os
+import shlex
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pytesseract
+
+from config import OCR_BACKEND
+
+try:
+    import tesserocr
+except ImportError:  # Dependencia opcional (requiere libtesseract-dev)
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+# Columnas de la salida TSV de Tesseract (mismo formato que pytesseract.image_to_data)
+TSV_COLUMNS = [
+    'level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+    'left', 'top', 'width', 'height', 'conf', 'text'
+]
+
+
+def parse_tesseract_config(config):
+    """
+    Separa un string de configuración estilo CLI ('--oem 3 --psm 6 -l spa
+    -c var=valor') en sus componentes.
+
+    Returns:
+        dict: {'lang', 'oem', 'psm', 'variables'}
+    """
+    parsed = {'lang': 'eng', 'oem': 3, 'psm': 3, 'variables': {}}
+    tokens = shlex.split(config or '')
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        value = tokens[i + 1] if i + 1 < len(tokens) else None
+        if token == '-l':
+            parsed['lang'] = value
+        elif token == '--oem':
+            parsed['oem'] = int(value)
+        elif token == '--psm':
+            parsed['psm'] = int(value)
+        elif token == '-c' and value and '=' in value:
+            name, var_value = value.split('=', 1)
+            parsed['variables'][name] = var_value
+        else:
+            i += 1
+            continue
+        i += 2
+    return parsed
+
+
+class OCRBackend(ABC):
+    """Interfaz mínima que OCREngine necesita de Tesseract"""
+
+    name = 'base'
+
+    @abstractmethod
+    def image_to_string(self, image, config):
+        """Retorna el texto reconocido en la imagen"""
+
+    @abstractmethod
+    def image_to_data(self, image, config):
+        """Retorna un dict con las columnas de TSV_COLUMNS (como Output.DICT)"""
+
+
+class PytesseractBackend(OCRBackend):
+    """Backend CLI: un proceso `tesseract` por llamada"""
+
+    name = 'pytesseract'
+
+    def image_to_string(self, image, config):
+        return pytesseract.image_to_string(image, config=config)
+
+    def image_to_data(self, image, config):
+        return pytesseract.image_to_data(
+            image, config=config, output_type=pytesseract.Output.DICT
+        )
+
+
+class TesserocrBackend(OCRBackend):
+    """Backend en proceso: handles TessBaseAPI persistentes por worker"""
+
+    name = 'tesserocr'
+
+    def __init__(self):
+        if tesserocr is None:
+            raise ImportError("tesserocr no está instalado")
+        self._local = threading.local()
+
+    def _get_api(self, lang, oem):
+        """Handle caliente para (lang, oem) en este proceso/hilo"""
+        # Tras un fork los handles heredados no se reutilizan
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.pid = os.getpid()
+            self._local.apis = {}
+
+        key = (lang, oem)
+        api = self._local.apis.get(key)
+        if api is None:
+            logger.debug(f"Inicializando TessBaseAPI (lang={lang}, oem={oem})")
+            api = tesserocr.PyTessBaseAPI(lang=lang, oem=oem)
+            self._local.apis[key] = api
+        return api
+
+    def _run(self, image, config, read):
+        parsed = parse_tesseract_config(config)
+        api = self._get_api(parsed['lang'], parsed['oem'])
+        api.SetPageSegMode(parsed['psm'])
+
+        # Las variables -c son por llamada: restaurar al terminar para no
+        # contaminar el handle compartido
+        previous = {}
+        for name, value in parsed['variables'].items():
+            previous[name] = api.GetVariableAsString(name)
+            api.SetVariable(name, value)
+
+        try:
+            image = np.ascontiguousarray(image)
+            height, width = image.shape[:2]
+            channels = 1 if image.ndim == 2 else image.shape[2]
+            if channels == 3:
+                # OpenCV entrega BGR; Tesseract espera RGB
+                image = np.ascontiguousarray(image[:, :, ::-1])
+            api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+            return read(api)
+        finally:
+            for name, value in previous.items():
+                api.SetVariable(name, value or '')
+            api.Clear()
+
+    def image_to_string(self, image, config):
+        return self._run(image, config, lambda api: api.GetUTF8Text())
+
+    def image_to_data(self, image, config):
+        tsv = self._run(image, config, lambda api: api.GetTSVText(0))
+        data = {column: [] for column in TSV_COLUMNS}
+        for line in tsv.splitlines():
+            values = line.split('\t')
+            if len(values) < len(TSV_COLUMNS) - 1:
+                continue
+            if len(values) == len(TSV_COLUMNS) - 1:
+                values.append('')  # Filas de bloque/línea no traen texto
+            for column, value in zip(TSV_COLUMNS[:-1], values):
+                data[column].append(float(value) if column == 'conf' else int(value))
+            data['text'].append(values[-1])
+        return data
+
+
+BACKENDS = {
+    PytesseractBackend.name: PytesseractBackend,
+    TesserocrBackend.name: TesserocrBackend,
+}
+
+_backend_instances = {}
+
+
+def get_backend(name=None):
+    """
+    Retorna (y cachea) el backend indicado o el de config.OCR_BACKEND.
+    Si tesserocr no está disponible se usa pytesseract.
+    """
+    name = name or OCR_BACKEND
+    if name not in _backend_instances:
+        try:
+            _backend_instances[name] = BACKENDS[name]()
+        except ImportError as e:
+            logger.warning(f"⚠️ Backend OCR '{name}' no disponible ({e}), usando pytesseract")
+            return get_backend(PytesseractBackend.name)
+    return _backend_instances[name]
@@ -0,0 +1,162 @@
+"""
+Caché persistente de resultados OCR direccionada por contenido.
+
+Clave: SHA-256 de los bytes descargados + huella de la versión/config del
+motor OCR. Valor: el resultado completo de INEOCRProcessor.process_ine_image.
+Se guarda en un único archivo SQLite para poder llevarlo entre ejecuciones
+de GitHub Actions (actions/cache). Desalojo LRU acotado por tamaño.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from config import (
+    OCR_CACHE_VERSION,
+    OCR_BACKEND,
+    OCR_ROI_FIRST,
+    OCR_SINGLE_PASS,
+    TESSERACT_CONFIG,
+    CURP_CORRECTION_MAX_COST,
+    CURP_CORRECTION_MAX_COMBOS,
+    CURP_CORRECTION_MAX_WINDOWS,
+)
+from src.ine_processor import Field
+from src.ocr_engine import ZONAL_TESSERACT_CONFIG, engine
+
+logger = logging.getLogger(__name__)
+
+
+def engine_fingerprint():
+    """
+    Huella de todo lo que cambia el resultado del OCR. Si cambia la config
+    (o se incrementa OCR_CACHE_VERSION) las entradas anteriores dejan de usarse.
+    """
+    parts = {
+        'version': OCR_CACHE_VERSION,
+        'backend': OCR_BACKEND,
+        'roi_first': OCR_ROI_FIRST,
+        'single_pass': OCR_SINGLE_PASS,
+        'config': TESSERACT_CONFIG,
+        'zonal_config': ZONAL_TESSERACT_CONFIG,
+        'zones': engine.ZONES,
+        # La CURP extraída depende también de la corrección por dígito verificador
+        'curp_correction': [CURP_CORRECTION_MAX_COST, CURP_CORRECTION_MAX_COMBOS,
+                            CURP_CORRECTION_MAX_WINDOWS],
+    }
+    encoded = json.dumps(parts, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def results_to_json(results):
+    """Serializa un resultado de process_ine_image (los Field a [valor, confianza])"""
+    data = dict(results)
+    data['fields'] = {
+        name: [field.value, field.confidence]
+        for name, field in results['fields'].items()
+    }
+    return json.dumps(data, ensure_ascii=False)
+
+
+def results_from_json(payload):
+    data = json.loads(payload)
+    data['fields'] = {
+        name: Field(value, confidence)
+        for name, (value, confidence) in data['fields'].items()
+    }
+    return data
+
+
+class OCRResultCache:
+    """Caché SQLite de resultados OCR por hash de imagen (LRU acotado)"""
+
+    def __init__(self, path, max_bytes, fingerprint=None):
+        """
+        Args:
+            path (str): Archivo SQLite
+            max_bytes (int): Tamaño máximo de los valores guardados
+            fingerprint (str): Versión del motor (default: engine_fingerprint())
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint or engine_fingerprint()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # Una conexión por proceso (los workers del pool abren la suya)
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS ocr_results ('
+                ' key TEXT PRIMARY KEY,'
+                ' payload TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' ocr_seconds REAL NOT NULL,'
+                ' last_used REAL NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_ocr_results_last_used'
+                ' ON ocr_results(last_used)'
+            )
+            self._conn.commit()
+            self._pid = os.getpid()
+        return self._conn
+
+    def key_for(self, image_bytes):
+        """Clave de caché para los bytes de una imagen"""
+        return f"{self.fingerprint}:{hashlib.sha256(image_bytes).hexdigest()}"
+
+    def get(self, key):
+        """
+        Returns:
+            tuple: (resultado, segundos de OCR que costó) o (None, 0.0)
+        """
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                'SELECT payload, ocr_seconds FROM ocr_results WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None, 0.0
+            conn.execute('UPDATE ocr_results SET last_used = ? WHERE key = ?', (time.time(), key))
+            conn.commit()
+            return results_from_json(row[0]), row[1]
+        except Exception as e:
+            logger.warning(f"⚠️ Error leyendo caché OCR: {e}")
+            return None, 0.0
+
+    def put(self, key, results, ocr_seconds):
+        """Guarda un resultado y aplica el desalojo LRU si se excede max_bytes"""
+        try:
+            payload = results_to_json(results)
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO ocr_results VALUES (?, ?, ?, ?, ?)',
+                (key, payload, len(payload), ocr_seconds, time.time())
+            )
+            self._evict(conn)
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Error escribiendo caché OCR: {e}")
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM ocr_results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM ocr_results ORDER BY last_used'):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        conn.executemany('DELETE FROM ocr_results WHERE key = ?', victims)
+        logger.debug(f"Caché OCR: {len(victims)} entradas desalojadas (LRU)")
@@ -3,17 +3,153 @@ Módulo de OCR Profesional para INE/IFE
 Implementa arquitectura robusta: Preprocessing -> Zonal OCR -> Validation -> Fallback
 """
 import logging
+import os
+import shlex
+import subprocess
+import tempfile
 import cv2
 import numpy as np
 import pytesseract
 import re
 from PIL import Image
-from config import TESSERACT_CONFIG, TESSERACT_CONFIG_SPARSE
+from config import (
+    TESSERACT_CONFIG, TESSERACT_CONFIG_SPARSE, OCR_SINGLE_PASS, OCR_ROI_FIRST, IMAGE_TIMEOUT,
+    CURP_HINT_MAX_MISMATCHES, CURP_HINT_PARTIAL_CONFIDENCE
+)
+from src.curp_validator import CURP_CHAR_VALUES, validate_curp_complete
+from src.ocr_backends import PytesseractBackend, get_backend
+from src.run_profile import span
 
 logger = logging.getLogger(__name__)
 
+# OCR Configuration optimizada para campo único
+# PSM 6 (Block of text) o 7 (Single line)
+ZONAL_TESSERACT_CONFIG = '--oem 3 --psm 6 -l spa'
+
+# Verificación de la CURP sugerida por la app de captura: solo caracteres de CURP
+CURP_HINT_TESSERACT_CONFIG = (
+    ZONAL_TESSERACT_CONFIG + ' -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+)
+
+# Confusiones típicas de OCR: se comparan como el mismo carácter
+_OCR_CONFUSIONS = str.maketrans('01L58264', 'OIISBZGA')
+
+
+def _check_digit_detects(hint, pos, char):
+    """
+    True si cambiar hint[pos] por char altera el dígito verificador, es decir,
+    si la CURP sugerida (válida) y esa lectura no pueden ser ambas correctas.
+    """
+    if pos == 17:
+        return True
+    if char not in CURP_CHAR_VALUES:
+        return False
+    return (CURP_CHAR_VALUES[char] - CURP_CHAR_VALUES[hint[pos]]) * (18 - pos) % 10 != 0
+
+
+def hint_mismatches(text, hint, max_mismatches=CURP_HINT_MAX_MISMATCHES):
+    """
+    Compara la CURP sugerida (ya validada) con las ventanas de 18 caracteres
+    del texto OCR, tolerando confusiones típicas (0/O, 1/I/L, ...). Cada
+    carácter distinto cuenta para max_mismatches y solo se tolera si el
+    dígito verificador lo detecta: si no, la sugerida podría ser la errónea.
+
+    Returns:
+        int: Caracteres distintos de la mejor ventana (0 = coincidencia exacta),
+             o None si ninguna ventana la confirma
+    """
+    clean = re.sub(r'[^A-Z0-9]', '', text.upper())
+    if hint in clean:
+        return 0
+
+    normalized = clean.translate(_OCR_CONFUSIONS)
+    target = hint.translate(_OCR_CONFUSIONS)
+    best = None
+    for start in range(len(normalized) - len(target) + 1):
+        window = normalized[start:start + len(target)]
+        differing = [pos for pos, (a, b) in enumerate(zip(window, target)) if a != b]
+        if len(differing) > max_mismatches or (best is not None and len(differing) >= best):
+            continue
+        if all(_check_digit_detects(hint, pos, clean[start + pos]) for pos in differing):
+            best = len(differing)
+    return best
+
+
+def decode_image_bytes(data):
+    """
+    Decodifica un JPEG/PNG en memoria directamente a escala de grises
+    (única decodificación; el pipeline no usa color).
+
+    Returns:
+        numpy.ndarray o None si los bytes no son una imagen válida
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE)
+
+
+def describe_image(image):
+    """Texto corto para logs: ruta o dimensiones del ndarray"""
+    if isinstance(image, np.ndarray):
+        return f"imagen en memoria {image.shape[1]}x{image.shape[0]}"
+    return image
+
+
+def tesseract_batch_to_string(images, config):
+    """
+    Corre UNA sola invocación del binario tesseract sobre varias imágenes
+    (archivo de lista) y separa la salida por página.
+
+    Tesseract escribe un único .txt donde cada página termina con el
+    separador de página (form feed), así que el texto de cada imagen es
+    idéntico al de image_to_string individual; solo se amortiza el arranque
+    del proceso y la carga del modelo.
+
+    Args:
+        images (list): Imágenes numpy (ya preprocesadas/recortadas)
+        config (str): Configuración CLI (ej: '--oem 3 --psm 6 -l spa')
+
+    Returns:
+        list: Texto de cada imagen, en el mismo orden
+    """
+    with tempfile.TemporaryDirectory(prefix='ocr_batch_') as tmp_dir:
+        image_paths = []
+        for i, image in enumerate(images):
+            path = os.path.join(tmp_dir, f'{i:05d}.png')
+            if not cv2.imwrite(path, image):
+                raise ValueError(f"No se pudo escribir la imagen {i} del lote")
+            image_paths.append(path)
+
+        list_path = os.path.join(tmp_dir, 'images.txt')
+        with open(list_path, 'w') as f:
+            f.write('\n'.join(image_paths) + '\n')
+
+        output_base = os.path.join(tmp_dir, 'output')
+        cmd = [pytesseract.pytesseract.tesseract_cmd, list_path, output_base]
+        cmd += shlex.split(config) + ['-c', 'page_separator=\f']
+        subprocess.run(cmd, check=True, capture_output=True, timeout=IMAGE_TIMEOUT * len(images))
+
+        with open(output_base + '.txt', encoding='utf-8') as f:
+            output = f.read()
+
+    pages = output.split('\f')
+    if len(pages) < len(images):
+        raise ValueError(f"Tesseract devolvió {len(pages)} páginas para {len(images)} imágenes")
+    return pages[:len(images)]
+
 class OCREngine:
-    def __init__(self):
+    def __init__(self, single_pass=OCR_SINGLE_PASS, backend=None, roi_first=OCR_ROI_FIRST):
+        # roi_first: recortar zonas de la imagen cruda y mejorar solo las ROI
+        self.roi_first = roi_first
+
+        # backend: implementación de Tesseract (ver src/ocr_backends.py)
+        self.backend = backend or get_backend()
+
+        # single_pass: una sola pasada image_to_data de página completa;
+        # la búsqueda zonal y el fallback se resuelven sobre las mismas cajas
+        self.single_pass = single_pass
+
         # Definición de Zonas (Porcentajes del tamaño de imagen)
         # Basado en análisis de INE Tipo E/G/H
         self.ZONES = {
@@ -27,72 +163,143 @@ class OCREngine:
             }
         }
     
-    def preprocess_image(self, image_path):
+    def load_grayscale(self, image):
         """
-        Pipeline de preprocesamiento profesional:
-        1. Grayscale
-        2. CLAHE (Mejora contraste local)
-        3. Bilateral Filter (Reducción ruido preservando bordes)
-        4. Upscaling 2x (Mejora resolución para Tesseract)
+        Imagen cruda en escala de grises (sin mejoras). None si falla.
+
+        Args:
+            image: Ruta al archivo o ndarray ya decodificado (BGR o grayscale)
         """
-        try:
-            # 1. Cargar y Grayscale
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"No se pudo leer la imagen: {image_path}")
-                
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # 2. CLAHE (Contrast Limited Adaptive Histogram Equalization)
+        if isinstance(image, np.ndarray):
+            if image.ndim == 2:
+                return image
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        img = cv2.imread(image)
+        if img is None:
+            logger.error(f"❌ Error en preprocesamiento: No se pudo leer la imagen: {image}")
+            return None
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    def enhance(self, gray):
+        """
+        Mejoras para Tesseract sobre una imagen (o ROI) en escala de grises:
+        1. CLAHE (Mejora contraste local)
+        2. Bilateral Filter (Reducción ruido preservando bordes)
+        3. Upscaling 2x (Mejora resolución para Tesseract)
+        """
+        with span('preprocess'):
+            # 1. CLAHE (Contrast Limited Adaptive Histogram Equalization)
             clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
             enhanced = clahe.apply(gray)
             
-            # 3. Bilateral Filter (Remueve ruido del sensor del teléfono)
+            # 2. Bilateral Filter (Remueve ruido del sensor del teléfono)
             # d=9, sigmaColor=75, sigmaSpace=75 son valores estándar buenos
             denoised = cv2.bilateralFilter(enhanced, 9, 75, 75)
             
-            # 4. Upscaling 2x
+            # 3. Upscaling 2x
             height, width = denoised.shape[:2]
             upscaled = cv2.resize(denoised, (width * 2, height * 2), interpolation=cv2.INTER_CUBIC)
-            
-            # 5. Thresholding suave (Opcional, a veces ayuda, a veces no. 
-            # Tesseract hace su propio thresholding, pero Otsu puede ayudar a limpiar fondos complejos)
-            # _, binary = cv2.threshold(upscaled, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            return upscaled # Retornamos upscaled (grayscale mejorado), dejamos que Tesseract binarice
+        
+        # 4. Thresholding suave (Opcional, a veces ayuda, a veces no. 
+        # Tesseract hace su propio thresholding, pero Otsu puede ayudar a limpiar fondos complejos)
+        # _, binary = cv2.threshold(upscaled, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        
+        return upscaled # Retornamos upscaled (grayscale mejorado), dejamos que Tesseract binarice
+
+    def preprocess_image(self, image):
+        """
+        Pipeline de preprocesamiento profesional sobre la imagen completa:
+        Grayscale + enhance() (CLAHE, Bilateral, Upscaling 2x)
+
+        Args:
+            image: Ruta al archivo o ndarray ya decodificado
+        """
+        try:
+            gray = self.load_grayscale(image)
+            if gray is None:
+                return None
+            return self.enhance(gray)
             
         except Exception as e:
             logger.error(f"❌ Error en preprocesamiento: {e}")
             return None
 
+    def preprocess_zone(self, gray, zone_key):
+        """
+        ROI-first: recorta la zona de la imagen cruda y solo entonces aplica
+        enhance(). El resultado aproxima crop_zone(preprocess_image(...))
+        pero filtra y escala únicamente los pixeles de la zona.
+        """
+        try:
+            return self.enhance(self.crop_zone(gray, zone_key))
+        except Exception as e:
+            logger.error(f"❌ Error en preprocesamiento de zona ({zone_key}): {e}")
+            return None
+
+    def _zone_box(self, h, w, zone_key):
+        """Convierte una zona porcentual a coordenadas en pixeles (x1, y1, x2, y2)"""
+        zone = self.ZONES[zone_key]
+        return (
+            int(w * zone['x_min']), int(h * zone['y_min']),
+            int(w * zone['x_max']), int(h * zone['y_max'])
+        )
+
     def extract_zonal(self, image, zone_key):
         """Extrae texto de una zona específica definida en self.ZONES"""
         if image is None:
             return ""
             
         try:
-            h, w = image.shape[:2]
-            zone = self.ZONES[zone_key]
-            
-            y1 = int(h * zone['y_min'])
-            y2 = int(h * zone['y_max'])
-            x1 = int(w * zone['x_min'])
-            x2 = int(w * zone['x_max'])
-            
-            # Crop
-            roi = image[y1:y2, x1:x2]
-            
-            # OCR Configuration optimizada para campo único
-            # PSM 6 (Block of text) o 7 (Single line)
-            config = '--oem 3 --psm 6 -l spa'
-            
-            text = pytesseract.image_to_string(roi, config=config)
-            return text.strip()
+            return self.ocr_zone(self.crop_zone(image, zone_key))
             
         except Exception as e:
             logger.error(f"❌ Error en extracción zonal ({zone_key}): {e}")
             return ""
 
+    def ocr_zone(self, roi):
+        """OCR de un recorte de zona ya preprocesado"""
+        try:
+            with span('tesseract_zonal'):
+                text = self.backend.image_to_string(roi, ZONAL_TESSERACT_CONFIG)
+            return text.strip()
+        except Exception as e:
+            logger.error(f"❌ Error en OCR zonal: {e}")
+            return ""
+
+    def read_page_data(self, image):
+        """
+        Una sola pasada de Tesseract sobre la página completa conservando
+        las cajas de cada palabra (image_to_data).
+        """
+        with span('tesseract_page'):
+            return self.backend.image_to_data(image, TESSERACT_CONFIG)
+
+    @staticmethod
+    def words_to_text(data, box=None):
+        """
+        Reconstruye texto (una línea por línea de Tesseract) a partir de la
+        salida de image_to_data.
+
+        Args:
+            data (dict): Salida de image_to_data (Output.DICT)
+            box (tuple): (x1, y1, x2, y2) opcional; solo se conservan las
+                         palabras cuyo centro cae dentro de la caja
+        """
+        lines = {}
+        for i, word in enumerate(data['text']):
+            word = word.strip()
+            if not word:
+                continue
+            if box:
+                cx = data['left'][i] + data['width'][i] / 2
+                cy = data['top'][i] + data['height'][i] / 2
+                if not (box[0] <= cx < box[2] and box[1] <= cy < box[3]):
+                    continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append(word)
+        return '\n'.join(' '.join(words) for words in lines.values())
+
     def validate_curp(self, text):
         """Valida si un texto parece una CURP válida y retorna score"""
         if not text:
@@ -125,28 +332,17 @@ class OCREngine:
         
         return None, 0.0
 
-    def process_file(self, image_path):
-        """
-        Método principal: Orquesta todo el proceso
-        Returns: dict con resultados
-        """
-        logger.info(f"🔄 Procesando {image_path} con Motor Robusto...")
-        
-        # 1. Preprocessing
-        processed_img = self.preprocess_image(image_path)
-        if processed_img is None:
-            return {'error': 'Preprocessing failed'}
-            
-        results = {
+    @staticmethod
+    def _empty_results():
+        return {
             'curp': None,
             'confidence': 0.0,
             'strategy': 'None',
             'raw_text': ''
         }
-        
-        # 2. Estrategia A: Zonal OCR (La preferida)
-        logger.debug("   Estrategia A: Zonal OCR")
-        zonal_text = self.extract_zonal(processed_img, 'CURP')
+
+    def _accept_zonal(self, zonal_text, results):
+        """Estrategia A: aplica el texto zonal a results. True si resolvió la CURP."""
         curp, conf = self.validate_curp(zonal_text)
         
         if curp and conf > 0.6:
@@ -155,11 +351,11 @@ class OCREngine:
             results['confidence'] = conf
             results['strategy'] = 'Zonal'
             results['raw_text'] = zonal_text
-            return results
-            
-        # 3. Estrategia B: Full Image OCR (Fallback)
-        logger.debug("   Estrategia B: Full Image OCR")
-        full_text = pytesseract.image_to_string(processed_img, config=TESSERACT_CONFIG)
+            return True
+        return False
+
+    def _apply_full_text(self, full_text, results):
+        """Estrategia B: aplica el texto de página completa a results"""
         curp_full, conf_full = self.validate_curp(full_text)
         
         if curp_full:
@@ -179,17 +375,230 @@ class OCREngine:
         
         return results
 
+    def _full_page_fallback(self, processed_img, results):
+        """Estrategia B: Full Image OCR (Fallback)"""
+        logger.debug("   Estrategia B: Full Image OCR")
+        with span('tesseract_full'):
+            full_text = self.backend.image_to_string(processed_img, TESSERACT_CONFIG)
+        return self._apply_full_text(full_text, results)
+
+    def verify_curp_hint(self, image, curp_hint):
+        """
+        Camino rápido: confirma una CURP sugerida (ej: la que leyó la app de
+        captura) con un solo OCR zonal restringido a caracteres de CURP.
+
+        Args:
+            image: Ruta al archivo o ndarray ya decodificado
+            curp_hint (str): CURP candidata
+
+        Returns:
+            dict: Resultados (mismo formato que process_file) si se confirmó,
+                  None si hay que correr el proceso completo
+        """
+        curp = (curp_hint or '').upper().strip()
+        valid, _, message = validate_curp_complete(curp)
+        if not valid:
+            logger.info(f"   Hint de CURP descartado ({message})")
+            return None
+
+        gray = self.load_grayscale(image)
+        if gray is None:
+            return None
+        roi = self.preprocess_zone(gray, 'CURP')
+        if roi is None:
+            return None
+
+        try:
+            with span('tesseract_hint'):
+                zonal_text = self.backend.image_to_string(roi, CURP_HINT_TESSERACT_CONFIG).strip()
+        except Exception as e:
+            logger.error(f"❌ Error en OCR de verificación: {e}")
+            return None
+
+        mismatches = hint_mismatches(zonal_text, curp)
+        if mismatches is None:
+            logger.info(f"   Hint de CURP no confirmado por OCR zonal: {curp}")
+            return None
+
+        if mismatches:
+            # Coincidencia parcial: la CURP es plausible pero no se confirmó exacta
+            logger.info(f"   ⚠️ CURP sugerida confirmada con {mismatches} diferencia(s): {curp}")
+            return {
+                'curp': curp,
+                'confidence': CURP_HINT_PARTIAL_CONFIDENCE,
+                'strategy': 'Hint_Partial',
+                'raw_text': zonal_text
+            }
+
+        logger.info(f"   ✅ CURP sugerida confirmada por Zonal: {curp}")
+        return {
+            'curp': curp,
+            'confidence': 1.0,
+            'strategy': 'Hint_Verified',
+            'raw_text': zonal_text
+        }
+
+    def process_file(self, image):
+        """
+        Método principal: Orquesta todo el proceso
+
+        Args:
+            image: Ruta al archivo o ndarray ya decodificado (sin pasar por disco)
+
+        Returns: dict con resultados
+        """
+        logger.info(f"🔄 Procesando {describe_image(image)} con Motor Robusto...")
+        
+        if self.roi_first and not self.single_pass:
+            return self._process_roi_first(image)
+        
+        # 1. Preprocessing
+        processed_img = self.preprocess_image(image)
+        if processed_img is None:
+            return {'error': 'Preprocessing failed'}
+            
+        results = self._empty_results()
+        
+        if self.single_pass:
+            return self._process_single_pass(processed_img, results)
+
+        # 2. Estrategia A: Zonal OCR (La preferida)
+        logger.debug("   Estrategia A: Zonal OCR")
+        zonal_text = self.extract_zonal(processed_img, 'CURP')
+        if self._accept_zonal(zonal_text, results):
+            return results
+            
+        # 3. Estrategia B: Full Image OCR (Fallback)
+        return self._full_page_fallback(processed_img, results)
+
+    def _process_roi_first(self, image):
+        """
+        Variante de process_file que preprocesa solo la zona CURP; la imagen
+        completa se mejora y escala únicamente si se llega al fallback.
+        """
+        gray = self.load_grayscale(image)
+        if gray is None:
+            return {'error': 'Preprocessing failed'}
+        
+        results = self._empty_results()
+        
+        # 1-2. Preprocessing de la ROI + Estrategia A: Zonal OCR
+        logger.debug("   Estrategia A: Zonal OCR (ROI-first)")
+        roi = self.preprocess_zone(gray, 'CURP')
+        if roi is not None:
+            zonal_text = self.ocr_zone(roi)
+            if self._accept_zonal(zonal_text, results):
+                return results
+        
+        # 3. Estrategia B: Full Image OCR (preprocesamiento completo, perezoso)
+        try:
+            processed_img = self.enhance(gray)
+        except Exception as e:
+            logger.error(f"❌ Error en preprocesamiento: {e}")
+            return {'error': 'Preprocessing failed'}
+        return self._full_page_fallback(processed_img, results)
+
+    def _process_single_pass(self, processed_img, results):
+        """
+        Variante de process_file con una sola llamada a Tesseract:
+        Zonal y Full_Fallback se evalúan sobre el mismo image_to_data.
+        """
+        logger.debug("   Single pass: image_to_data (página completa)")
+        data = self.read_page_data(processed_img)
+        
+        # Estrategia A: palabras dentro de la zona CURP
+        h, w = processed_img.shape[:2]
+        zonal_text = self.words_to_text(data, self._zone_box(h, w, 'CURP'))
+        if self._accept_zonal(zonal_text, results):
+            return results
+        
+        # Estrategia B: texto completo de la misma pasada
+        return self._apply_full_text(self.words_to_text(data), results)
+
+    def crop_zone(self, image, zone_key):
+        """Recorta (sin OCR) la zona indicada de una imagen preprocesada"""
+        h, w = image.shape[:2]
+        x1, y1, x2, y2 = self._zone_box(h, w, zone_key)
+        return image[y1:y2, x1:x2]
+
+    def extract_zonal_batch(self, crops):
+        """
+        OCR zonal de muchos recortes (ver crop_zone) a la vez. Con el backend
+        CLI se usa una sola invocación de tesseract para todos.
+
+        Returns:
+            list: Texto de cada recorte (mismo orden)
+        """
+        with span('tesseract_zonal'):
+            if isinstance(self.backend, PytesseractBackend) and len(crops) > 1:
+                try:
+                    texts = tesseract_batch_to_string(crops, ZONAL_TESSERACT_CONFIG)
+                    return [text.strip() for text in texts]
+                except Exception as e:
+                    logger.warning(f"⚠️ OCR por lote falló ({e}), procesando imagen por imagen")
+
+            return [self.backend.image_to_string(crop, ZONAL_TESSERACT_CONFIG).strip() for crop in crops]
+
+    def process_batch(self, images):
+        """
+        Versión por lote de process_file para backfills: los recortes de la
+        zona CURP de todas las imágenes se leen en una sola llamada; solo las
+        que no resuelven por Zonal pasan al fallback individual.
+
+        Args:
+            images (list): Rutas o ndarrays ya decodificados
+
+        Returns:
+            list: Un dict de resultados por imagen (mismo formato que process_file)
+        """
+        logger.info(f"🔄 Procesando lote de {len(images)} imágenes con Motor Robusto...")
+        all_results = [None] * len(images)
+
+        # 1. Preprocessing + recorte. Solo se conservan los recortes para no
+        # retener N imágenes completas en memoria.
+        crops, crop_indexes = [], []
+        for i, image in enumerate(images):
+            if self.roi_first:
+                gray = self.load_grayscale(image)
+                crop = self.preprocess_zone(gray, 'CURP') if gray is not None else None
+            else:
+                processed_img = self.preprocess_image(image)
+                crop = self.crop_zone(processed_img, 'CURP').copy() if processed_img is not None else None
+            if crop is None:
+                all_results[i] = {'error': 'Preprocessing failed'}
+                continue
+            crops.append(crop)
+            crop_indexes.append(i)
+
+        # 2. Estrategia A: Zonal OCR en una sola invocación
+        zonal_texts = self.extract_zonal_batch(crops)
+
+        for i, zonal_text in zip(crop_indexes, zonal_texts):
+            results = self._empty_results()
+            if not self._accept_zonal(zonal_text, results):
+                # 3. Estrategia B: Full Image OCR (se re-preprocesa bajo demanda)
+                processed_img = self.preprocess_image(images[i])
+                if processed_img is None:
+                    results = {'error': 'Preprocessing failed'}
+                elif self.single_pass:
+                    results = self._process_single_pass(processed_img, results)
+                else:
+                    results = self._full_page_fallback(processed_img, results)
+            all_results[i] = results
+
+        return all_results
+
 # Instancia global para uso fácil
 engine = OCREngine()
 
-def extract_text_hybrid(image, use_easyocr_fallback=False, image_path=None):
-    """Wrapper para mantener compatibilidad con main_ocr.py"""
-    if not image_path:
-        return "", 0.0, "NoPath"
-        
-    result = engine.process_file(image_path)
-    
-    # Adaptar retorno a lo que espera main_ocr.py: (text, confidence, method)
+def format_engine_result(result):
+    """
+    Adapta un resultado de OCREngine a la tupla (text, confidence, method)
+    que esperan los consumidores de extract_text_hybrid.
+    """
+    if 'error' in result:
+        raise ValueError(result['error'])
+
     # Nota: main_ocr espera el texto completo en el primer argumento para buscar otros datos
     # pero aquí priorizamos la CURP. Retornaremos el raw_text para que RobustExtractor
     # (si se sigue usando fuera) pueda buscar, pero inyectaremos la CURP encontrada al inicio.
@@ -199,3 +608,35 @@ def extract_text_hybrid(image, use_easyocr_fallback=False, image_path=None):
         final_text = f"CURP: {result['curp']}\n\n{final_text}"
         
     return final_text, result['confidence'], result['strategy']
+
+def extract_text_hybrid(image, use_easyocr_fallback=False, image_path=None):
+    """
+    Wrapper para mantener compatibilidad con main_ocr.py.
+    `image` (ndarray ya decodificado) tiene prioridad sobre `image_path`.
+    """
+    source = image if image is not None else image_path
+    if source is None or (isinstance(source, str) and not source):
+        return "", 0.0, "NoPath"
+        
+    result = engine.process_file(source)
+    
+    # Adaptar retorno a lo que espera main_ocr.py: (text, confidence, method)
+    return format_engine_result(result)
+
+def extract_text_hybrid_batch(images):
+    """Versión por lote de extract_text_hybrid (una tupla por imagen, o la excepción)"""
+    outputs = []
+    for result in engine.process_batch(images):
+        try:
+            outputs.append(format_engine_result(result))
+        except Exception as e:
+            outputs.append(e)
+    return outputs
+
+def verify_curp_hint(image, curp_hint):
+    """
+    Camino rápido de extract_text_hybrid para una CURP sugerida.
+    Retorna la tupla (text, confidence, method) si se confirmó, o None.
+    """
+    result = engine.verify_curp_hint(image, curp_hint)
+    return format_engine_result(result) if result else None
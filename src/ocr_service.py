@@ -0,0 +1,255 @@
+"""
+Servicio HTTP local de OCR para la PWA de captura.
+
+La PWA puede mandar la foto recién tomada y saber en segundos si la CURP es
+legible (o si hay que repetir la toma), sin esperar a la corrida del
+pipeline. No depende de Drive ni de Sheets: recibe los bytes de la imagen
+en el cuerpo del request y responde JSON.
+
+    POST /ocr      body = bytes de la imagen (JPEG/PNG); opcional la CURP que
+                   leyó Tesseract.js en el teléfono (?curp_hint=... o header
+                   X-CURP-Hint) para verificarla con un OCR zonal corto
+    GET  /health   estado del servicio
+
+Límites: OCR_SERVICE_WORKERS procesos de OCR en paralelo y como mucho
+OCR_SERVICE_QUEUE_SIZE requests esperando turno (más allá → 503). Si el OCR
+no termina dentro de OCR_SERVICE_TIMEOUT se responde 504; el resultado
+queda en la caché OCR, así que reintentar con la misma foto es inmediato.
+Si un proceso de OCR muere (BrokenProcessPool) se responde 503 y el pool se
+vuelve a crear para los siguientes requests.
+
+Uso:
+    python src/ocr_service.py [--host H] [--port P] [--workers N]
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Agregar directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import (
+    LOG_FORMAT, LOG_LEVEL,
+    OCR_SERVICE_HOST, OCR_SERVICE_PORT, OCR_SERVICE_WORKERS,
+    OCR_SERVICE_QUEUE_SIZE, OCR_SERVICE_TIMEOUT, OCR_SERVICE_MAX_UPLOAD_MB
+)
+from src.row_worker import init_worker, process_downloaded_in_worker
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceBusy(Exception):
+    """Todos los workers ocupados y la cola llena"""
+
+
+class OCRService:
+    """Pool de OCR con concurrencia y cola acotadas"""
+
+    def __init__(self, workers, queue_size, timeout):
+        """
+        Args:
+            workers (int): Procesos de OCR en paralelo
+            queue_size (int): Requests que pueden esperar turno
+            timeout (float): Presupuesto de latencia por request (segundos)
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.stats = {'ok': 0, 'rejected': 0, 'timeouts': 0, 'errors': 0, 'pool_restarts': 0}
+
+    def recognize(self, image_bytes, curp_hint=None):
+        """
+        Corre OCR sobre la imagen.
+
+        Args:
+            image_bytes (bytes): Imagen codificada
+            curp_hint (str): CURP sugerida por el cliente (opcional)
+
+        Returns:
+            tuple: (código HTTP, dict de respuesta)
+        """
+        if not self.slots.acquire(blocking=False):
+            self._count('rejected')
+            raise ServiceBusy()
+
+        with self.lock:
+            self.pending += 1
+        start = time.perf_counter()
+        hints = {0: curp_hint.strip().upper()} if curp_hint else None
+        pool = self.pool
+        try:
+            future = pool.submit(process_downloaded_in_worker, [(0, image_bytes)], hints)
+        except BrokenProcessPool:
+            # Sin future no hay callback: el lugar se libera aquí
+            self._release(None)
+            self._count('errors')
+            self._restart_pool(pool)
+            return 503, {'error': 'OCR workers restarting, retry later'}
+        future.add_done_callback(self._release)
+
+        try:
+            outcome = future.result(timeout=self.timeout)[0]
+        except FutureTimeout:
+            self._count('timeouts')
+            return 504, {'error': f'OCR did not finish within {self.timeout}s, retry later'}
+        except BrokenProcessPool:
+            self._count('errors')
+            self._restart_pool(pool)
+            return 503, {'error': 'OCR worker crashed, retry later'}
+        except Exception as e:
+            logger.error(f"❌ OCR request failed: {e}")
+            self._count('errors')
+            return 500, {'error': 'OCR failed'}
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if outcome['error']:
+            self._count('errors')
+            return 422, {'error': outcome['error'], 'elapsed_ms': round(elapsed_ms)}
+
+        self._count('ok')
+        results = outcome['results']
+        curp = results['fields']['curp']
+        confidence = results['overall_confidence']
+        return 200, {
+            'curp': curp.value,
+            'curp_confidence': curp.confidence,
+            'confidence': confidence,
+            'strategy': results['strategy'],
+            # Mismo criterio que la escritura en el Sheet (INESheetsManager)
+            'status': 'COMPLETADO' if confidence >= 80 else 'REVISION',
+            'retake': not curp.value,
+            'cached': outcome['cached'],
+            'elapsed_ms': round(elapsed_ms),
+        }
+
+    def _release(self, future):
+        with self.lock:
+            self.pending -= 1
+        self.slots.release()
+
+    def _restart_pool(self, broken):
+        """Reemplaza el pool si sigue siendo el que se rompió (una vez aunque fallen varios requests)"""
+        with self.lock:
+            if self.pool is not broken:
+                return
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+            self.stats['pool_restarts'] += 1
+        logger.warning("⚠️ OCR worker pool broken, started a new one")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def health(self):
+        with self.lock:
+            return {'ok': True, 'workers': self.workers, 'pending': self.pending, **self.stats}
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+class OCRRequestHandler(BaseHTTPRequestHandler):
+    """Handler HTTP; el OCRService vive en self.server.service"""
+
+    max_bytes = OCR_SERVICE_MAX_UPLOAD_MB * 1024 * 1024
+
+    def do_OPTIONS(self):
+        # Preflight CORS de la PWA
+        self._send(204, None)
+
+    def do_GET(self):
+        if self.path.split('?')[0] == '/health':
+            self._send(200, self.server.service.health())
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/ocr':
+            self._send(404, {'error': 'not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self._send(400, {'error': 'invalid Content-Length'})
+            return
+        if length <= 0:
+            self._send(400, {'error': 'empty body, send the image bytes'})
+            return
+        if length > self.max_bytes:
+            self._send(413, {'error': f'image larger than {OCR_SERVICE_MAX_UPLOAD_MB} MB'})
+            return
+
+        image_bytes = self.rfile.read(length)
+        curp_hint = parse_qs(url.query).get('curp_hint', [None])[0] or self.headers.get('X-CURP-Hint')
+        try:
+            status, payload = self.server.service.recognize(image_bytes, curp_hint)
+        except ServiceBusy:
+            self._send(503, {'error': 'busy, retry later'}, retry_after=1)
+            return
+        self._send(status, payload)
+
+    def _send(self, status, payload, retry_after=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-CURP-Hint')
+        if retry_after:
+            self.send_header('Retry-After', str(retry_after))
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+def build_server(host, port, workers, queue_size, timeout):
+    """ThreadingHTTPServer con su OCRService (port=0 → puerto libre)"""
+    server = ThreadingHTTPServer((host, port), OCRRequestHandler)
+    server.daemon_threads = True
+    server.service = OCRService(workers, queue_size, timeout)
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de OCR de INE")
+    parser.add_argument('--host', default=OCR_SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=OCR_SERVICE_PORT)
+    parser.add_argument('--workers', type=int, default=OCR_SERVICE_WORKERS)
+    parser.add_argument('--queue-size', type=int, default=OCR_SERVICE_QUEUE_SIZE)
+    parser.add_argument('--timeout', type=float, default=OCR_SERVICE_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL), format=LOG_FORMAT)
+    server = build_server(args.host, args.port, args.workers, args.queue_size, args.timeout)
+    logger.info(f"🚀 OCR service on http://{args.host}:{server.server_address[1]} "
+                f"({args.workers} workers, queue {args.queue_size}, timeout {args.timeout}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+        logger.info("👋 OCR service stopped")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,11 @@
 import re
 import logging
 
+import numpy as np
+
+from config import CURP_CORRECTION_MAX_WINDOWS
+from src.curp_corrector import correct_curp
+
 logger = logging.getLogger(__name__)
 
 class RobustExtractor:
@@ -18,6 +23,84 @@ class RobustExtractor:
     NUM_SUBS = {v: k for k, v in COMMON_SUBS.items()}
     NUM_SUBS.update({'O': '0', 'I': '1', 'Z': '2', 'S': '5', 'B': '8', 'G': '6', 'T': '7'})
 
+    # Pesos por posición de score_curp_candidate
+    CURP_WEIGHTS = [
+        1, 1, 1, 1,       # 4 letras iniciales
+        2, 2, 2, 2, 2, 2, # 6 dígitos fecha
+        3,                # Sexo (H/M)
+        1, 1,             # Estado
+        1, 1, 1,          # Consonantes
+        1,                # Homoclave
+        1                 # Dígito verificador
+    ]
+
+    # Tabla de aportes para los códigos Latin-1 (se arma al primer uso)
+    _latin1_table = None
+
+    @staticmethod
+    def score_table(chars):
+        """
+        Aporte de cada carácter en cada una de las 18 posiciones, con las
+        mismas reglas que score_curp_candidate, a partir de máscaras de clase
+        (letra / dígito / alfanumérico / sustituible).
+
+        Returns:
+            np.ndarray: (18, len(chars)) float64
+        """
+        cls = RobustExtractor
+        alpha = np.array([c.isalpha() for c in chars])
+        digit = np.array([c.isdigit() for c in chars])
+        alnum = np.array([c.isalnum() for c in chars])
+        to_letter = np.array([c in cls.COMMON_SUBS for c in chars])
+        to_digit = np.array([c in cls.NUM_SUBS for c in chars])
+        sex = np.array([c in ('H', 'M') for c in chars])
+        sex_typo = np.array([c == 'N' for c in chars])
+
+        table = np.zeros((18, len(chars)))
+        for i, weight in enumerate(cls.CURP_WEIGHTS):
+            if i < 4:
+                table[i] = np.where(alpha, weight, np.where(to_letter, weight * 0.8, 0))
+            elif i < 10 or i == 17:
+                table[i] = np.where(digit, weight, np.where(to_digit, weight * 0.8, 0))
+            elif i == 10:
+                table[i] = np.where(sex, weight, np.where(sex_typo, weight * 0.5, 0))
+            elif i < 16:
+                table[i] = np.where(alpha, weight, 0)
+            else:
+                table[i] = np.where(alnum, weight, 0)
+        return table
+
+    @staticmethod
+    def window_scores(text):
+        """
+        Score de score_curp_candidate para todas las ventanas de 18
+        caracteres de text a la vez: el texto se codifica una sola vez y
+        cada posición suma su aporte sobre una vista desplazada del arreglo.
+
+        Returns:
+            np.ndarray: Un score por offset (len(text) - 17 valores)
+        """
+        cls = RobustExtractor
+        windows = len(text) - 17
+        if windows <= 0:
+            return np.empty(0)
+
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        if codes.max() < 256:
+            if cls._latin1_table is None:
+                cls._latin1_table = cls.score_table([chr(code) for code in range(256)])
+            table, index = cls._latin1_table, codes
+        else:
+            # Texto con caracteres fuera de Latin-1: tabla solo de los presentes
+            unique, index = np.unique(codes, return_inverse=True)
+            table = cls.score_table([chr(code) for code in unique])
+
+        # Misma suma en el mismo orden que score_curp_candidate: scores idénticos
+        total = np.zeros(windows)
+        for i in range(18):
+            total += table[i][index[i:i + windows]]
+        return total / sum(cls.CURP_WEIGHTS)
+
     @staticmethod
     def clean_text(text):
         """Limpia el texto básico"""
@@ -48,19 +131,35 @@ class RobustExtractor:
         # 2. Normalizar para búsqueda profunda
         text_nospaces = re.sub(r'\s+', '', text.upper())
         
-        # Buscamos ventanas de 18 caracteres
-        best_curp = None
-        best_score = 0
-        
-        for i in range(len(text_nospaces) - 17):
-            candidate = text_nospaces[i:i+18]
-            score, corrected = RobustExtractor.score_curp_candidate(candidate)
-            
-            if score > 0.8 and score > best_score:
-                best_score = score
-                best_curp = corrected
-                
-        return best_curp
+        # Scores de todas las ventanas de 18 caracteres, de mayor a menor
+        # (en empate la primera, como el recorrido original)
+        scores = RobustExtractor.window_scores(text_nospaces)
+        hits = np.flatnonzero(scores > 0.8)
+        if not hits.size:
+            return None
+        hits = hits[np.argsort(-scores[hits], kind='stable')]
+        return RobustExtractor.correct_windows(text_nospaces, hits)
+
+    @staticmethod
+    def correct_windows(text, offsets):
+        """
+        Primera ventana (en el orden dado) que correct_curp logra dejar con
+        dígito verificador válido. Si ninguna lo logra no se devuelve la
+        corrección por posición (score_curp_candidate): sería una CURP sin
+        verificar.
+
+        Args:
+            text (str): Texto sin espacios en mayúsculas
+            offsets (np.ndarray): Inicios de ventana candidatos (no vacío)
+
+        Returns:
+            str: CURP corregida, o None si ninguna ventana se pudo verificar
+        """
+        for i in offsets[:CURP_CORRECTION_MAX_WINDOWS]:
+            curp = correct_curp(text[i:i+18])
+            if curp:
+                return curp
+        return None
 
     @staticmethod
     def find_curp_by_keywords(text):
@@ -77,13 +176,12 @@ class RobustExtractor:
                 # Limpiar contexto (quitar la keyword y chars raros)
                 context_clean = re.sub(r'[^A-Z0-9]', '', context)
                 
-                # Buscar patrón de 18 chars en el contexto limpio
-                for i in range(len(context_clean) - 17):
-                    candidate = context_clean[i:i+18]
-                    score, corrected = RobustExtractor.score_curp_candidate(candidate)
-                    if score > 0.85: # Mayor exigencia para keyword match
-                        logger.info(f"✅ CURP encontrada por keyword '{keyword}': {corrected}")
-                        return corrected
+                # Buscar patrón de 18 chars en el contexto limpio (primera ventana que pase)
+                hits = np.flatnonzero(RobustExtractor.window_scores(context_clean) > 0.85) # Mayor exigencia para keyword match
+                corrected = RobustExtractor.correct_windows(context_clean, hits) if hits.size else None
+                if corrected:
+                    logger.info(f"✅ CURP encontrada por keyword '{keyword}': {corrected}")
+                    return corrected
         return None
 
     @staticmethod
@@ -96,15 +194,7 @@ class RobustExtractor:
         corrected = list(candidate)
         
         # Pesos
-        weights = [
-            1, 1, 1, 1,       # 4 letras iniciales
-            2, 2, 2, 2, 2, 2, # 6 dígitos fecha
-            3,                # Sexo (H/M)
-            1, 1,             # Estado
-            1, 1, 1,          # Consonantes
-            1,                # Homoclave
-            1                 # Dígito verificador
-        ]
+        weights = RobustExtractor.CURP_WEIGHTS
         
         max_score = sum(weights)
         current_score = 0
@@ -0,0 +1,168 @@
+"""
+Reparto de filas entre varias instancias del pipeline sobre el mismo Sheet.
+
+Antes de procesar, cada instancia marca sus filas como EN_PROCESO y anota en
+OCR_LEASE su id y la expiración del lease ("worker|2026-01-31T12:00:00Z").
+Sheets no tiene escrituras condicionales, así que tras escribir se espera un
+momento y se vuelve a leer OCR_LEASE: solo se quedan las filas donde ganó
+nuestra escritura (la última). Las filas EN_PROCESO con lease vencido (la
+instancia murió) vuelven a poder tomarse. Al terminar, las filas tomadas que
+no se alcanzaron a procesar vuelven al STATUS que tenían al tomarlas.
+
+Eso no basta para que la toma sea exclusiva: otra instancia que leyó la fila
+como pendiente puede escribir su lease después de nuestra verificación. Por
+eso antes de escribir cada resultado se vuelve a leer OCR_LEASE (owned()) y
+se descartan las filas que ya no son nuestras. Aun así, las dos instancias
+pueden haber corrido el OCR de la misma fila, y queda una ventana corta
+entre esa lectura y el flush del buffer de escritura: el procesamiento
+duplicado es poco probable pero posible, nunca una pérdida de filas.
+"""
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.api_scheduler import get_scheduler
+from src.row_scanner import CLAIMED_STATUS, PENDING_STATUS, column_letter
+
+logger = logging.getLogger(__name__)
+
+LEASE_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def format_lease(worker_id, expires_at):
+    return f"{worker_id}|{expires_at.strftime(LEASE_TIME_FORMAT)}"
+
+
+def parse_lease(value):
+    """
+    Returns:
+        tuple: (worker_id, expiración UTC) o (None, None) si no hay lease válido
+    """
+    worker_id, _, expiry = (value or '').rpartition('|')
+    try:
+        expires_at = datetime.strptime(expiry, LEASE_TIME_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None, None
+    return worker_id, expires_at
+
+
+class RowLeaseManager:
+    """Toma y libera filas con leases en la columna OCR_LEASE"""
+
+    def __init__(self, sheet, headers, worker_id, lease_seconds, settle_seconds):
+        """
+        Args:
+            sheet: gspread.Worksheet
+            headers (list): Headers canónicos (para ubicar las columnas)
+            worker_id (str): Identificador de esta instancia
+            lease_seconds (float): Duración del lease
+            settle_seconds (float): Espera entre escribir el lease y verificarlo
+        """
+        self.sheet = sheet
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.settle_seconds = settle_seconds
+        self.status_col = column_letter(headers, 'STATUS')
+        self.lease_col = column_letter(headers, 'OCR_LEASE')
+        self.scheduler = get_scheduler()
+        # Lease que escribimos en cada fila tomada
+        self.held = {}
+
+    def claimable(self, rows):
+        """
+        Filtra las filas que esta instancia puede tomar: no EN_PROCESO, o
+        con lease vencido, ilegible o propio.
+
+        Args:
+            rows: Lista de (row_num, row_data) del scanner
+        """
+        now = datetime.now(timezone.utc)
+        result = []
+        for row_num, row_data in rows:
+            if row_data['STATUS'].strip().upper() == CLAIMED_STATUS:
+                worker_id, expires_at = parse_lease(row_data.get('OCR_LEASE'))
+                if expires_at and expires_at > now and worker_id != self.worker_id:
+                    continue
+                if expires_at:
+                    logger.info(f"  Row {row_num}: reclaiming lease from {worker_id}")
+            result.append((row_num, row_data))
+        return result
+
+    def claim(self, rows):
+        """
+        Marca las filas como EN_PROCESO con nuestro lease y retorna las que
+        efectivamente quedaron para esta instancia (en el mismo orden).
+        """
+        self.held = {}
+        if not rows:
+            return []
+
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)
+        lease = format_lease(self.worker_id, expires_at)
+        data = []
+        for row_num, _ in rows:
+            data.append({'range': f'{self.status_col}{row_num}', 'values': [[CLAIMED_STATUS]]})
+            data.append({'range': f'{self.lease_col}{row_num}', 'values': [[lease]]})
+        self.scheduler.call('sheets_write', self.sheet.batch_update, data, value_input_option='RAW')
+
+        # Si otra instancia escribió después que nosotros, su lease es el que quedó
+        time.sleep(self.settle_seconds)
+        first, last = min(row_num for row_num, _ in rows), max(row_num for row_num, _ in rows)
+        values = self.scheduler.call(
+            'sheets_read', self.sheet.batch_get, [f'{self.lease_col}{first}:{self.lease_col}{last}']
+        )[0]
+        current = {
+            first + offset: str(row[0]) if row else ''
+            for offset, row in enumerate(values)
+        }
+
+        claimed = [(row_num, row_data) for row_num, row_data in rows if current.get(row_num) == lease]
+        self.held.update((row_num, lease) for row_num, _ in claimed)
+        lost = len(rows) - len(claimed)
+        logger.info(f"🔒 Claimed {len(claimed)} rows as {self.worker_id}"
+                    + (f" ({lost} taken by other workers)" if lost else ""))
+        return claimed
+
+    def owned(self, row_nums):
+        """
+        Vuelve a leer OCR_LEASE (un solo rango) justo antes de escribir.
+
+        Returns:
+            set: Las filas de row_nums cuyo lease sigue siendo el nuestro
+        """
+        row_nums = [row_num for row_num in row_nums if row_num in self.held]
+        if not row_nums:
+            return set()
+        first, last = min(row_nums), max(row_nums)
+        values = self.scheduler.call(
+            'sheets_read', self.sheet.batch_get, [f'{self.lease_col}{first}:{self.lease_col}{last}']
+        )[0]
+        current = {first + offset: str(row[0]) if row else '' for offset, row in enumerate(values)}
+        return {row_num for row_num in row_nums if current.get(row_num) == self.held[row_num]}
+
+    def release(self, writer, rows):
+        """
+        Devuelve las filas tomadas y no procesadas al STATUS que tenían al
+        tomarlas (PENDIENTE_OCR si estaban EN_PROCESO con lease vencido; los
+        reintentos en ERROR/REVISION conservan el suyo). Las filas que otra
+        instancia nos ganó entretanto no se tocan.
+
+        Args:
+            rows: Lista de (row_num, row_data) devuelta por claim()
+        """
+        if not rows:
+            return
+        owned = self.owned([row_num for row_num, _ in rows])
+        for row_num, row_data in rows:
+            self.held.pop(row_num, None)
+            if row_num not in owned:
+                continue
+            status = row_data['STATUS'].strip()
+            if not status or status.upper() == CLAIMED_STATUS:
+                status = PENDING_STATUS
+            filename = row_data['NOMBRE_ARCHIVO']
+            writer.add(f'{self.status_col}{row_num}', [[status]], filename)
+            writer.add(f'{self.lease_col}{row_num}', [['']], filename)
+        logger.info(f"🔓 Released {len(owned)} unprocessed rows"
+                    + (f" ({len(rows) - len(owned)} already taken by other workers)"
+                       if len(owned) < len(rows) else ""))
@@ -0,0 +1,272 @@
+"""
+Pipeline por etapas para process_pending_rows:
+
+    descarga (hilos) ──cola acotada──▶ OCR ──cola acotada──▶ escritura (hilo)
+
+Mientras Tesseract procesa unas imágenes, los hilos de descarga traen las
+siguientes y el hilo de escritura vacía los resultados al Sheet. Las colas
+acotadas aplican backpressure: como mucho `queue_size` descargas esperando
+OCR y `queue_size` lotes esperando escritura, lo que limita la memoria.
+El tiempo total tiende a max(red, CPU) en lugar de su suma.
+
+El orden de las filas se conserva de punta a punta (las colas guardan
+futures en orden de envío). Con una RunJournal cada fila deja constancia
+de su etapa (claimed / downloaded / ocr_done / written), y con un deadline
+(o una señal de apagado) no se toman filas nuevas: las que están en vuelo
+terminan y el resto queda pendiente para la siguiente ejecución.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from src.api_scheduler import CircuitOpenError
+from src.row_worker import error_outcome
+from src.run_profile import collect, span
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class RowPipeline:
+    """Descarga, OCR y escritura solapadas con colas acotadas"""
+
+    def __init__(self, make_downloader, write_outcome, prefetch, queue_size,
+                 journal=None, deadline=None, interrupt=None, profile=None, owned=None):
+        """
+        Args:
+            make_downloader: Callable que crea un RowProcessor para un hilo de
+                             descarga (el cliente de Drive no es thread-safe)
+            write_outcome: Callable (resultado, NOMBRE_ARCHIVO) que lo escribe en el Sheet
+            prefetch (int): Hilos de descarga
+            queue_size (int): Capacidad de cada cola entre etapas
+            journal: RunJournal opcional
+            deadline (float): time.monotonic() a partir del cual no se toman filas nuevas
+            interrupt (threading.Event): Si se activa (ej: SIGTERM) no se toman filas nuevas
+            profile: RunProfile opcional (tiempos por etapa de cada fila)
+            owned: Callable opcional (row_nums) -> filas que siguen siendo de esta
+                   instancia (RowLeaseManager.owned); el resto no se escribe
+        """
+        self.make_downloader = make_downloader
+        self.write_outcome = write_outcome
+        self.prefetch = prefetch
+        self.queue_size = queue_size
+        self.journal = journal
+        self.deadline = deadline
+        self.interrupt = interrupt
+        self.profile = profile
+        self.owned = owned
+        # Tiempos de la etapa de descarga, hasta unirse con los del OCR al escribir
+        self.download_timings = {}
+        self.fed = 0
+        # Evita que un ocr_done tardío (callback del pool) quede después de written
+        self.journal_lock = threading.Lock()
+        self.written = set()
+        # CURP sugerida por la app de captura, por fila (ver RowProcessor.process_downloaded)
+        self.hints = {}
+        # NOMBRE_ARCHIVO por fila: acompaña a la bitácora y a las escrituras
+        self.filenames = {}
+        self.local = threading.local()
+        self.stop = threading.Event()
+        self.error = None
+        self.feed_done = False
+
+    def run(self, rows, ocr_stage, batch_size):
+        """
+        Procesa las filas. La etapa de OCR corre en el hilo que llama.
+
+        Args:
+            rows: Lista de (row_num, row_data)
+            ocr_stage: Callable ([(row_num, image_bytes)], {row_num: curp_hint})
+                       -> lista de resultados o Future de esa lista (pool de procesos)
+            batch_size (int): Filas por llamada a ocr_stage
+
+        Raises:
+            CircuitOpenError: si Drive/Sheets dejaron de responder; las filas
+                              no escritas quedan pendientes
+        """
+        downloads = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue(maxsize=self.queue_size)
+
+        feeder = threading.Thread(target=self._feed, args=(rows, downloads), daemon=True)
+        writer = threading.Thread(target=self._drain, args=(results,), daemon=True)
+        feeder.start()
+        writer.start()
+
+        try:
+            self._ocr_loop(downloads, results, ocr_stage, batch_size)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if not self.feed_done:
+                # Vaciar para que el hilo de descarga no quede bloqueado en put()
+                self._discard(downloads)
+            results.put(_DONE)
+            feeder.join()
+            writer.join()
+
+        if self.error:
+            raise self.error
+
+    def _fail(self, error):
+        if self.error is None:
+            self.error = error
+        self.stop.set()
+
+    # -- Etapa 1: descarga ---------------------------------------------------
+
+    def _download(self, row_num, row_data):
+        downloader = getattr(self.local, 'downloader', None)
+        if downloader is None:
+            downloader = self.local.downloader = self.make_downloader()
+        with collect() as timings:
+            image_bytes, error = downloader.download(row_num, row_data)
+        self.download_timings[row_num] = timings
+        if self.journal and not error:
+            self.journal.record(row_num, 'downloaded', filename=self.filenames[row_num])
+        return image_bytes, error
+
+    def _feed(self, rows, downloads):
+        with ThreadPoolExecutor(max_workers=self.prefetch,
+                                thread_name_prefix='download') as executor:
+            for row_num, row_data in rows:
+                if self.stop.is_set():
+                    break
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    logger.warning(f"⏱️ Time budget reached, leaving {len(rows) - self.fed} rows "
+                                   f"for the next run")
+                    break
+                if self.interrupt is not None and self.interrupt.is_set():
+                    logger.warning(f"🛑 Shutdown requested, leaving {len(rows) - self.fed} rows "
+                                   f"for the next run")
+                    break
+                self.filenames[row_num] = row_data.get('NOMBRE_ARCHIVO', '')
+                if self.journal:
+                    self.journal.record(row_num, 'claimed', filename=self.filenames[row_num])
+                self.fed += 1
+                if row_data.get('CURP_CAPTURA'):
+                    self.hints[row_num] = row_data['CURP_CAPTURA']
+                # put() bloquea con la cola llena: no se descarga más de lo que el OCR consume
+                downloads.put((row_num, executor.submit(self._download, row_num, row_data)))
+            if self.stop.is_set():
+                executor.shutdown(cancel_futures=True)
+        downloads.put(_DONE)
+
+    # -- Etapa 2: OCR --------------------------------------------------------
+
+    def _ocr_loop(self, downloads, results, ocr_stage, batch_size):
+        chunk = []
+        while not self.stop.is_set():
+            item = downloads.get()
+            if item is _DONE:
+                self.feed_done = True
+                break
+            row_num, future = item
+            try:
+                image_bytes, error = future.result()
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                image_bytes, error = None, error_outcome(row_num, f'Download failed: {e}')
+
+            chunk.append((row_num, image_bytes, error))
+            if len(chunk) >= batch_size:
+                self._dispatch(chunk, results, ocr_stage)
+                chunk = []
+
+        if chunk and not self.stop.is_set():
+            self._dispatch(chunk, results, ocr_stage)
+
+    def _dispatch(self, chunk, results, ocr_stage):
+        downloaded = [(row_num, image_bytes) for row_num, image_bytes, error in chunk if not error]
+        try:
+            hints = {row_num: self.hints[row_num] for row_num, _ in downloaded if row_num in self.hints}
+            outcomes = ocr_stage(downloaded, hints) if downloaded else []
+        except Exception as e:
+            logger.error(f"ERROR processing rows {[row_num for row_num, _ in downloaded]}: {e}")
+            outcomes = [error_outcome(row_num, str(e)) for row_num, _ in downloaded]
+
+        if self.journal:
+            # Registrar el OCR apenas termina, sin esperar a la etapa de escritura
+            if isinstance(outcomes, Future):
+                outcomes.add_done_callback(self._record_ocr_done)
+            else:
+                self._record_outcomes(outcomes)
+        results.put((chunk, outcomes))
+
+    def _record_ocr_done(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self._record_outcomes(future.result())
+
+    def _record_outcomes(self, outcomes):
+        with self.journal_lock:
+            for outcome in outcomes:
+                if outcome['row_num'] not in self.written:
+                    self.journal.record(outcome['row_num'], 'ocr_done', outcome,
+                                        filename=self.filenames[outcome['row_num']])
+
+    # -- Etapa 3: escritura --------------------------------------------------
+
+    def _drain(self, results):
+        while True:
+            item = results.get()
+            if item is _DONE:
+                return
+            if self.stop.is_set():
+                continue
+            try:
+                self._write_chunk(*item)
+            except Exception as e:
+                self._fail(e)
+
+    def _write_chunk(self, chunk, outcomes):
+        if isinstance(outcomes, Future):
+            try:
+                outcomes = outcomes.result()
+            except Exception as e:
+                # Solo ocurre si el proceso worker murió (BrokenProcessPool)
+                logger.error(f"ERROR processing rows {[row_num for row_num, _, _ in chunk]}: {e}")
+                outcomes = [
+                    error_outcome(row_num, str(e))
+                    for row_num, _, error in chunk if not error
+                ]
+
+        by_row = {outcome['row_num']: outcome for outcome in outcomes}
+        if self.owned:
+            chunk = self._drop_lost_rows(chunk)
+        for row_num, _, error in chunk:
+            outcome = error or by_row[row_num]
+            timings = {**self.download_timings.pop(row_num, {}), **(outcome.get('timings') or {})}
+            with collect() as write_timings, span('sheet_write'):
+                self.write_outcome(outcome, self.filenames[row_num])
+            if self.profile:
+                self.profile.record_image(outcome, {**timings, **write_timings})
+            if self.journal:
+                with self.journal_lock:
+                    self.written.add(row_num)
+                    self.journal.record(row_num, 'written', filename=self.filenames[row_num])
+
+    def _drop_lost_rows(self, chunk):
+        """Quita las filas cuyo lease tomó otra instancia (su resultado ya no se escribe)"""
+        owned = self.owned([row_num for row_num, _, _ in chunk])
+        lost = [row_num for row_num, _, _ in chunk if row_num not in owned]
+        if not lost:
+            return chunk
+        logger.warning(f"⚠️ Rows {lost} were claimed by another worker, not writing their results")
+        if self.journal:
+            with self.journal_lock:
+                # Marcadas como escritas para que un ocr_done tardío no las vuelva a anotar
+                self.written.update(lost)
+                self.journal.discard(lost)
+        return [item for item in chunk if item[0] in owned]
+
+    @staticmethod
+    def _discard(downloads):
+        """Descarta las descargas en cola hasta el fin del hilo de descarga"""
+        while True:
+            item = downloads.get()
+            if item is _DONE:
+                return
+            item[1].cancel()
@@ -0,0 +1,196 @@
+"""
+Escaneo incremental de filas pendientes en REGISTRO_MASTER.
+
+En lugar de get_all_records() (todas las columnas de todas las filas,
+incluido TEXTO_CRUDO) lee solo NOMBRE_ARCHIVO, STATUS, OCR_LEASE y
+CURP_CAPTURA (la CURP que leyó la app de captura, si la hay) con un batchGet por
+rangos, y únicamente a partir de una marca de agua persistida: la última
+fila hasta la cual todo está procesado. Las filas marcadas explícitamente
+para reintento se leen aparte aunque estén por debajo de la marca.
+
+La marca guarda también el NOMBRE_ARCHIVO de esa fila y cada scan lo vuelve a
+leer: si clean_sheet.py (u otra edición manual) borró o movió filas, ya no
+coincide y se hace un scan completo en lugar de saltarse pendientes que
+quedaron por encima de la marca.
+
+Con varios shards (--shard-index/--shard-count) cada instancia solo ve las
+filas cuyo NOMBRE_ARCHIVO cae en su shard; las de otros shards cuentan como
+terminadas para su marca de agua.
+"""
+import json
+import zlib
+import logging
+import os
+import tempfile
+
+from gspread.utils import rowcol_to_a1
+
+from src.api_scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+PENDING_STATUS = 'PENDIENTE_OCR'
+# Fila tomada por una instancia del pipeline (ver src/row_leases.py)
+CLAIMED_STATUS = 'EN_PROCESO'
+
+
+def shard_for(key, shard_count):
+    """Shard estable (igual en todas las máquinas y ejecuciones) para una clave"""
+    return zlib.crc32(key.encode('utf-8')) % shard_count
+
+
+def column_letter(headers, name):
+    """Letra de columna de un header (ej: 'STATUS' -> 'H')"""
+    return rowcol_to_a1(1, headers.index(name) + 1).rstrip('1')
+
+
+class PendingRowScanner:
+    """Lector de filas pendientes con marca de agua persistente"""
+
+    def __init__(self, sheet, headers, state_path, shard_index=0, shard_count=1):
+        """
+        Args:
+            sheet: gspread.Worksheet
+            headers (list): Headers canónicos (para ubicar las columnas)
+            state_path (str): JSON con {'watermark', 'watermark_file', 'retry_rows'}
+            shard_index (int): Shard de esta instancia (0..shard_count-1)
+            shard_count (int): Total de shards (1 = sin sharding)
+        """
+        self.sheet = sheet
+        self.state_path = state_path
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.filename_col = column_letter(headers, 'NOMBRE_ARCHIVO')
+        self.status_col = column_letter(headers, 'STATUS')
+        self.lease_col = column_letter(headers, 'OCR_LEASE')
+        self.curp_col = column_letter(headers, 'CURP_CAPTURA')
+        self.watermark = 1  # Fila 1 = headers
+        self.watermark_file = ''  # NOMBRE_ARCHIVO de la fila de la marca
+        self.retry_rows = set()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Scan state unreadable, doing a full scan: {e}")
+            return
+        self.watermark = state.get('watermark', 1)
+        # Estados anteriores sin archivo no se pueden verificar: forzarán un scan completo
+        self.watermark_file = state.get('watermark_file')
+        self.retry_rows = set(state.get('retry_rows', []))
+
+    def _save(self):
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'watermark': self.watermark, 'watermark_file': self.watermark_file,
+                       'retry_rows': sorted(self.retry_rows)}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def flag_for_retry(self, row_nums):
+        """Marca filas para que se reprocesen en el próximo scan (aunque estén bajo la marca)"""
+        self.retry_rows.update(row_nums)
+        self._save()
+
+    def reset(self):
+        """Olvida la marca de agua: el próximo scan lee toda la hoja"""
+        self.watermark = 1
+        self.watermark_file = ''
+        self._save()
+
+    def in_shard(self, row_num, filename):
+        """True si la fila le toca a esta instancia (por nombre de archivo, o número de fila)"""
+        if self.shard_count <= 1:
+            return True
+        return shard_for(filename or str(row_num), self.shard_count) == self.shard_index
+
+    def scan(self):
+        """
+        Returns:
+            list: [(row_num, {'NOMBRE_ARCHIVO', 'STATUS', 'OCR_LEASE', 'CURP_CAPTURA'})] a procesar
+            (pendientes y EN_PROCESO), en orden de fila
+        """
+        start = self.watermark + 1
+        columns = (self.filename_col, self.status_col, self.lease_col, self.curp_col)
+        ranges = [f"{col}{start}:{col}" for col in columns]
+        retry_rows = sorted(r for r in self.retry_rows if r < start)
+        for row_num in retry_rows:
+            ranges.extend(f"{col}{row_num}" for col in columns)
+        if self.watermark > 1:
+            # Mismo batchGet: confirma que la fila de la marca sigue siendo la misma
+            ranges.append(f"{self.filename_col}{self.watermark}")
+
+        value_ranges = get_scheduler().call('sheets_read', self.sheet.batch_get, ranges)
+        if self.watermark > 1:
+            found = self._first_value(value_ranges[-1])
+            if found != self.watermark_file:
+                logger.warning(f"⚠️ Row {self.watermark} is now {found!r}, expected "
+                               f"{self.watermark_file!r} (rows moved?): doing a full scan")
+                self.reset()
+                return self.scan()
+        filenames, statuses, leases, curps = (self._column_values(vr) for vr in value_ranges[:4])
+        logger.info(f"Scanned rows {start}-{start + max(len(filenames), len(statuses)) - 1} "
+                    f"(watermark {self.watermark}, {len(retry_rows)} retry rows)")
+
+        pending = []
+        for i, row_num in enumerate(retry_rows):
+            filename, status, lease, curp = (
+                self._first_value(vr) for vr in value_ranges[4 + 4 * i:8 + 4 * i]
+            )
+            if self.in_shard(row_num, filename):
+                pending.append((row_num, self._row_data(filename, status, lease, curp)))
+
+        # La nueva marca es la última fila del prefijo contiguo ya terminado
+        new_watermark = self.watermark
+        new_watermark_file = self.watermark_file
+        prefix_done = True
+        for offset in range(max(len(filenames), len(statuses))):
+            row_num = start + offset
+            filename = filenames[offset] if offset < len(filenames) else ''
+            status = statuses[offset] if offset < len(statuses) else ''
+            lease = leases[offset] if offset < len(leases) else ''
+            curp = curps[offset] if offset < len(curps) else ''
+            normalized = status.strip().upper()
+
+            if not self.in_shard(row_num, filename):
+                # De otro shard: no bloquea la marca de agua de este
+                if prefix_done:
+                    new_watermark, new_watermark_file = row_num, filename
+            elif normalized in (PENDING_STATUS, CLAIMED_STATUS) or row_num in self.retry_rows:
+                pending.append((row_num, self._row_data(filename, status, lease, curp)))
+                prefix_done = False
+            elif not normalized and filename:
+                # Fila a medio escribir: todavía no se puede dejar atrás
+                prefix_done = False
+            elif prefix_done:
+                new_watermark, new_watermark_file = row_num, filename
+
+        self.watermark = new_watermark
+        self.watermark_file = new_watermark_file
+        self._save()
+        return sorted(pending)
+
+    def complete(self, row_nums):
+        """Quita de la lista de reintento las filas ya procesadas"""
+        if self.retry_rows.intersection(row_nums):
+            self.retry_rows.difference_update(row_nums)
+            self._save()
+
+    @staticmethod
+    def _row_data(filename, status, lease, curp):
+        return {'NOMBRE_ARCHIVO': filename, 'STATUS': status, 'OCR_LEASE': lease,
+                'CURP_CAPTURA': curp.strip().upper()}
+
+    @staticmethod
+    def _column_values(value_range):
+        return [str(row[0]) if row else '' for row in value_range]
+
+    @staticmethod
+    def _first_value(value_range):
+        return str(value_range[0][0]) if value_range and value_range[0] else ''
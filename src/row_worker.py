@@ -0,0 +1,371 @@
+"""
+Trabajo por fila del pipeline OCR (descarga + OCR + extracción).
+Separado de INESheetsManager para poder ejecutarse en procesos worker
+sin depender del cliente de gspread (que no es serializable).
+"""
+import logging
+import os
+import signal
+import time
+
+import cv2
+
+from config import (
+    OCR_CACHE_ENABLED, OCR_CACHE_PATH, OCR_CACHE_MAX_MB,
+    BLOB_STORE_ENABLED, BLOB_STORE_DIR, BLOB_STORE_MAX_MB
+)
+from src.api_scheduler import CircuitOpenError
+from src.blob_store import BlobStore
+from src.drive_manager import DriveManager
+from src.ine_processor import INEOCRProcessor
+from src.ocr_cache import OCRResultCache
+from src.ocr_engine import decode_image_bytes
+from src.run_profile import collect, merge_timings, span
+
+logger = logging.getLogger(__name__)
+
+
+class RowProcessor:
+    """
+    Ejecuta la parte pesada de una fila pendiente:
+    1. Descarga la imagen de Drive
+    2. Corre OCR inteligente
+    3. Retorna un resultado serializable (no escribe en el Sheet)
+    """
+
+    def __init__(self, drive_service, ocr, cache=None, blob_store=None, file_index=None):
+        """
+        Args:
+            drive_service: Servicio de Google Drive API (None si solo se usa la etapa de OCR)
+            ocr: Instancia de INEOCRProcessor
+            cache: OCRResultCache opcional (resultados por hash de imagen)
+            blob_store: BlobStore opcional (imágenes por md5Checksum de Drive)
+            file_index: DriveFileIndex opcional (nombre → archivo de ENTRADAS)
+        """
+        self.drive_service = drive_service
+        self.drive = DriveManager(drive_service, blob_store)
+        self.ocr = ocr
+        self.cache = cache
+        self.file_index = file_index
+
+    def run(self, row_num: int, row_data: dict) -> dict:
+        """
+        Procesa una fila y retorna su resultado.
+
+        Returns:
+            dict: {'row_num', 'results', 'error', 'cached', 'ocr_seconds'}.
+            Exactamente uno de 'results' / 'error' tiene valor.
+        """
+        logger.info(f"\n[Row {row_num}] Processing...")
+
+        image_bytes, error = self.download(row_num, row_data)
+        if error:
+            return error
+        hints = {row_num: row_data['CURP_CAPTURA']} if row_data.get('CURP_CAPTURA') else None
+        return self.process_downloaded([(row_num, image_bytes)], hints)[0]
+
+    def process_downloaded(self, items: list, hints: dict = None) -> list:
+        """
+        Etapa de OCR sobre imágenes ya descargadas (caché, decodificación y
+        OCR). Con más de una imagen pendiente de OCR se usa una sola
+        invocación de Tesseract para todas las zonas CURP del lote.
+
+        Args:
+            items: Lista de (row_num, image_bytes)
+            hints: {row_num: CURP sugerida por la app de captura} opcional; las
+                   que se confirman con un OCR zonal corto no pasan por el OCR completo
+
+        Returns:
+            list: Un resultado por fila, en el mismo orden; cada uno con
+                  'timings' ({etapa: segundos}, ver src/run_profile.py)
+        """
+        hints = hints or {}
+        outcomes = {}
+        timings = {}
+        decoded = []
+        for row_num, image_bytes in items:
+            with collect() as timings[row_num]:
+                outcome, cache_key, image = self._prepare(row_num, image_bytes, hints.get(row_num))
+            if outcome:
+                outcomes[row_num] = outcome
+            else:
+                decoded.append((row_num, cache_key, image))
+
+        with collect() as ocr_timings:
+            if len(decoded) == 1:
+                row_num, cache_key, image = decoded[0]
+                outcomes[row_num] = self._ocr_single(row_num, cache_key, image)
+            elif decoded:
+                outcomes.update(self._ocr_batch(decoded))
+        for row_num, _, _ in decoded:
+            # El costo del lote se reparte por igual entre sus imágenes
+            merge_timings(timings[row_num], ocr_timings, 1 / len(decoded))
+
+        for row_num, _ in items:
+            outcomes[row_num]['timings'] = timings[row_num]
+        return [outcomes[row_num] for row_num, _ in items]
+
+    def _prepare(self, row_num: int, image_bytes: bytes, curp_hint):
+        """
+        Caché, decodificación y camino rápido de la CURP sugerida.
+
+        Returns:
+            tuple: (resultado, None, None) si la fila ya quedó resuelta, o
+                   (None, cache_key, image) si necesita OCR
+        """
+        # Caché por contenido: antes de cualquier decodificación/preprocesamiento
+        with span('cache'):
+            cache_key, cached = self._cache_lookup(row_num, image_bytes)
+        if cached:
+            return cached, None, None
+
+        with span('decode'):
+            image, error = self._decode(row_num, image_bytes)
+        if error:
+            return error, None, None
+
+        verified = self._verify_hint(row_num, image, curp_hint)
+        if verified:
+            return verified, None, None
+        return None, cache_key, image
+
+    def _verify_hint(self, row_num: int, image, curp_hint):
+        """
+        Camino rápido con la CURP sugerida por la app de captura.
+
+        Returns:
+            dict: Resultado de la fila si la CURP se confirmó, None si no
+        """
+        if not curp_hint:
+            return None
+
+        start = time.perf_counter()
+        ocr_results = self.ocr.verify_curp_hint(image, curp_hint)
+        ocr_seconds = time.perf_counter() - start
+        if not ocr_results:
+            return None
+
+        logger.info(f"  ✓ CURP hint confirmed in {ocr_seconds:.2f}s")
+        # No va a la caché: el resultado depende de la sugerencia, no solo de la imagen
+        return result_outcome(row_num, ocr_results, ocr_seconds=ocr_seconds)
+
+    def _ocr_single(self, row_num: int, cache_key, image) -> dict:
+        """OCR de una sola imagen decodificada"""
+        logger.info(f"  → Running OCR...")
+        try:
+            start = time.perf_counter()
+            # Procesamiento inteligente (ndarray en memoria, sin archivo temporal)
+            ocr_results = self.ocr.process_ine_image(image=image)
+            ocr_seconds = time.perf_counter() - start
+            logger.info(f"  → OCR Complete: {ocr_results['overall_confidence']:.0f}% confidence")
+
+        except Exception as e:
+            logger.error(f"OCR Failed: {e}", exc_info=True)
+            return error_outcome(row_num, f'OCR failed: {e}')
+
+        if self.cache:
+            self.cache.put(cache_key, ocr_results, ocr_seconds)
+        return result_outcome(row_num, ocr_results, ocr_seconds=ocr_seconds)
+
+    def _ocr_batch(self, decoded: list) -> dict:
+        """
+        OCR por lote de imágenes decodificadas.
+
+        Args:
+            decoded: Lista de (row_num, cache_key, image)
+
+        Returns:
+            dict: {row_num: resultado}
+        """
+        logger.info(f"  → Running batch OCR on {len(decoded)} images...")
+        start = time.perf_counter()
+        try:
+            ocr_outputs = self.ocr.process_ine_images([image for _, _, image in decoded])
+        except Exception as e:
+            logger.error(f"Batch OCR Failed: {e}", exc_info=True)
+            ocr_outputs = [e] * len(decoded)
+        # El costo del lote se reparte por igual entre sus imágenes
+        ocr_seconds = (time.perf_counter() - start) / len(decoded)
+
+        outcomes = {}
+        for (row_num, cache_key, _), output in zip(decoded, ocr_outputs):
+            if isinstance(output, Exception):
+                outcomes[row_num] = error_outcome(row_num, f'OCR failed: {output}')
+                continue
+            if self.cache:
+                self.cache.put(cache_key, output, ocr_seconds)
+            outcomes[row_num] = result_outcome(row_num, output, ocr_seconds=ocr_seconds)
+        return outcomes
+
+    def download(self, row_num: int, row_data: dict):
+        """
+        Descarga (en memoria) la imagen de una fila.
+
+        Returns:
+            tuple: (bytes, None) o (None, resultado de error)
+        """
+        # Obtener nombre de archivo (que usaremos para buscar en Drive si no tenemos ID directo)
+        filename = row_data.get('NOMBRE_ARCHIVO')
+
+        if not filename:
+            return None, error_outcome(row_num, 'No filename found')
+
+        # Descargar desde Drive (buscando por nombre)
+        image_bytes = self.download_file_by_name(filename)
+
+        if not image_bytes:
+            return None, error_outcome(row_num, f'File not found in Drive: {filename}')
+
+        return image_bytes, None
+
+    def _cache_lookup(self, row_num: int, image_bytes: bytes):
+        """
+        Returns:
+            tuple: (cache_key, resultado cacheado o None)
+        """
+        if not self.cache:
+            return None, None
+
+        cache_key = self.cache.key_for(image_bytes)
+        results, ocr_seconds = self.cache.get(cache_key)
+        if results is None:
+            return cache_key, None
+
+        logger.info(f"  ✓ OCR cache hit ({ocr_seconds:.1f}s saved)")
+        return cache_key, result_outcome(row_num, results, cached=True, ocr_seconds=ocr_seconds)
+
+    def _decode(self, row_num: int, image_bytes: bytes):
+        """
+        Decodifica la imagen una sola vez, en memoria.
+
+        Returns:
+            tuple: (image, None) o (None, resultado de error)
+        """
+        try:
+            image = decode_image_bytes(image_bytes)
+            if image is None:
+                raise ValueError("Could not load image")
+        except Exception as e:
+            return None, error_outcome(row_num, f'Image load failed: {e}')
+
+        return image, None
+
+    def download_file_by_name(self, filename: str) -> bytes:
+        """
+        Busca y descarga un archivo por nombre desde Drive.
+        Retorna el contenido en memoria (sin archivo temporal).
+        """
+        # Resolver con el índice de ENTRADAS (sin llamada de listado)
+        meta = self.file_index.lookup(filename) if self.file_index else None
+        if meta:
+            file_content = self.drive.download_bytes(meta['id'], meta.get('md5Checksum'))
+            if file_content is not None:
+                logger.info(f"  ✓ Downloaded {filename} ({len(file_content)} bytes)")
+                return file_content
+            # Entrada obsoleta (movido/borrado): caer a la búsqueda por nombre
+            self.file_index.forget(filename)
+
+        try:
+            # Buscar archivo
+            query = f"name = '{filename}' and trashed = false"
+            with span('drive_lookup'):
+                results = self.drive._execute(self.drive_service.files().list(
+                    q=query, fields="files(id, name, md5Checksum, size)"
+                ))
+            files = results.get('files', [])
+
+            if not files:
+                logger.warning(f"File not found: {filename}")
+                return None
+
+            file_id = files[0]['id']
+
+            # Descargar (o servir desde el blob store si el md5 ya está local)
+            file_content = self.drive.download_bytes(file_id, files[0].get('md5Checksum'))
+            if file_content is None:
+                return None
+
+            logger.info(f"  ✓ Downloaded {filename} ({len(file_content)} bytes)")
+            return file_content
+
+        except CircuitOpenError:
+            # Drive caído: no es un error de la fila, se detiene la ejecución
+            raise
+        except Exception as e:
+            logger.error(f"Error downloading file: {e}")
+            return None
+
+
+def result_outcome(row_num: int, results: dict, cached: bool = False, ocr_seconds: float = 0.0) -> dict:
+    """Resultado de fila exitosa (formato de RowProcessor.run)"""
+    return {
+        'row_num': row_num, 'results': results, 'error': None,
+        'cached': cached, 'ocr_seconds': ocr_seconds
+    }
+
+
+def error_outcome(row_num: int, message: str) -> dict:
+    """Resultado de fila fallida (mismo formato que RowProcessor.run)"""
+    return {
+        'row_num': row_num, 'results': None, 'error': message,
+        'cached': False, 'ocr_seconds': 0.0
+    }
+
+
+def build_ocr_cache():
+    """OCRResultCache según config (None si está deshabilitada)"""
+    if not OCR_CACHE_ENABLED:
+        return None
+    return OCRResultCache(OCR_CACHE_PATH, OCR_CACHE_MAX_MB * 1024 * 1024)
+
+
+def build_blob_store():
+    """BlobStore según config (None si está deshabilitado)"""
+    if not BLOB_STORE_ENABLED:
+        return None
+    return BlobStore(BLOB_STORE_DIR, BLOB_STORE_MAX_MB * 1024 * 1024)
+
+
+# =============================================================================
+# Pool de procesos
+# =============================================================================
+
+# Estado por proceso worker (se crea una sola vez en el initializer del pool)
+_worker_processor = None
+
+
+def init_worker():
+    """
+    Initializer del ProcessPoolExecutor: crea el motor OCR y la caché una
+    sola vez por proceso. Los workers solo hacen OCR; las descargas de Drive
+    las hace el proceso principal (ver src/row_pipeline.py).
+    """
+    global _worker_processor
+
+    # Un hilo por proceso: el paralelismo lo da el pool, no Tesseract/OpenCV
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    cv2.setNumThreads(1)
+
+    # Las señales de apagado las maneja el proceso principal, que termina
+    # los lotes en vuelo y luego cierra el pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    _worker_processor = RowProcessor(None, INEOCRProcessor(debug=False), build_ocr_cache())
+
+
+def process_downloaded_in_worker(items: list, hints: dict = None) -> list:
+    """
+    Punto de entrada ejecutado dentro de cada proceso worker (etapa de OCR;
+    la descarga ya la hizo el proceso principal).
+
+    Args:
+        items: Lista de (row_num, image_bytes); con más de una fila se usa OCR por lote
+        hints: {row_num: CURP sugerida} opcional (ver RowProcessor.process_downloaded)
+    """
+    try:
+        return _worker_processor.process_downloaded(items, hints)
+    except Exception as e:
+        # Nunca propagar: una imagen fallida no debe tumbar el lote
+        logger.error(f"ERROR processing rows {[row_num for row_num, _ in items]}: {e}", exc_info=True)
+        return [error_outcome(row_num, str(e)) for row_num, _ in items]
@@ -0,0 +1,152 @@
+"""
+Bitácora local de avance por fila para reanudar ejecuciones interrumpidas.
+
+GitHub Actions mata el job al llegar a timeout-minutes. Cada fila deja
+eventos append-only en SQLite conforme avanza por el pipeline:
+
+    claimed → downloaded → ocr_done (con el resultado) → written
+
+Al arrancar, los resultados en ocr_done que no llegaron al buffer de
+escritura se escriben sin repetir el OCR, y las filas en written (ya en el
+spool de SheetWriteBuffer o en el Sheet) no se vuelven a procesar. Cuando
+un flush confirma las escrituras se compactan los eventos de esas filas.
+
+Cada evento guarda también el NOMBRE_ARCHIVO de la fila: si entre una
+ejecución y otra se borraron o movieron filas (clean_sheet.py), el número de
+fila ya no identifica la misma foto y el llamador debe comparar el nombre
+antes de reescribir o saltar una fila.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from src.ocr_cache import results_from_json, results_to_json
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('claimed', 'downloaded', 'ocr_done', 'written')
+
+
+def outcome_to_json(outcome):
+    """Serializa un resultado de RowProcessor (results con Field incluidos)"""
+    data = dict(outcome)
+    if outcome['results'] is not None:
+        data['results'] = results_to_json(outcome['results'])
+    return json.dumps(data, ensure_ascii=False)
+
+
+def outcome_from_json(payload):
+    data = json.loads(payload)
+    if data['results'] is not None:
+        data['results'] = results_from_json(data['results'])
+    return data
+
+
+class RunJournal:
+    """Eventos por fila en SQLite (compartido por los hilos del pipeline)"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Archivo SQLite de la bitácora
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS row_events ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' row_num INTEGER NOT NULL,'
+            ' stage TEXT NOT NULL,'
+            ' payload TEXT,'
+            ' created REAL NOT NULL,'
+            ' filename TEXT)'
+        )
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(row_events)')}
+        if 'filename' not in columns:
+            # Bitácora de una versión anterior: sus eventos quedan sin nombre y no se confían
+            self._conn.execute('ALTER TABLE row_events ADD COLUMN filename TEXT')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_row_events_row ON row_events(row_num, id)'
+        )
+        self._conn.commit()
+
+    def record(self, row_num, stage, outcome=None, filename=None):
+        """
+        Agrega un evento para la fila.
+
+        Args:
+            row_num (int): Fila del Sheet
+            stage (str): Una de STAGES
+            outcome (dict): Resultado de RowProcessor (solo para ocr_done)
+            filename (str): NOMBRE_ARCHIVO de la fila
+        """
+        payload = outcome_to_json(outcome) if outcome is not None else None
+        with self.lock:
+            self._conn.execute(
+                'INSERT INTO row_events (row_num, stage, payload, created, filename)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (row_num, stage, payload, time.time(), filename)
+            )
+            self._conn.commit()
+
+    def _latest(self):
+        with self.lock:
+            return self._conn.execute(
+                'SELECT e.row_num, e.stage, e.payload, e.filename FROM row_events e'
+                ' JOIN (SELECT row_num, MAX(id) AS id FROM row_events GROUP BY row_num) last'
+                ' ON e.id = last.id ORDER BY e.row_num'
+            ).fetchall()
+
+    def written_rows(self):
+        """
+        Filas cuyo resultado ya está en el buffer de escritura o en el Sheet.
+
+        Returns:
+            dict: {row_num: NOMBRE_ARCHIVO registrado (None en bitácoras anteriores)}
+        """
+        return {row_num: filename for row_num, stage, _, filename in self._latest() if stage == 'written'}
+
+    def unwritten_outcomes(self):
+        """
+        Resultados con OCR terminado que no llegaron a escribirse, en orden de fila.
+
+        Returns:
+            list: [(NOMBRE_ARCHIVO registrado, resultado)]
+        """
+        outcomes = []
+        for row_num, stage, payload, filename in self._latest():
+            if stage != 'ocr_done':
+                continue
+            try:
+                outcomes.append((filename, outcome_from_json(payload)))
+            except (TypeError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Journal entry for row {row_num} unreadable, reprocessing: {e}")
+        return outcomes
+
+    def discard(self, row_nums):
+        """Borra los eventos de filas cuyo registro ya no corresponde al Sheet"""
+        with self.lock:
+            self._conn.executemany('DELETE FROM row_events WHERE row_num = ?',
+                                   [(row_num,) for row_num in row_nums])
+            self._conn.commit()
+
+    def compact(self):
+        """Borra los eventos de las filas escritas (llamar tras un flush confirmado)"""
+        with self.lock:
+            deleted = self._conn.execute(
+                'DELETE FROM row_events WHERE row_num IN ('
+                ' SELECT e.row_num FROM row_events e'
+                ' JOIN (SELECT row_num, MAX(id) AS id FROM row_events GROUP BY row_num) last'
+                " ON e.id = last.id WHERE e.stage = 'written')"
+            ).rowcount
+            self._conn.commit()
+        if deleted:
+            logger.debug(f"Journal: {deleted} events compacted")
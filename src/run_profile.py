@@ -0,0 +1,233 @@
+"""
+Perfil de tiempos por etapa del pipeline OCR.
+
+Las etapas se miden con `span(stage)` alrededor del código (descarga,
+decodificación, preprocesamiento, cada llamada a Tesseract, RobustExtractor,
+escritura en el Sheet). Los tiempos se acumulan en el colector activo del
+hilo (`collect()`), uno por imagen; fuera de un colector span() solo mide y
+descarta. Los colectores de los procesos worker viajan de regreso dentro del
+resultado de la fila ('timings'), así que funcionan igual con el pool.
+
+RunProfile junta los tiempos de todas las imágenes de la ejecución:
+un registro JSONL por imagen, percentiles p50/p95/p99 por etapa,
+imágenes/segundo, reparto por estrategia (Zonal / Full_Fallback / Failed...)
+y, opcionalmente, un archivo textfile para el node exporter de Prometheus.
+"""
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+@contextmanager
+def collect():
+    """
+    Activa un colector de tiempos en este hilo.
+
+    Yields:
+        dict: {stage: segundos} acumulados por los span() dentro del bloque
+    """
+    previous = getattr(_local, 'timings', None)
+    timings = _local.timings = {}
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+@contextmanager
+def span(stage):
+    """Mide el bloque y lo suma a la etapa en el colector activo (si hay)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = getattr(_local, 'timings', None)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def merge_timings(target, source, scale=1.0):
+    """Suma los tiempos de source a target (scale reparte un lote entre sus imágenes)"""
+    for stage, seconds in source.items():
+        target[stage] = target.get(stage, 0.0) + seconds * scale
+
+
+def percentile(values, q):
+    """Percentil por rango más cercano (values ordenado, q en 0..100)"""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+class RunProfile:
+    """Tiempos por etapa de una ejecución"""
+
+    def __init__(self, jsonl_path=None, prometheus_path=None):
+        """
+        Args:
+            jsonl_path (str): Archivo JSONL donde se agrega un registro por imagen
+            prometheus_path (str): Archivo .prom para el textfile collector (opcional)
+        """
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.stages = {}
+        self.run_stages = {}
+        self.strategies = Counter()
+        self.images = 0
+        self._file = None
+        if jsonl_path:
+            directory = os.path.dirname(jsonl_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(jsonl_path, 'a', encoding='utf-8')
+
+    def record_image(self, outcome, timings):
+        """
+        Registra una imagen ya escrita en el Sheet.
+
+        Args:
+            outcome (dict): Resultado de RowProcessor
+            timings (dict): {stage: segundos} de la imagen
+        """
+        if outcome['error']:
+            strategy = 'Error'
+        else:
+            strategy = outcome['results']['strategy']
+
+        with self.lock:
+            self.images += 1
+            self.strategies[strategy] += 1
+            for stage, seconds in timings.items():
+                self.stages.setdefault(stage, []).append(seconds)
+
+            if self._file:
+                record = {
+                    'ts': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'row_num': outcome['row_num'],
+                    'strategy': strategy,
+                    'cached': outcome['cached'],
+                    'error': outcome['error'],
+                    'stages': {stage: round(seconds, 4) for stage, seconds in timings.items()},
+                }
+                self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                self._file.flush()
+
+    def record_run(self, timings):
+        """Suma tiempos de etapas de la ejecución completa (scan, claim, flush final)"""
+        with self.lock:
+            merge_timings(self.run_stages, timings)
+
+    def stage_summary(self):
+        """
+        Returns:
+            dict: {stage: {'count', 'total', 'p50', 'p95', 'p99'}} por imagen
+        """
+        with self.lock:
+            stages = {stage: sorted(values) for stage, values in self.stages.items()}
+        return {
+            stage: {
+                'count': len(values),
+                'total': sum(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+            }
+            for stage, values in stages.items()
+        }
+
+    def images_per_second(self):
+        elapsed = time.monotonic() - self.started
+        return self.images / elapsed if elapsed > 0 else 0.0
+
+    def log_summary(self):
+        """Loguea percentiles por etapa, throughput y reparto por estrategia"""
+        if not self.images:
+            return
+        summary = self.stage_summary()
+        logger.info(f"⏱️ Stage profile: {self.images} images, {self.images_per_second():.2f} images/s")
+        for stage, stats in sorted(summary.items(), key=lambda item: -item[1]['total']):
+            logger.info(
+                f"   {stage:<16} n={stats['count']:<4} p50 {stats['p50'] * 1000:7.1f}ms  "
+                f"p95 {stats['p95'] * 1000:7.1f}ms  p99 {stats['p99'] * 1000:7.1f}ms  "
+                f"total {stats['total']:.1f}s"
+            )
+        if self.run_stages:
+            logger.info("   run: " + ", ".join(
+                f"{stage} {seconds:.1f}s" for stage, seconds in self.run_stages.items()
+            ))
+        logger.info("   strategies: " + ", ".join(
+            f"{strategy} {count / self.images * 100:.0f}%"
+            for strategy, count in self.strategies.most_common()
+        ))
+
+    def markdown(self):
+        """Tabla de percentiles para GITHUB_STEP_SUMMARY"""
+        lines = ["| Stage | n | p50 | p95 | p99 |", "|---|---|---|---|---|"]
+        for stage, stats in sorted(self.stage_summary().items()):
+            lines.append(
+                f"| {stage} | {stats['count']} | {stats['p50'] * 1000:.0f}ms | "
+                f"{stats['p95'] * 1000:.0f}ms | {stats['p99'] * 1000:.0f}ms |"
+            )
+        shares = ", ".join(
+            f"{strategy} {count}" for strategy, count in self.strategies.most_common()
+        )
+        lines.append(f"\nStrategies: {shares}\n")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self):
+        """Escribe las métricas de la ejecución en formato textfile (reemplazo atómico)"""
+        if not self.prometheus_path:
+            return
+        lines = [
+            "# HELP ocr_stage_seconds Per-image duration of each pipeline stage in the last run",
+            "# TYPE ocr_stage_seconds summary",
+        ]
+        for stage, stats in sorted(self.stage_summary().items()):
+            for q in ('p50', 'p95', 'p99'):
+                quantile = int(q[1:]) / 100
+                lines.append(f'ocr_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {stats[q]:.6f}')
+            lines.append(f'ocr_stage_seconds_sum{{stage="{stage}"}} {stats["total"]:.6f}')
+            lines.append(f'ocr_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        lines += [
+            "# HELP ocr_run_images Images processed in the last run, by strategy",
+            "# TYPE ocr_run_images gauge",
+        ]
+        for strategy, count in sorted(self.strategies.items()):
+            lines.append(f'ocr_run_images{{strategy="{strategy}"}} {count}')
+        lines += [
+            "# HELP ocr_run_images_per_second Throughput of the last run",
+            "# TYPE ocr_run_images_per_second gauge",
+            f"ocr_run_images_per_second {self.images_per_second():.6f}",
+            "# HELP ocr_run_last_timestamp_seconds End time of the last run",
+            "# TYPE ocr_run_last_timestamp_seconds gauge",
+            f"ocr_run_last_timestamp_seconds {time.time():.0f}",
+        ]
+
+        directory = os.path.dirname(self.prometheus_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # El collector puede leer en cualquier momento: escribir aparte y renombrar
+        fd, tmp_path = tempfile.mkstemp(dir=directory or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.prometheus_path)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
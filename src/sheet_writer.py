@@ -0,0 +1,237 @@
+"""
+Buffer de escritura para Google Sheets.
+
+Acumula los rangos a escribir durante una ejecución y los envía con
+values.batchUpdate en pocas llamadas (por tamaño, por antigüedad y al final
+de la ejecución), a través del planificador de APIs. Cada rango se anota antes en un spool
+local (JSONL) para no perder resultados si el proceso muere a mitad del
+lote: al arrancar se re-encolan y se envían en el siguiente flush. Cada
+escritura lleva el NOMBRE_ARCHIVO de su fila; antes de reenviar lo recuperado
+se compara con el Sheet y se descarta lo que ya no cae en la misma foto
+(filas borradas o movidas entre ejecuciones).
+
+Si un flush falla, add() no vuelve a intentarlo hasta que pase una espera que
+se duplica con cada fallo seguido. Si el API rechaza el lote (4xx, ej. un
+rango inválido) se parte en mitades hasta aislar los rangos culpables, que se
+apartan en un archivo de rechazados para que no bloqueen al resto.
+"""
+import json
+import logging
+import os
+import re
+import time
+
+from src.api_scheduler import get_scheduler, is_rejected
+from src.run_profile import span
+
+logger = logging.getLogger(__name__)
+
+
+class SheetWriteBuffer:
+    """Escrituras diferidas y agrupadas sobre una hoja de gspread"""
+
+    def __init__(self, sheet, spool_path, max_ranges, max_age_seconds, retry_max_seconds=300,
+                 filename_col=None):
+        """
+        Args:
+            sheet: gspread.Worksheet destino
+            spool_path (str): Archivo JSONL con las escrituras aún no confirmadas
+            max_ranges (int): Flush al acumular esta cantidad de rangos
+            max_age_seconds (float): Flush si el rango más antiguo lleva este tiempo
+                esperando; también es la espera inicial tras un flush fallido
+            retry_max_seconds (float): Espera máxima entre flushes fallidos
+            filename_col (str): Letra de la columna NOMBRE_ARCHIVO; si se da, las
+                escrituras recuperadas del spool se verifican antes de enviarse
+        """
+        self.sheet = sheet
+        self.spool_path = spool_path
+        self.rejected_path = os.path.splitext(spool_path)[0] + '_rejected.jsonl'
+        self.max_ranges = max_ranges
+        self.max_age_seconds = max_age_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.filename_col = filename_col
+        self.pending = []
+        self.oldest_pending = None
+        self.retry_delay = max_age_seconds
+        self.retry_at = 0.0
+        self.api_calls = 0
+        self.rejected = 0
+        # Las primeras `unverified` pendientes vienen del spool y falta compararlas con el Sheet
+        self.unverified = 0
+        self._replay_spool()
+
+    def _replay_spool(self):
+        """Re-encola escrituras de una ejecución anterior que no llegaron al Sheet"""
+        try:
+            with open(self.spool_path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                self.pending.append(json.loads(line))
+            except ValueError:
+                # Última línea truncada si el proceso murió escribiendo
+                continue
+
+        if self.pending:
+            self.oldest_pending = time.monotonic()
+            if self.filename_col:
+                self.unverified = len(self.pending)
+            logger.warning(f"⚠️ {len(self.pending)} pending sheet writes recovered from previous run")
+
+    def _verify_recovered(self):
+        """
+        Descarta las escrituras recuperadas cuya fila ya no tiene el mismo
+        NOMBRE_ARCHIVO (o que no lo registraron) y reescribe el spool.
+        """
+        recovered, added = self.pending[:self.unverified], self.pending[self.unverified:]
+        rows = sorted({self._row_of(entry) for entry in recovered})
+        value_ranges = get_scheduler().call(
+            'sheets_read', self.sheet.batch_get, [f'{self.filename_col}{row}' for row in rows]
+        )
+        current = {
+            row: str(vr[0][0]) if vr and vr[0] else ''
+            for row, vr in zip(rows, value_ranges)
+        }
+        kept = [entry for entry in recovered if entry.get('file') == current[self._row_of(entry)]]
+        if len(kept) < len(recovered):
+            logger.warning(f"⚠️ Dropped {len(recovered) - len(kept)} recovered sheet writes whose "
+                           f"row no longer holds the same NOMBRE_ARCHIVO")
+        self.pending = kept + added
+        self.unverified = 0
+        self._rewrite_spool()
+
+    @staticmethod
+    def _row_of(entry):
+        """Fila de un rango A1 de una sola fila ('C5:H5' -> 5)"""
+        return int(re.match(r'[A-Z]+(\d+)', entry['range']).group(1))
+
+    def add(self, a1_range, values, filename=None):
+        """
+        Encola valores para un rango (ej: 'C5:H5', [[...]]).
+        Puede disparar un flush si se alcanza algún umbral.
+
+        Args:
+            filename (str): NOMBRE_ARCHIVO de la fila (para verificar si se reenvía desde el spool)
+        """
+        entry = {'range': a1_range, 'values': values, 'file': filename}
+        self._append_spool(entry)
+        self.pending.append(entry)
+        if self.oldest_pending is None:
+            self.oldest_pending = time.monotonic()
+
+        now = time.monotonic()
+        if now < self.retry_at:
+            # Un flush reciente falló: esperar en lugar de reenviar el lote en cada add()
+            return
+        if len(self.pending) >= self.max_ranges or now - self.oldest_pending >= self.max_age_seconds:
+            self.flush()
+
+    def flush(self):
+        """
+        Envía todo lo pendiente con values.batchUpdate.
+
+        Returns:
+            bool: True si no queda nada pendiente
+        """
+        if not self.pending:
+            return True
+
+        done = []
+        calls, rejected = self.api_calls, self.rejected
+        try:
+            with span('sheet_flush'):
+                if self.unverified:
+                    self._verify_recovered()
+                if self.pending:
+                    self._send(self.pending, done)
+        except Exception as e:
+            # Lo ya escrito o apartado sale del spool; el resto queda para el próximo flush / ejecución
+            if done:
+                self.pending = self.pending[len(done):]
+                self._rewrite_spool()
+            self.retry_at = time.monotonic() + self.retry_delay
+            logger.error(f"❌ Sheet flush failed, {len(self.pending)} writes still pending "
+                         f"(next attempt in {self.retry_delay:.0f}s): {e}")
+            self.retry_delay = min(self.retry_delay * 2, self.retry_max_seconds)
+            return False
+
+        logger.info(f"  ✓ Flushed {len(self.pending) - (self.rejected - rejected)} ranges to sheet "
+                    f"in {self.api_calls - calls} call(s)")
+        self.pending = []
+        self.oldest_pending = None
+        self.retry_delay = self.max_age_seconds
+        self.retry_at = 0.0
+        self._clear_spool()
+        return True
+
+    def _send(self, entries, done):
+        """
+        values.batchUpdate de entries. Si el API rechaza el lote, lo parte en
+        mitades hasta aislar los rangos culpables y los aparta.
+
+        Args:
+            entries (list): Escrituras a enviar, en orden
+            done (list): Acumula las escrituras ya enviadas o apartadas (siempre
+                un prefijo de las pendientes)
+
+        Raises:
+            Exception: errores transitorios (o de red) tras los reintentos del planificador
+        """
+        try:
+            # Reintentos con backoff a cargo del planificador
+            get_scheduler().call(
+                'sheets_write', self.sheet.batch_update,
+                [{'range': entry['range'], 'values': entry['values']} for entry in entries],
+                value_input_option='RAW'
+            )
+        except Exception as e:
+            if not is_rejected(e):
+                raise
+            if len(entries) == 1:
+                self._reject(entries[0], e)
+                done.extend(entries)
+                return
+            middle = len(entries) // 2
+            self._send(entries[:middle], done)
+            self._send(entries[middle:], done)
+            return
+        self.api_calls += 1
+        done.extend(entries)
+
+    def _reject(self, entry, error):
+        """Aparta una escritura que el API rechaza para revisarla a mano"""
+        self.rejected += 1
+        logger.error(f"❌ Sheet rejected write to {entry['range']}, moved to {self.rejected_path}: {error}")
+        directory = os.path.dirname(self.rejected_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.rejected_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(dict(entry, error=str(error)), ensure_ascii=False) + '\n')
+
+    def _append_spool(self, entry):
+        directory = os.path.dirname(self.spool_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.spool_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_spool(self):
+        """Deja en el spool solo lo que sigue pendiente (reemplazo atómico)"""
+        tmp_path = self.spool_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.pending:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.spool_path)
+
+    def _clear_spool(self):
+        try:
+            os.remove(self.spool_path)
+        except FileNotFoundError:
+            pass
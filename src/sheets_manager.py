@@ -4,13 +4,34 @@ Gestor profesional para integración Google Sheets <-> OCR
 """
 import logging
 import gspread
-import cv2
+from gspread.utils import rowcol_to_a1
 import os
-import tempfile
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from config import (
+    OCR_WORKERS, OCR_BATCH_SIZE, DRIVE_INDEX_PATH, PIPELINE_PREFETCH, PIPELINE_QUEUE_SIZE,
+    MAX_FILES_PER_RUN, RUN_TIME_BUDGET, LEASE_ENABLED, LEASE_SECONDS, LEASE_SETTLE_SECONDS,
+    SHEETS_SPOOL_DIR, SHEETS_WRITE_BATCH_RANGES, SHEETS_WRITE_MAX_AGE, SHEETS_WRITE_RETRY_MAX,
+    PROFILE_ENABLED, PROFILE_JSONL_PATH, PROFILE_PROMETHEUS_PATH
+)
+from src.api_scheduler import CircuitOpenError, get_scheduler
+from src.drive_index import DriveFileIndex
+from src.row_leases import RowLeaseManager
+from src.row_pipeline import RowPipeline
+from src.row_scanner import PendingRowScanner, column_letter
+from src.run_journal import RunJournal
+from src.run_profile import RunProfile, collect, span
+from src.sheet_writer import SheetWriteBuffer
 from src.ine_processor import INEOCRProcessor
+from src.row_worker import (
+    RowProcessor, build_blob_store, build_ocr_cache, init_worker, process_downloaded_in_worker
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +44,34 @@ class INESheetsManager:
     4. Actualiza Sheet con resultados + logs
     """
     
-    def __init__(self, credentials_path: str, sheet_name: str):
+    def __init__(self, credentials_path: str, sheet_name: str, worker_id: str = None,
+                 shard_index: int = 0, shard_count: int = 1, prometheus_path: str = None):
         """
         Args:
             credentials_path: Path a service account JSON
             sheet_name: Nombre del Sheet (ej: "INE_Registros")
+            worker_id: Identificador de esta instancia en los leases
+                       (default: host-pid)
+            shard_index: Shard de esta instancia (0..shard_count-1)
+            shard_count: Total de shards; cada uno procesa solo las filas
+                         cuyo NOMBRE_ARCHIVO cae en él (1 = sin sharding)
+            prometheus_path: Archivo textfile para el node exporter con el perfil
+                             de cada ejecución (default: PROFILE_PROMETHEUS_PATH)
         """
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"shard_index must be in [0, {shard_count}), got {shard_index}")
         self.credentials_path = credentials_path
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.prometheus_path = prometheus_path or PROFILE_PROMETHEUS_PATH
+        self.profile = None
+        # Apagado ordenado (modo daemon): no tomar filas nuevas
+        self.stop_requested = threading.Event()
+        # Pool OCR reutilizado entre ciclos (se crea al primer uso)
+        self._pool = None
+        self._pool_workers = 0
+        self._pool_broken = False
         
         # Autenticar con Google
         scope = ['https://www.googleapis.com/auth/spreadsheets',
@@ -40,24 +82,67 @@ class INESheetsManager:
                 credentials_path, scopes=scope
             )
             
+            self.credentials = credentials
             self.gc = gspread.authorize(credentials)
-            self.sheet = self.gc.open(sheet_name).sheet1
+            self.scheduler = get_scheduler()
+            self.sheet = self.scheduler.call('sheets_read', self.gc.open, sheet_name).sheet1
+            
+            # Estado local (spool, bitácora, marca de agua) por hoja y por shard
+            state_id = self.sheet.spreadsheet.id
+            if shard_count > 1:
+                state_id += f"_shard{shard_index}of{shard_count}"
             self.drive_service = build('drive', 'v3', credentials=credentials)
             
             # Inicializar OCR processor
             self.ocr = INEOCRProcessor(debug=False)
+            self.file_index = DriveFileIndex(DRIVE_INDEX_PATH)
+            self.row_processor = RowProcessor(
+                self.drive_service, self.ocr, build_ocr_cache(), build_blob_store(),
+                self.file_index
+            )
+            self.run_stats = {}
             
             # Definir headers esperados (debe coincidir con la lógica de update)
             self.EXPECTED_HEADERS = [
                 "FECHA_HORA", "NOMBRE_ARCHIVO", "CURP_DETECTADA", "CONFIANZA_OCR",
                 "NOMBRE_EXTRAIDO", "SEXO_EXTRAIDO", "TEXTO_CRUDO", "STATUS",
                 "LINK_FOTO", "BIOLOGICO", "DOSIS", "OCR_STRATEGY",
-                "OCR_TIMESTAMP", "OCR_ISSUES"
+                "OCR_TIMESTAMP", "OCR_ISSUES", "OCR_LEASE", "CURP_CAPTURA"
             ]
             
+            # Escrituras agrupadas (values.batchUpdate) con spool local
+            self.writer = SheetWriteBuffer(
+                self.sheet,
+                os.path.join(SHEETS_SPOOL_DIR, f"pending_writes_{state_id}.jsonl"),
+                max_ranges=SHEETS_WRITE_BATCH_RANGES,
+                max_age_seconds=SHEETS_WRITE_MAX_AGE,
+                retry_max_seconds=SHEETS_WRITE_RETRY_MAX,
+                filename_col=column_letter(self.EXPECTED_HEADERS, 'NOMBRE_ARCHIVO')
+            )
+            
+            # Bitácora de etapas por fila para reanudar ejecuciones interrumpidas
+            self.journal = RunJournal(
+                os.path.join(SHEETS_SPOOL_DIR, f"run_journal_{state_id}.sqlite3")
+            )
+            
             # Auto-reparar headers si es necesario
             self._validate_and_fix_headers()
             
+            # Escaneo incremental de pendientes (columnas mínimas + marca de agua)
+            self.scanner = PendingRowScanner(
+                self.sheet,
+                self.EXPECTED_HEADERS,
+                os.path.join(SHEETS_SPOOL_DIR, f"scan_state_{state_id}.json"),
+                shard_index=shard_index,
+                shard_count=shard_count
+            )
+            
+            # Reparto de filas entre instancias (EN_PROCESO + lease)
+            self.leases = RowLeaseManager(
+                self.sheet, self.EXPECTED_HEADERS, self.worker_id,
+                LEASE_SECONDS, LEASE_SETTLE_SECONDS
+            ) if LEASE_ENABLED else None
+            
             logger.info(f"✓ SheetsManager initialized for '{sheet_name}'")
         except Exception as e:
             logger.error(f"❌ Error initializing SheetsManager: {e}")
@@ -69,7 +154,7 @@ class INESheetsManager:
         Si no, los sobrescribe. Esto evita el error 'header row not unique'.
         """
         try:
-            current_headers = self.sheet.row_values(1)
+            current_headers = self.scheduler.call('sheets_read', self.sheet.row_values, 1)
             
             # Verificar si hay duplicados o si faltan headers
             if len(current_headers) < len(self.EXPECTED_HEADERS) or \
@@ -78,7 +163,9 @@ class INESheetsManager:
                 logger.warning("⚠️ Headers incorrectos o duplicados detectados. Reparando...")
                 
                 # Actualizar fila 1 con los headers canónicos
-                self.sheet.update('A1:N1', [self.EXPECTED_HEADERS])
+                self.scheduler.call('sheets_write', self.sheet.update,
+                                    f'A1:{rowcol_to_a1(1, len(self.EXPECTED_HEADERS))}',
+                                    [self.EXPECTED_HEADERS])
                 logger.info("✅ Headers reparados exitosamente.")
                 
         except Exception as e:
@@ -86,127 +173,300 @@ class INESheetsManager:
             # No lanzamos excepción para intentar continuar, aunque get_all_records podría fallar
 
 
-    def process_pending_rows(self):
+    def process_pending_rows(self, workers: int = None, batch_size: int = None,
+                             max_files: int = None, time_budget: float = None):
         """
-        Main loop: procesar TODAS las filas con status 'PENDIENTE_OCR'
+        Main loop: procesar las filas con status 'PENDIENTE_OCR'
+
+        Args:
+            workers: Número de procesos OCR en paralelo (default: OCR_WORKERS).
+                     Con 1 se procesa en línea, sin pool.
+            batch_size: Filas por invocación de Tesseract en modo lote
+                        (default: OCR_BATCH_SIZE). Con 1 se procesa fila por fila.
+            max_files: Máximo de filas a procesar en esta ejecución
+                       (default: MAX_FILES_PER_RUN)
+            time_budget: Segundos tras los cuales no se toman filas nuevas
+                         (default: RUN_TIME_BUDGET)
+
+        Returns:
+            int: Filas escritas en esta pasada (incluye las recuperadas de la bitácora)
         """
-        logger.info("🔍 Scanning for pending rows...")
+        if PROFILE_ENABLED:
+            self.profile = RunProfile(PROFILE_JSONL_PATH, self.prometheus_path)
+        # Etapas de la ejecución completa (scan, claim, flush final)
+        with collect() as run_timings:
+            rows = self._run_pending_rows(workers, batch_size, max_files, time_budget)
+
+        if self.profile:
+            self.profile.record_run(run_timings)
+            self._log_profile()
+            self.profile.close()
+        return rows
+
+    def _run_pending_rows(self, workers, batch_size, max_files, time_budget):
+        """Cuerpo de process_pending_rows (mismos argumentos y retorno)"""
+        started = time.monotonic()
+        deadline = started + (time_budget or RUN_TIME_BUDGET)
+        self.run_stats = {'rows': 0, 'cache_hits': 0, 'saved_seconds': 0.0, 'ocr_seconds': 0.0,
+                          'started': started}
+        claimed_rows = []
         
         try:
-            # Leer todas las filas
-            rows = self.sheet.get_all_records()
+            # Resultados de una ejecución interrumpida que no llegaron a escribirse
+            self._replay_journal()
+            
+            # Leer solo NOMBRE_ARCHIVO/STATUS de las filas posteriores a la marca de agua
+            logger.info("🔍 Scanning for pending rows...")
+            with span('scan'):
+                pending_rows = self.scanner.scan()
             
-            pending_rows = []
-            for idx, row in enumerate(rows, start=2):  # Start at 2 (row 1 es headers)
-                status = str(row.get('STATUS', '')).strip().upper() # Usar STATUS (header real)
-                if status == 'PENDIENTE_OCR':
-                    pending_rows.append((idx, row))
+            # Saltar filas ya escritas según la bitácora (salvo reintentos explícitos)
+            pending_rows = self._skip_written(pending_rows)
             
             logger.info(f"Found {len(pending_rows)} pending rows")
             
+            if self.leases:
+                pending_rows = self.leases.claimable(pending_rows)
+            
+            max_files = max_files or MAX_FILES_PER_RUN
+            if len(pending_rows) > max_files:
+                logger.info(f"Processing the first {max_files}, the rest are left for the next run")
+                pending_rows = pending_rows[:max_files]
+            
+            if self.leases:
+                # Marcar EN_PROCESO con nuestro lease; otras instancias las saltan
+                with span('claim'):
+                    pending_rows = self.leases.claim(pending_rows)
+                claimed_rows = pending_rows
+            
             if not pending_rows:
                 logger.info("No pending rows. Exiting.")
-                return
+                return 0
+            
+            # Un listado (incremental) de ENTRADAS en lugar de una búsqueda por fila
+            with span('drive_index'):
+                refreshed = self.file_index.refresh(
+                    self.row_processor.drive, [row_data['NOMBRE_ARCHIVO'] for _, row_data in pending_rows]
+                )
+            if not refreshed:
+                logger.warning("⚠️ Drive index refresh failed, falling back to per-row lookups")
             
-            # Procesar cada uno
-            for row_num, row_data in pending_rows:
-                try:
-                    self._process_single_row(row_num, row_data)
-                except Exception as e:
-                    logger.error(f"ERROR processing row {row_num}: {e}")
-                    self._update_row_status(row_num, 'ERROR', str(e))
+            workers = workers or OCR_WORKERS
+            batch_size = batch_size or OCR_BATCH_SIZE
+            processed = self._process_rows_pipelined(pending_rows, workers, batch_size, deadline)
+
+            self.scanner.complete([row_num for row_num, _ in pending_rows[:processed]])
+            self._log_run_summary()
                     
+        except CircuitOpenError as e:
+            # Las filas no procesadas quedan en PENDIENTE_OCR para la siguiente ejecución
+            logger.error(f"🔌 Stopping run, Google APIs unavailable: {e}")
         except Exception as e:
             logger.error(f"❌ Error in process_pending_rows: {e}")
+        finally:
+            if claimed_rows:
+                # Devolver lo que no se alcanzó a procesar (presupuesto, APIs caídas)
+                written = self.journal.written_rows()
+                self.leases.release(self.writer, [row for row in claimed_rows if row[0] not in written])
+            # Enviar lo que quede en el buffer (incluye lo recuperado del spool)
+            if self.writer.flush():
+                self.journal.compact()
+            self.scheduler.log_summary()
+        
+        return self.run_stats['rows']
 
-    def _process_single_row(self, row_num: int, row_data: dict):
+    def _replay_journal(self):
         """
-        Procesar una sola fila:
-        1. Obtener image_path o drive_file_id
-        2. Cargar imagen
-        3. Correr OCR
-        4. Actualizar Sheet
+        Escribe los resultados con OCR terminado que quedaron sin escribir,
+        solo si su fila sigue teniendo el mismo NOMBRE_ARCHIVO
         """
-        logger.info(f"\n[Row {row_num}] Processing...")
-        
-        # Obtener nombre de archivo (que usaremos para buscar en Drive si no tenemos ID directo)
-        filename = row_data.get('NOMBRE_ARCHIVO')
-        
-        if not filename:
-            self._update_row_status(row_num, 'ERROR', 'No filename found')
+        outcomes = self.journal.unwritten_outcomes()
+        if not outcomes:
             return
-            
-        # Descargar desde Drive (buscando por nombre)
-        image_path = self._download_file_by_name(filename)
-        
-        if not image_path:
-             self._update_row_status(row_num, 'ERROR', f'File not found in Drive: {filename}')
-             return
+        current = self._current_filenames([outcome['row_num'] for _, outcome in outcomes])
+        stale = [outcome['row_num'] for filename, outcome in outcomes
+                 if filename != current[outcome['row_num']]]
+        if stale:
+            logger.warning(f"⚠️ Dropping {len(stale)} journal results whose row no longer holds "
+                           f"the same NOMBRE_ARCHIVO: {stale}")
+            self.journal.discard(stale)
+        outcomes = [(filename, outcome) for filename, outcome in outcomes
+                    if outcome['row_num'] not in stale]
+        if not outcomes:
+            return
+        logger.info(f"♻️ Replaying {len(outcomes)} finished results from the run journal")
+        for filename, outcome in outcomes:
+            self._write_outcome(outcome, filename)
+            self.journal.record(outcome['row_num'], 'written', filename=filename)
 
-        # Cargar imagen
-        try:
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError("Could not load image")
-        except Exception as e:
-            self._update_row_status(row_num, 'ERROR', f'Image load failed: {e}')
+    def _skip_written(self, pending_rows):
+        """
+        Quita las filas que la bitácora da por escritas (salvo reintentos
+        explícitos). Un registro con otro NOMBRE_ARCHIVO es de una fila que
+        se movió: se descarta y la fila se procesa.
+        """
+        written = self.journal.written_rows()
+        if not written:
+            return pending_rows
+        result, stale = [], []
+        for row_num, row_data in pending_rows:
+            if row_num in written and row_num not in self.scanner.retry_rows:
+                if written[row_num] == row_data['NOMBRE_ARCHIVO']:
+                    continue
+                stale.append(row_num)
+            result.append((row_num, row_data))
+        if stale:
+            logger.warning(f"⚠️ Journal entries for rows {stale} belong to other files, reprocessing")
+            self.journal.discard(stale)
+        return result
+
+    def _current_filenames(self, row_nums):
+        """NOMBRE_ARCHIVO actual de cada fila ({row_num: nombre}, '' si está vacía)"""
+        col = column_letter(self.EXPECTED_HEADERS, 'NOMBRE_ARCHIVO')
+        value_ranges = self.scheduler.call(
+            'sheets_read', self.sheet.batch_get, [f'{col}{row_num}' for row_num in row_nums]
+        )
+        return {
+            row_num: str(vr[0][0]) if vr and vr[0] else ''
+            for row_num, vr in zip(row_nums, value_ranges)
+        }
+
+    def _log_run_summary(self):
+        """
+        Resumen de la ejecución (incluye aciertos de la caché OCR y el
+        throughput del shard, para dimensionar la matriz de runners)
+        """
+        stats = self.run_stats
+        if not stats['rows']:
             return
-        
-        # Correr OCR
-        logger.info(f"  → Running OCR...")
+        hit_rate = stats['cache_hits'] / stats['rows'] * 100
+        elapsed = time.monotonic() - stats['started']
+        throughput = stats['rows'] / elapsed * 60 if elapsed > 0 else 0.0
+        shard = f"shard {self.shard_index + 1}/{self.shard_count}"
+        logger.info(
+            f"📊 Run summary ({shard}): {stats['rows']} rows in {elapsed:.1f}s "
+            f"({throughput:.1f} rows/min) | OCR {stats['ocr_seconds']:.1f}s | "
+            f"cache hits {stats['cache_hits']}/{stats['rows']} ({hit_rate:.0f}%), "
+            f"~{stats['saved_seconds']:.1f}s saved"
+        )
+
+        # En GitHub Actions, tabla en el resumen del job (uno por shard de la matriz)
+        summary_path = os.environ.get('GITHUB_STEP_SUMMARY')
+        if summary_path:
+            with open(summary_path, 'a', encoding='utf-8') as f:
+                f.write(
+                    "| Shard | Rows | Wall time | Rows/min | OCR time | Cache hits |\n"
+                    "|---|---|---|---|---|---|\n"
+                    f"| {shard} | {stats['rows']} | {elapsed:.1f}s | {throughput:.1f} | "
+                    f"{stats['ocr_seconds']:.1f}s | {stats['cache_hits']} |\n"
+                )
+
+    def _log_profile(self):
+        """Percentiles por etapa (log, resumen del job y textfile de Prometheus)"""
+        self.profile.log_summary()
+        if not self.profile.images:
+            return
+
+        summary_path = os.environ.get('GITHUB_STEP_SUMMARY')
+        if summary_path:
+            with open(summary_path, 'a', encoding='utf-8') as f:
+                f.write(self.profile.markdown())
         try:
-            # Procesamiento inteligente
-            ocr_results = self.ocr.process_ine_image(
-                image_path=image_path
-            )
-            
-            logger.info(f"  → OCR Complete: {ocr_results['overall_confidence']:.0f}% confidence")
-            
-            # Actualizar Sheet
-            self._update_row_with_results(row_num, ocr_results)
-            
-        except Exception as e:
-            logger.error(f"OCR Failed: {e}", exc_info=True)
-            self._update_row_status(row_num, 'ERROR', f'OCR failed: {e}')
-        finally:
-            # Limpiar archivo temporal
-            if os.path.exists(image_path):
-                os.remove(image_path)
+            self.profile.write_prometheus()
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write Prometheus textfile: {e}")
 
-    def _download_file_by_name(self, filename: str) -> str:
+    def _process_rows_pipelined(self, pending_rows: list, workers: int, batch_size: int,
+                                deadline: float = None) -> int:
         """
-        Busca y descarga un archivo por nombre desde Drive.
-        Retorna path temporal.
+        Descarga, OCR y escritura solapadas (ver RowPipeline). El OCR corre
+        en línea si workers == 1 o en un pool de procesos, en lotes de
+        batch_size filas. Los resultados se escriben en el orden de las filas.
+
+        Returns:
+            int: Filas tomadas antes de vencer el deadline (un prefijo de pending_rows)
         """
+        pipeline = RowPipeline(
+            self._make_downloader, self._write_outcome,
+            prefetch=PIPELINE_PREFETCH, queue_size=PIPELINE_QUEUE_SIZE,
+            journal=self.journal, deadline=deadline, interrupt=self.stop_requested,
+            profile=self.profile, owned=self.leases.owned if self.leases else None
+        )
+
+        if workers <= 1:
+            logger.info(f"⚙️ Processing {len(pending_rows)} rows (batch size {batch_size}, "
+                        f"{PIPELINE_PREFETCH} download threads)")
+            pipeline.run(pending_rows, self.row_processor.process_downloaded, batch_size)
+            return pipeline.fed
+
+        logger.info(f"⚙️ Processing {len(pending_rows)} rows with {workers} OCR workers "
+                    f"(batch size {batch_size}, {PIPELINE_PREFETCH} download threads)")
+
+        pool = self._ocr_pool(workers)
         try:
-            # Buscar archivo
-            query = f"name = '{filename}' and trashed = false"
-            results = self.drive_service.files().list(q=query, fields="files(id, name)").execute()
-            files = results.get('files', [])
-            
-            if not files:
-                logger.warning(f"File not found: {filename}")
-                return None
-                
-            file_id = files[0]['id']
-            
-            # Descargar
-            request = self.drive_service.files().get_media(fileId=file_id)
-            file_content = request.execute()
-            
-            # Guardar en temp
-            fd, path = tempfile.mkstemp(suffix='.jpg')
-            with os.fdopen(fd, 'wb') as f:
-                f.write(file_content)
-            
-            logger.info(f"  ✓ Downloaded {filename} to {path}")
-            return path
-            
-        except Exception as e:
-            logger.error(f"Error downloading file: {e}")
-            return None
+            pipeline.run(pending_rows, lambda items, hints: self._submit_ocr(pool, items, hints), batch_size)
+        except CircuitOpenError:
+            # No esperar lotes de OCR cuyos resultados ya no se van a escribir
+            self.close()
+            raise
+        finally:
+            if self._pool_broken:
+                # Un worker murió: el siguiente ciclo arranca con un pool nuevo
+                self.close()
+        return pipeline.fed
+
+    def _ocr_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Pool de procesos OCR, reutilizado entre ciclos (modo daemon)"""
+        if self._pool is None or self._pool_workers != workers:
+            self.close()
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+            self._pool_workers = workers
+        return self._pool
+
+    def _submit_ocr(self, pool: ProcessPoolExecutor, items: list, hints: dict):
+        try:
+            future = pool.submit(process_downloaded_in_worker, items, hints)
+        except BrokenProcessPool:
+            self._pool_broken = True
+            raise
+        future.add_done_callback(self._check_pool)
+        return future
+
+    def _check_pool(self, future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._pool_broken = True
+
+    def close(self):
+        """Libera el pool de procesos OCR (llamar al terminar)"""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._pool_workers = 0
+        self._pool_broken = False
+
+    def _make_downloader(self) -> RowProcessor:
+        """RowProcessor para un hilo de descarga, con su propio cliente de Drive"""
+        drive_service = build('drive', 'v3', credentials=self.credentials)
+        return RowProcessor(
+            drive_service, self.ocr, blob_store=self.row_processor.drive.blob_store,
+            file_index=self.file_index
+        )
+
+    def _write_outcome(self, outcome: dict, filename: str):
+        """Escribe en el Sheet el resultado de RowProcessor.run (filename: NOMBRE_ARCHIVO de la fila)"""
+        self.run_stats['rows'] += 1
+        if outcome['cached']:
+            self.run_stats['cache_hits'] += 1
+            self.run_stats['saved_seconds'] += outcome['ocr_seconds']
+        else:
+            self.run_stats['ocr_seconds'] += outcome['ocr_seconds']
+
+        if outcome['error']:
+            self._update_row_status(outcome['row_num'], 'ERROR', outcome['error'], filename)
+        else:
+            self._update_row_with_results(outcome['row_num'], outcome['results'], filename)
 
-    def _update_row_with_results(self, row_num: int, ocr_results: dict):
+    def _update_row_with_results(self, row_num: int, ocr_results: dict, filename: str = None):
         """
         Actualizar Sheet con resultados OCR.
         
@@ -225,6 +485,8 @@ class INESheetsManager:
         L: OCR_STRATEGY
         M: OCR_TIMESTAMP
         N: OCR_ISSUES
+        O: OCR_LEASE (se limpia al escribir el resultado)
+        P: CURP_CAPTURA (No tocar: la escribe la app de captura)
         """
         
         fields = ocr_results['fields']
@@ -248,13 +510,14 @@ class INESheetsManager:
         try:
             # Actualizar Bloque C-H (Indices 3-8, columnas C,D,E,F,G,H)
             # Rango C{row}:H{row}
-            self.sheet.update(f'C{row_num}:H{row_num}', [[curp, conf, nombre, sexo, raw_text, status]])
+            self.writer.add(f'C{row_num}:H{row_num}', [[curp, conf, nombre, sexo, raw_text, status]],
+                            filename)
             
-            # Actualizar Bloque L-N (Indices 12-14, columnas L,M,N)
-            # Rango L{row}:N{row}
-            self.sheet.update(f'L{row_num}:N{row_num}', [[strategy, timestamp, issues]])
+            # Actualizar Bloque L-O (Indices 12-15, columnas L,M,N + liberar lease en O)
+            # Rango L{row}:O{row}
+            self.writer.add(f'L{row_num}:O{row_num}', [[strategy, timestamp, issues, '']], filename)
             
-            logger.info(f"  ✓ Row {row_num} updated successfully")
+            logger.info(f"  ✓ Row {row_num} queued for update")
             
         except Exception as e:
             logger.error(f"  ✗ Failed to update row: {e}")
@@ -269,13 +532,13 @@ class INESheetsManager:
                 issues.append(f"{field_name}({field.confidence:.0f}%)")
         return '; '.join(issues) if issues else 'None'
     
-    def _update_row_status(self, row_num: int, status: str, message: str = ''):
+    def _update_row_status(self, row_num: int, status: str, message: str = '', filename: str = None):
         """
         Actualizar solo el status de una fila (para errores).
         Columna H es STATUS. Columna N es ISSUES (usaremos esa para el mensaje).
         """
         try:
-            self.sheet.update_cell(row_num, 8, status) # Col H
-            self.sheet.update_cell(row_num, 14, f"ERROR: {message}") # Col N
+            self.writer.add(f'H{row_num}', [[status]], filename) # Col H
+            self.writer.add(f'N{row_num}:O{row_num}', [[f"ERROR: {message}", '']], filename) # Col N (+ lease en O)
         except Exception as e:
             logger.error(f"Failed to update status: {e}")
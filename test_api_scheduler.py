@@ -0,0 +1,143 @@
+"""
+Pruebas de APIScheduler: token bucket, clasificación de errores y circuit breaker.
+
+Uso:
+    python -m pytest -q test_api_scheduler.py
+"""
+import logging
+import os
+import socket
+import sys
+from types import SimpleNamespace
+
+import httplib2
+import pytest
+import requests
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+import src.api_scheduler as api_scheduler
+from src.api_scheduler import APIScheduler, CircuitOpenError, TokenBucket, is_rejected, is_retryable
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+class HttpError(Exception):
+    """Error con código HTTP como googleapiclient.errors.HttpError"""
+
+    def __init__(self, status, message=''):
+        super().__init__(message)
+        self.resp = SimpleNamespace(status=status)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj falso: sleep() avanza el tiempo sin esperar"""
+    clock = SimpleNamespace(now=1000.0, slept=[])
+
+    def sleep(seconds):
+        clock.slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(api_scheduler, 'time', SimpleNamespace(monotonic=lambda: clock.now, sleep=sleep))
+    return clock
+
+
+def scheduler(**overrides):
+    options = dict(max_retries=3, backoff_base=1.0, backoff_max=8.0, failure_threshold=2, cooldown=10,
+                   max_pause=15)
+    options.update(overrides)
+    return APIScheduler({'sheets_write': 600}, **options)
+
+
+def test_token_bucket_allows_burst_then_throttles(clock):
+    bucket = TokenBucket(per_minute=600)  # 10/s, ráfaga de 100
+    assert [bucket.acquire() for _ in range(100)] == [0.0] * 100
+    assert bucket.acquire() == pytest.approx(0.1)
+    assert bucket.acquire() == pytest.approx(0.1)
+
+    # Un minuto sin llamadas rellena solo hasta la capacidad
+    clock.now += 60
+    assert [bucket.acquire() for _ in range(100)] == [0.0] * 100
+    assert bucket.acquire() > 0
+
+
+@pytest.mark.parametrize('exc, retryable', [
+    (HttpError(429), True),
+    (HttpError(503), True),
+    (HttpError(403, 'userRateLimitExceeded'), True),
+    (HttpError(403, 'insufficientPermissions'), False),
+    (HttpError(400, 'Unable to parse range'), False),
+    (ConnectionError('reset'), True),
+    (socket.timeout('timed out'), True),
+    (httplib2.ServerNotFoundError('Unable to find the server'), True),
+    (requests.exceptions.ConnectionError('Connection aborted'), True),
+    (requests.exceptions.ReadTimeout('Read timed out'), True),
+    (requests.exceptions.HTTPError('404 Client Error'), False),
+    (ValueError('bug'), False),
+])
+def test_retry_classification(exc, retryable):
+    assert is_retryable(exc) == retryable
+
+
+def test_rejected_is_only_permanent_client_errors():
+    assert is_rejected(HttpError(400))
+    assert not is_rejected(HttpError(429))
+    assert not is_rejected(HttpError(500))
+    assert not is_rejected(ConnectionError('reset'))
+
+
+def test_transient_errors_are_retried_and_rejections_are_not(clock):
+    api = scheduler()
+    errors = [HttpError(503), requests.exceptions.ConnectionError('reset')]
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return 'ok'
+
+    assert api.call('sheets_write', flaky) == 'ok'
+    assert api.stats['sheets_write']['retries'] == 2
+
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise HttpError(400)
+
+    with pytest.raises(HttpError):
+        api.call('sheets_write', bad_request)
+    assert len(calls) == 1
+    assert api.consecutive_failures == 0
+
+
+def test_circuit_pauses_then_stops_the_run(clock):
+    api = scheduler(max_retries=0)
+
+    def down():
+        raise HttpError(503)
+
+    # Dos fallos seguidos abren el circuito 10 s
+    for _ in range(2):
+        with pytest.raises(HttpError):
+            api.call('sheets_write', down)
+    assert api.open_until == clock.now + 10
+
+    # La siguiente llamada espera la pausa, vuelve a fallar y la pausa crece hasta el máximo
+    with pytest.raises(HttpError):
+        api.call('sheets_write', down)
+    assert clock.slept == [10]
+
+    # 10 + 15 s de pausa superan max_pause: se detiene la ejecución sin llamar
+    with pytest.raises(CircuitOpenError):
+        api.call('sheets_write', lambda: 'ok')
+    assert api.stats['sheets_write']['failures'] == 3
+
+    # Si el API se recupera a tiempo, la cuenta de pausas vuelve a cero
+    api = scheduler(max_retries=0)
+    for _ in range(2):
+        with pytest.raises(HttpError):
+            api.call('sheets_write', down)
+    assert api.call('sheets_write', lambda: 'ok') == 'ok'
+    assert (api.consecutive_failures, api.total_paused) == (0, 0.0)
@@ -0,0 +1,73 @@
+"""
+Pruebas de BlobStore: verificación por md5 y desalojo LRU por tamaño.
+
+Uso:
+    python -m pytest -q test_blob_store.py
+"""
+import logging
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+import src.blob_store as blob_store
+from src.blob_store import BlobStore, md5_hex
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+def blob(i):
+    return bytes([i]) * 100
+
+
+def put_at(store, data, mtime):
+    """Guarda data con una fecha de uso fija (orden LRU determinista)"""
+    store.put(md5_hex(data), data)
+    os.utime(store._path(md5_hex(data)), (mtime, mtime))
+
+
+def test_content_must_match_md5():
+    store = BlobStore(tempfile.mkdtemp(), max_bytes=1024)
+    with pytest.raises(ValueError):
+        store.put(md5_hex(b'otra imagen'), b'imagen')
+    assert store.get(md5_hex(b'otra imagen')) is None
+
+    store.put(md5_hex(b'imagen'), b'imagen')
+    assert store.get(md5_hex(b'imagen')) == b'imagen'
+
+    # Un blob que se corrompe en disco se descarta en la lectura
+    path = store._path(md5_hex(b'imagen'))
+    with open(path, 'wb') as f:
+        f.write(b'imagem')
+    assert store.get(md5_hex(b'imagen')) is None
+    assert not os.path.exists(path)
+    assert store._total == 0
+
+
+def test_least_recently_used_blobs_are_evicted(monkeypatch):
+    walks = []
+    real_walk = os.walk
+    monkeypatch.setattr(blob_store.os, 'walk', lambda root: walks.append(root) or real_walk(root))
+
+    store = BlobStore(tempfile.mkdtemp(), max_bytes=350, evict_to=0.6)
+    for i in range(3):
+        put_at(store, blob(i), 1000 + i)
+    # Solo el primer put recorre el directorio; luego se lleva el total
+    assert len(walks) == 1
+    assert store._total == 300
+
+    assert store.get(md5_hex(blob(0))) == blob(0)
+    put_at(store, blob(3), 2000)
+    # 400 > 350: se baja a 210 desalojando las dos menos usadas (1 y 2)
+    assert len(walks) == 2
+    assert [store.get(md5_hex(blob(i))) is not None for i in range(4)] == [True, False, False, True]
+    assert store._total == 200
+
+    # Reemplazar un blob existente no duplica su tamaño
+    store.put(md5_hex(blob(3)), blob(3))
+    assert store._total == 200
+    assert len(walks) == 2
@@ -0,0 +1,43 @@
+"""
+Pruebas de la extracción de CURP del texto OCR y del estado que recibe el resultado.
+
+Uso:
+    python -m pytest -q test_curp_extraction.py
+"""
+import logging
+import os
+import sys
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from src.ine_processor import INEOCRProcessor
+from src.robust_extractor import RobustExtractor
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+def status(results):
+    return 'COMPLETADO' if results['overall_confidence'] >= 80 else 'REVISION'
+
+
+def test_correction_is_verified_by_check_digit():
+    assert RobustExtractor.find_curp_fuzzy('CURP RASS85O2O4HDGMTL06') == 'RASS850204HDGMTL06'
+    # Dígito verificador que ninguna corrección cuadra: no se adivina una CURP
+    assert RobustExtractor.find_curp_fuzzy('CURP RASS850204HDGMTL07') is None
+    text = 'RASS850204HDGMTL07'
+    assert RobustExtractor.correct_windows(text, np.array([0])) is None
+
+
+def test_results_without_valid_curp_go_to_revision():
+    processor = INEOCRProcessor()
+    results = processor._build_results('CURP RASS850204HDGMTL06', 0.95, 'ROI_First')
+    assert results['fields']['curp'].value == 'RASS850204HDGMTL06'
+    assert status(results) == 'COMPLETADO'
+
+    for text in ('CURP RASS850204HDGMTL07', 'CREDENCIAL PARA VOTAR'):
+        results = processor._build_results(text, 0.95, 'Full_Page')
+        assert results['fields']['curp'].value == ''
+        assert status(results) == 'REVISION'
@@ -0,0 +1,64 @@
+"""
+Pruebas de la verificación de la CURP sugerida (hint) contra la lectura zonal.
+
+Uso:
+    python -m pytest -q test_curp_hint.py
+"""
+import logging
+import os
+import sys
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from src.ocr_engine import OCREngine, hint_mismatches
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+HINT = 'GOMC850312HDFRRL05'
+
+
+class FixedBackend:
+    """Backend de OCR que siempre lee el mismo texto"""
+
+    def __init__(self, text):
+        self.text = text
+
+    def image_to_string(self, image, config=''):
+        return self.text
+
+
+def verify(zonal_text):
+    engine = OCREngine(backend=FixedBackend(zonal_text))
+    return engine.verify_curp_hint(np.full((600, 950), 255, dtype=np.uint8), HINT)
+
+
+def test_exact_match_after_confusions():
+    assert hint_mismatches('CURP GOMC850312HDFRRL05', HINT) == 0
+    assert hint_mismatches('CURP G0MC85O3I2HDFRRLO5', HINT) == 0
+    assert hint_mismatches('CURP GOMC850312HDFRSL05', HINT) is None
+
+
+def test_check_digit_blind_position_is_never_tolerated():
+    # Posición 9 (peso 10): cualquier sustitución conserva el dígito verificador
+    assert hint_mismatches('GOMC850372HDFRRL05', HINT, max_mismatches=1) is None
+    # Posición 14 (peso 5): R→T suma 10 y tampoco se detecta
+    assert hint_mismatches('GOMC850312HDFTRL05', HINT, max_mismatches=1) is None
+    # R→S sí cambia el dígito verificador
+    assert hint_mismatches('GOMC850312HDFSRL05', HINT, max_mismatches=1) == 1
+    assert hint_mismatches('GOMC850312HDFSSL05', HINT, max_mismatches=1) is None
+
+
+def test_partial_match_is_reported_below_completion_threshold(monkeypatch):
+    result = verify('GOMC850312HDFRRL05')
+    assert (result['confidence'], result['strategy']) == (1.0, 'Hint_Verified')
+    assert verify('GOMC850312HDFSRL05') is None
+
+    # CURP_HINT_MAX_MISMATCHES = 1
+    monkeypatch.setattr(hint_mismatches, '__defaults__', (1,))
+    result = verify('GOMC850312HDFSRL05')
+    assert result['strategy'] == 'Hint_Partial'
+    assert result['curp'] == HINT
+    assert result['confidence'] * 100 < 80
@@ -0,0 +1,30 @@
+"""
+Pruebas de validate_curps: mismo resultado que validate_curp_complete en casos límite.
+
+Uso:
+    python -m pytest -q test_curp_validator.py
+"""
+import os
+import sys
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from benchmark_curp_validation import parity
+from src.curp_validator import REASON_FORMAT, REASON_OK, validate_curps
+
+CURP = 'GOMC850312HDFRRL05'
+
+
+def test_bulk_matches_scalar_validation():
+    curps = [
+        CURP, CURP.lower(), f'  {CURP} ', f'{CURP}\n', CURP[:10] + ' ' + CURP[10:],
+        # 19+ caracteres: sin espacios no se normalizan, con espacios al final sí
+        CURP + 'X', CURP + 'XX  ', CURP + '  X', CURP + ' ' * 10, 'X' * 30,
+        # upper() que cambia de largo, NUL (NumPy recorta los finales) y vacías
+        CURP + 'ß', CURP[:17] + 'ß', CURP + '\x00', CURP[:17] + '\x00', '\x00', None, '', ' ' * 25,
+    ]
+    assert parity(curps) == []
+
+    result = validate_curps(curps)
+    assert list(result.reason[[0, 1, 2, 5, 8]]) == [REASON_OK, REASON_OK, REASON_OK, REASON_FORMAT, REASON_OK]
@@ -0,0 +1,117 @@
+"""
+Pruebas de DriveFileIndex: refresco incremental con el Changes API de Drive.
+
+Uso:
+    python -m pytest -q test_drive_index.py
+"""
+import logging
+import os
+import sys
+import tempfile
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from config import FOLDER_ENTRADA_NAME
+from src.drive_index import DriveFileIndex
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+ENTRADAS = 'folder-entradas'
+OTRA = 'folder-procesadas'
+
+
+class FakeDrive:
+    """DriveManager con los archivos en memoria y su historial de cambios"""
+
+    def __init__(self):
+        self.folder_ids = {}
+        self.files = {}
+        self.changes = []
+        self.listings = 0
+        self.expired = False
+
+    def initialize_folders(self, root_folder_name):
+        self.folder_ids[FOLDER_ENTRADA_NAME.lower()] = ENTRADAS
+        return True
+
+    def put(self, file_id, name, parent=ENTRADAS, modified='2025-01-01T00:00:00Z'):
+        file = {'id': file_id, 'name': name, 'md5Checksum': f'md5-{file_id}', 'size': '10',
+                'modifiedTime': modified, 'parents': [parent], 'trashed': False}
+        self.files[file_id] = file
+        self.changes.append({'fileId': file_id, 'removed': False, 'file': dict(file)})
+
+    def trash(self, file_id):
+        self.files[file_id]['trashed'] = True
+        self.changes.append({'fileId': file_id, 'removed': False, 'file': dict(self.files[file_id])})
+
+    def delete(self, file_id):
+        del self.files[file_id]
+        self.changes.append({'fileId': file_id, 'removed': True})
+
+    def get_changes_start_token(self):
+        return str(len(self.changes))
+
+    def list_changes(self, page_token, fields):
+        if self.expired:
+            return None, None
+        return self.changes[int(page_token):], str(len(self.changes))
+
+    def list_all_files(self, folder_name, fields, modified_after=None):
+        self.listings += 1
+        return [dict(file) for file in self.files.values()
+                if ENTRADAS in file['parents'] and not file['trashed']]
+
+
+def setup():
+    drive = FakeDrive()
+    for i in range(4):
+        drive.put(f'id{i}', f'captura_{i}.jpg')
+    index = DriveFileIndex(os.path.join(tempfile.mkdtemp(), 'drive_index.json'))
+    assert index.refresh(drive)
+    assert drive.listings == 1
+    return drive, index
+
+
+def test_changes_add_moved_in_files_and_prune_the_rest():
+    drive, index = setup()
+    # Copiado/movido a ENTRADAS con un modifiedTime viejo: un filtro por fecha no lo vería
+    drive.put('id9', 'captura_9.jpg', modified='2020-01-01T00:00:00Z')
+    drive.put('id1', 'captura_1.jpg', parent=OTRA)  # movido fuera
+    drive.trash('id2')
+    drive.delete('id3')
+    drive.put('id0', 'captura_0_bis.jpg')  # renombrado
+    drive.put('idx', 'otra.jpg', parent=OTRA)  # cambio ajeno a ENTRADAS
+
+    assert index.refresh(drive, ['captura_9.jpg'])
+    assert drive.listings == 1
+    assert sorted(index.files) == ['captura_0_bis.jpg', 'captura_9.jpg']
+    assert index.lookup('captura_9.jpg')['id'] == 'id9'
+
+    # El token y el índice se persisten: la siguiente ejecución solo ve cambios nuevos
+    reopened = DriveFileIndex(index.path)
+    drive.put('id5', 'captura_5.jpg')
+    assert reopened.refresh(drive)
+    assert sorted(reopened.files) == ['captura_0_bis.jpg', 'captura_5.jpg', 'captura_9.jpg']
+    assert drive.listings == 1
+
+
+def test_missing_pending_file_forces_full_relist():
+    drive, index = setup()
+    # Un archivo que el índice no conoce sin que llegue su cambio
+    drive.files['id7'] = dict(drive.files['id0'], id='id7', name='captura_7.jpg')
+
+    assert index.refresh(drive, ['captura_0.jpg'])
+    assert drive.listings == 1
+    assert index.refresh(drive, ['captura_7.jpg'])
+    assert drive.listings == 2
+    assert index.lookup('captura_7.jpg')['id'] == 'id7'
+
+
+def test_rejected_change_token_forces_full_relist():
+    drive, index = setup()
+    drive.expired = True
+    del drive.files['id3']
+    assert index.refresh(drive)
+    assert drive.listings == 2
+    assert sorted(index.files) == ['captura_0.jpg', 'captura_1.jpg', 'captura_2.jpg']
@@ -0,0 +1,97 @@
+"""
+Pruebas de los backends de Tesseract: interfaz común y tesserocr frente a pytesseract.
+
+Las pruebas de tesserocr se saltan si no está instalado (o si falta el
+binario tesseract para comparar).
+
+Uso:
+    python -m pytest -q test_ocr_backends.py
+"""
+import multiprocessing
+import os
+import shutil
+import sys
+
+import pytest
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from config import TESSERACT_CONFIG
+from src.ocr_backends import OCRBackend, PytesseractBackend, get_backend
+from src.ocr_engine import OCREngine, ZONAL_TESSERACT_CONFIG
+
+IMAGE = 'test_ine.jpg'
+
+
+def test_backends_must_implement_the_interface():
+    with pytest.raises(TypeError):
+        OCRBackend()
+
+    class TextOnly(OCRBackend):
+        def image_to_string(self, image, config):
+            return ''
+
+    with pytest.raises(TypeError):
+        TextOnly()
+    assert isinstance(PytesseractBackend(), OCRBackend)
+
+
+@pytest.fixture(scope='module')
+def tesserocr_backend():
+    pytest.importorskip('tesserocr')
+    backend = get_backend('tesserocr')
+    assert backend.name == 'tesserocr'
+    return backend
+
+
+@pytest.fixture(scope='module')
+def images():
+    engine = OCREngine(backend=PytesseractBackend())
+    processed = engine.preprocess_image(IMAGE)
+    assert processed is not None
+    return engine.crop_zone(processed, 'CURP'), processed
+
+
+def words(text):
+    return text.split()
+
+
+@pytest.mark.skipif(shutil.which('tesseract') is None, reason="Sin binario tesseract para pytesseract")
+def test_tesserocr_matches_pytesseract(tesserocr_backend, images):
+    crop, page = images
+    pytesseract_backend = PytesseractBackend()
+    for image, config in ((crop, ZONAL_TESSERACT_CONFIG), (page, TESSERACT_CONFIG)):
+        assert words(tesserocr_backend.image_to_string(image, config)) == \
+            words(pytesseract_backend.image_to_string(image, config))
+
+    data = tesserocr_backend.image_to_data(crop, ZONAL_TESSERACT_CONFIG)
+    expected = pytesseract_backend.image_to_data(crop, ZONAL_TESSERACT_CONFIG)
+    assert [w for w in data['text'] if w.strip()] == [w for w in expected['text'] if w.strip()]
+
+
+def _ocr_after_fork(crop):
+    """En el proceso hijo: el handle heredado del padre no se reutiliza"""
+    backend = get_backend('tesserocr')
+    # Se conservan las referencias para que un handle nuevo no ocupe la misma dirección
+    inherited = list(backend._local.apis.values())
+    text = backend.image_to_string(crop, ZONAL_TESSERACT_CONFIG)
+    fresh = list(backend._local.apis.values())
+    reused = any(api is old for api in fresh for old in inherited)
+    return len(inherited), len(fresh), reused, backend._local.pid == os.getpid(), text
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="Requiere fork")
+def test_tesserocr_handles_are_reset_after_fork(tesserocr_backend, images):
+    crop, _ = images
+    # Handle caliente en el padre antes del fork (como el pool de workers OCR)
+    text = tesserocr_backend.image_to_string(crop, ZONAL_TESSERACT_CONFIG)
+    assert tesserocr_backend._local.apis
+
+    with multiprocessing.get_context('fork').Pool(1) as pool:
+        inherited, fresh, reused, pid_matches, child_text = pool.apply(_ocr_after_fork, (crop,))
+
+    assert inherited == len(tesserocr_backend._local.apis)
+    assert fresh == 1 and not reused
+    assert pid_matches
+    assert words(child_text) == words(text)
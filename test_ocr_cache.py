@@ -0,0 +1,73 @@
+"""
+Pruebas de OCRResultCache: desalojo LRU por tamaño e invalidación por huella del motor.
+
+Uso:
+    python -m pytest -q test_ocr_cache.py
+"""
+import itertools
+import logging
+import os
+import sys
+import tempfile
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+import src.ocr_cache as ocr_cache
+from src.ine_processor import Field
+from src.ocr_cache import OCRResultCache, engine_fingerprint, results_to_json
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+def ocr_results(curp):
+    return {
+        'fields': {'curp': Field(curp, 95.0), 'sexo': Field('H', 95.0)},
+        'overall_confidence': 95.0,
+        'strategy': 'ROI_First',
+    }
+
+
+def cache_path():
+    return os.path.join(tempfile.mkdtemp(), 'ocr_results.sqlite3')
+
+
+def test_least_recently_used_entries_are_evicted(monkeypatch):
+    # Reloj que avanza en cada uso: el orden LRU no depende de la resolución de time.time()
+    clock = itertools.count(1)
+    monkeypatch.setattr(ocr_cache.time, 'time', lambda: float(next(clock)))
+
+    size = len(results_to_json(ocr_results('GOMC850312HDFRRL05')))
+    cache = OCRResultCache(cache_path(), max_bytes=3 * size, fingerprint='v1')
+    keys = [cache.key_for(f'imagen {i}'.encode()) for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, ocr_results('GOMC850312HDFRRL05'), 2.0)
+
+    # La primera se vuelve a leer: la menos usada pasa a ser la segunda
+    assert cache.get(keys[0])[1] == 2.0
+    cache.put(keys[3], ocr_results('GOMC850312HDFRRL05'), 2.0)
+    assert [cache.get(key)[0] is not None for key in keys] == [True, False, True, True]
+
+    result, seconds = cache.get(keys[3])
+    assert result['fields']['curp'] == Field('GOMC850312HDFRRL05', 95.0)
+    assert seconds == 2.0
+
+
+def test_engine_change_invalidates_entries(monkeypatch):
+    path = cache_path()
+    cache = OCRResultCache(path, max_bytes=1024 * 1024)
+    key = cache.key_for(b'imagen')
+    cache.put(key, ocr_results('GOMC850312HDFRRL05'), 1.5)
+    assert cache.get(key)[0] is not None
+
+    # La corrección de CURP también cambia el resultado
+    monkeypatch.setattr(ocr_cache, 'CURP_CORRECTION_MAX_WINDOWS', ocr_cache.CURP_CORRECTION_MAX_WINDOWS + 1)
+    assert engine_fingerprint() != cache.fingerprint
+    monkeypatch.undo()
+    assert engine_fingerprint() == cache.fingerprint
+
+    monkeypatch.setattr(ocr_cache, 'OCR_CACHE_VERSION', ocr_cache.OCR_CACHE_VERSION + 1)
+
+    reopened = OCRResultCache(path, max_bytes=1024 * 1024)
+    assert reopened.key_for(b'imagen') != key
+    assert reopened.get(reopened.key_for(b'imagen')) == (None, 0.0)
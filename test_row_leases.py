@@ -0,0 +1,142 @@
+"""
+Pruebas de RowLeaseManager (tomar, perder y liberar filas) contra una hoja en memoria.
+
+Uso:
+    python -m pytest -q test_row_leases.py
+"""
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from fake_worksheet import FakeWorksheet
+from config import REGISTRO_HEADERS
+from src.row_leases import RowLeaseManager, format_lease, parse_lease
+from src.row_pipeline import RowPipeline
+from src.row_scanner import PendingRowScanner
+from src.row_worker import error_outcome
+from src.run_journal import RunJournal
+from src.sheet_writer import SheetWriteBuffer
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+class RacingWorksheet(FakeWorksheet):
+    """Otra instancia escribe su lease en una fila justo después que nosotros"""
+
+    def __init__(self, rows, stolen_row, other_lease):
+        super().__init__(rows)
+        self.stolen_row = stolen_row
+        self.other_lease = other_lease
+
+    def batch_update(self, data, value_input_option=None):
+        super().batch_update(data, value_input_option)
+        if self.write_calls == 1:
+            super().batch_update([{'range': f'O{self.stolen_row}', 'values': [[self.other_lease]]}])
+
+
+def make_rows(count):
+    return [
+        {'FECHA_HORA': '2025-01-01', 'NOMBRE_ARCHIVO': f'captura_{i}.jpg', 'STATUS': 'PENDIENTE_OCR'}
+        for i in range(count)
+    ]
+
+
+def scan(sheet):
+    state_path = os.path.join(tempfile.mkdtemp(), 'scan_state.json')
+    return PendingRowScanner(sheet, REGISTRO_HEADERS, state_path).scan()
+
+
+def test_claim_skips_rows_won_by_another_worker():
+    other = format_lease('worker-b', datetime.now(timezone.utc) + timedelta(minutes=15))
+    sheet = RacingWorksheet(make_rows(3), stolen_row=3, other_lease=other)
+    leases = RowLeaseManager(sheet, REGISTRO_HEADERS, 'worker-a', 900, 0)
+
+    claimed = leases.claim(leases.claimable(scan(sheet)))
+    assert [row_num for row_num, _ in claimed] == [2, 4]
+    for row_num in (2, 4):
+        assert sheet.cell(row_num, 'STATUS') == 'EN_PROCESO'
+        assert parse_lease(sheet.cell(row_num, 'OCR_LEASE'))[0] == 'worker-a'
+
+    # Para worker-a la fila 3 tiene un lease vigente ajeno; la fila 2 es suya
+    rows = leases.claimable(scan(sheet))
+    assert [row_num for row_num, _ in rows] == [2, 4]
+    other_worker = RowLeaseManager(sheet, REGISTRO_HEADERS, 'worker-b', 900, 0)
+    assert [row_num for row_num, _ in other_worker.claimable(scan(sheet))] == [3]
+
+
+def test_expired_lease_can_be_reclaimed():
+    expired = format_lease('worker-b', datetime.now(timezone.utc) - timedelta(minutes=1))
+    sheet = FakeWorksheet([dict(make_rows(1)[0], STATUS='EN_PROCESO', OCR_LEASE=expired)])
+    leases = RowLeaseManager(sheet, REGISTRO_HEADERS, 'worker-a', 900, 0)
+    assert [row_num for row_num, _ in leases.claimable(scan(sheet))] == [2]
+
+
+def test_release_returns_rows_to_pending():
+    sheet = FakeWorksheet(make_rows(2))
+    leases = RowLeaseManager(sheet, REGISTRO_HEADERS, 'worker-a', 900, 0)
+    claimed = leases.claim(scan(sheet))
+    assert len(claimed) == 2
+
+    spool_path = os.path.join(tempfile.mkdtemp(), 'pending_writes.jsonl')
+    writer = SheetWriteBuffer(sheet, spool_path, max_ranges=100, max_age_seconds=60)
+    leases.release(writer, claimed)
+    assert writer.flush()
+    for row_num, _ in claimed:
+        assert sheet.cell(row_num, 'STATUS') == 'PENDIENTE_OCR'
+        assert sheet.cell(row_num, 'OCR_LEASE') == ''
+    assert not os.path.exists(spool_path)
+
+
+def test_release_restores_original_status_and_skips_lost_rows():
+    expired = format_lease('worker-c', datetime.now(timezone.utc) - timedelta(minutes=1))
+    rows = make_rows(4)
+    rows[0]['STATUS'] = 'REVISION'  # --retry-rows
+    rows[1]['STATUS'] = 'ERROR'
+    rows[2].update(STATUS='EN_PROCESO', OCR_LEASE=expired)
+    sheet = FakeWorksheet(rows)
+    scanner = PendingRowScanner(sheet, REGISTRO_HEADERS, os.path.join(tempfile.mkdtemp(), 'scan.json'))
+    scanner.flag_for_retry([2, 3])
+    leases = RowLeaseManager(sheet, REGISTRO_HEADERS, 'worker-a', 900, 0)
+    claimed = leases.claim(leases.claimable(scanner.scan()))
+    assert sorted(row_num for row_num, _ in claimed) == [2, 3, 4, 5]
+
+    # worker-b toma la fila 5 después de nuestra verificación
+    other = format_lease('worker-b', datetime.now(timezone.utc) + timedelta(minutes=15))
+    sheet.batch_update([{'range': 'O5', 'values': [[other]]}])
+
+    writer = SheetWriteBuffer(sheet, os.path.join(tempfile.mkdtemp(), 'pending_writes.jsonl'),
+                              max_ranges=100, max_age_seconds=60)
+    leases.release(writer, claimed)
+    assert writer.flush()
+    assert [sheet.cell(row_num, 'STATUS') for row_num in range(2, 6)] == \
+        ['REVISION', 'ERROR', 'PENDIENTE_OCR', 'EN_PROCESO']
+    assert [sheet.cell(row_num, 'OCR_LEASE') for row_num in range(2, 6)] == ['', '', '', other]
+
+
+def test_pipeline_does_not_write_rows_lost_after_claim():
+    sheet = FakeWorksheet(make_rows(3))
+    leases = RowLeaseManager(sheet, REGISTRO_HEADERS, 'worker-a', 900, 0)
+    claimed = leases.claim(scan(sheet))
+
+    # La escritura tardía de worker-b llega después del asentamiento
+    other = format_lease('worker-b', datetime.now(timezone.utc) + timedelta(minutes=15))
+    sheet.batch_update([{'range': 'O3', 'values': [[other]]}])
+    assert leases.owned([2, 3, 4]) == {2, 4}
+
+    class Downloader:
+        def download(self, row_num, row_data):
+            return None, error_outcome(row_num, 'File not found in Drive')
+
+    written = []
+    journal = RunJournal(os.path.join(tempfile.mkdtemp(), 'run_journal.sqlite3'))
+    pipeline = RowPipeline(Downloader, lambda outcome, filename: written.append(outcome['row_num']),
+                           prefetch=1, queue_size=2, journal=journal, owned=leases.owned)
+    pipeline.run(claimed, lambda items, hints: [], batch_size=3)
+    assert written == [2, 4]
+    assert sorted(journal.written_rows()) == [2, 4]
+    assert journal.unwritten_outcomes() == []
@@ -0,0 +1,125 @@
+"""
+Pruebas de RowPipeline (descarga → OCR → escritura) con bitácora y hoja en memoria.
+
+Uso:
+    python -m pytest -q test_row_pipeline.py
+"""
+import logging
+import os
+import sys
+import tempfile
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from fake_worksheet import FakeWorksheet
+from config import REGISTRO_HEADERS
+from src.ine_processor import Field
+from src.row_pipeline import RowPipeline
+from src.row_scanner import PendingRowScanner
+from src.row_worker import error_outcome, result_outcome
+from src.run_journal import RunJournal
+from src.sheet_writer import SheetWriteBuffer
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+CURP = 'GOMC850312HDFRRL09'
+
+
+class FakeDownloader:
+    """Devuelve el nombre del archivo como 'imagen'; missing.jpg no existe en Drive"""
+
+    def download(self, row_num, row_data):
+        if row_data['NOMBRE_ARCHIVO'] == 'missing.jpg':
+            return None, error_outcome(row_num, 'File not found in Drive')
+        return row_data['NOMBRE_ARCHIVO'].encode('utf-8'), None
+
+
+class FakeOCR:
+    """Etapa de OCR: la CURP sugerida si la hay, si no una fija"""
+
+    def __init__(self):
+        self.hints = {}
+
+    def __call__(self, items, hints):
+        self.hints.update(hints)
+        return [
+            result_outcome(row_num, {
+                'fields': {'curp': Field(hints.get(row_num, CURP), 95.0)},
+                'overall_confidence': 95.0,
+                'strategy': 'Hint_Verified' if row_num in hints else 'ROI_First',
+            })
+            for row_num, _ in items
+        ]
+
+
+def setup(rows):
+    directory = tempfile.mkdtemp()
+    sheet = FakeWorksheet(rows)
+    scanner = PendingRowScanner(sheet, REGISTRO_HEADERS, os.path.join(directory, 'scan_state.json'))
+    writer = SheetWriteBuffer(sheet, os.path.join(directory, 'pending_writes.jsonl'),
+                              max_ranges=100, max_age_seconds=60, filename_col='B')
+    journal = RunJournal(os.path.join(directory, 'run_journal.sqlite3'))
+    return sheet, scanner, writer, journal
+
+
+def write_to(writer):
+    def write_outcome(outcome, filename):
+        row_num = outcome['row_num']
+        if outcome['error']:
+            writer.add(f'H{row_num}', [['ERROR']], filename)
+        else:
+            curp = outcome['results']['fields']['curp'].value
+            writer.add(f'C{row_num}:H{row_num}', [[curp, '', '', '', '', 'COMPLETADO']], filename)
+    return write_outcome
+
+
+def pending(name, **values):
+    return {'FECHA_HORA': '2025-01-01', 'NOMBRE_ARCHIVO': name, 'STATUS': 'PENDIENTE_OCR', **values}
+
+
+def test_rows_flow_through_all_stages():
+    sheet, scanner, writer, journal = setup([
+        pending('captura_0.jpg'),
+        pending('missing.jpg'),
+        # CURP_DETECTADA es salida del pipeline: nunca se usa como sugerencia
+        pending('captura_2.jpg', CURP_DETECTADA='XXXX000000HDFXXX00'),
+        pending('captura_3.jpg', CURP_CAPTURA='rass850204hdgmtl06'),
+    ])
+    ocr = FakeOCR()
+    pipeline = RowPipeline(FakeDownloader, write_to(writer), prefetch=2, queue_size=2, journal=journal)
+    pipeline.run(scanner.scan(), ocr, batch_size=2)
+    assert writer.flush()
+
+    assert pipeline.fed == 4
+    assert ocr.hints == {5: 'RASS850204HDGMTL06'}
+    assert [sheet.cell(row_num, 'STATUS') for row_num in range(2, 6)] == \
+        ['COMPLETADO', 'ERROR', 'COMPLETADO', 'COMPLETADO']
+    assert sheet.cell(4, 'CURP_DETECTADA') == CURP
+    assert sheet.cell(5, 'CURP_DETECTADA') == 'RASS850204HDGMTL06'
+    assert journal.written_rows() == {2: 'captura_0.jpg', 3: 'missing.jpg',
+                                      4: 'captura_2.jpg', 5: 'captura_3.jpg'}
+    assert scanner.scan() == []
+
+
+def test_interrupted_write_leaves_results_for_next_run():
+    sheet, scanner, writer, journal = setup([pending(f'captura_{i}.jpg') for i in range(4)])
+    write_outcome = write_to(writer)
+
+    def crash_on_row_4(outcome, filename):
+        if outcome['row_num'] == 4:
+            raise RuntimeError('job killed')
+        write_outcome(outcome, filename)
+
+    pipeline = RowPipeline(FakeDownloader, crash_on_row_4, prefetch=1, queue_size=1, journal=journal)
+    try:
+        pipeline.run(scanner.scan(), FakeOCR(), batch_size=1)
+        raise AssertionError('the write error was not raised')
+    except RuntimeError:
+        pass
+
+    # Lo escrito no se repite; el OCR de la fila 4 se reutiliza sin volver a correrlo
+    assert journal.written_rows() == {2: 'captura_0.jpg', 3: 'captura_1.jpg'}
+    outcomes = dict((outcome['row_num'], filename) for filename, outcome in journal.unwritten_outcomes())
+    assert outcomes.get(4) == 'captura_2.jpg'
+
@@ -0,0 +1,62 @@
+"""
+Pruebas de PendingRowScanner (marca de agua) contra una hoja en memoria.
+
+Uso:
+    python -m pytest -q test_row_scanner.py
+"""
+import logging
+import os
+import sys
+import tempfile
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from fake_worksheet import FakeWorksheet
+from config import REGISTRO_HEADERS
+from src.row_scanner import PendingRowScanner
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+def make_sheet(statuses):
+    return FakeWorksheet([
+        {'FECHA_HORA': '2025-01-01', 'NOMBRE_ARCHIVO': f'captura_{i}.jpg', 'STATUS': status}
+        for i, status in enumerate(statuses)
+    ])
+
+
+def pending_files(rows):
+    return [row_data['NOMBRE_ARCHIVO'] for _, row_data in rows]
+
+
+def test_watermark_advances_past_finished_prefix():
+    sheet = make_sheet(['COMPLETADO', 'COMPLETADO', 'PENDIENTE_OCR', 'COMPLETADO'])
+    state_path = os.path.join(tempfile.mkdtemp(), 'scan_state.json')
+    scanner = PendingRowScanner(sheet, REGISTRO_HEADERS, state_path)
+
+    assert pending_files(scanner.scan()) == ['captura_2.jpg']
+    assert (scanner.watermark, scanner.watermark_file) == (3, 'captura_1.jpg')
+
+    # La siguiente ejecución parte de la marca guardada
+    sheet.batch_update([{'range': 'H4', 'values': [['COMPLETADO']]}])
+    scanner = PendingRowScanner(sheet, REGISTRO_HEADERS, state_path)
+    assert scanner.watermark == 3
+    assert scanner.scan() == []
+    assert (scanner.watermark, scanner.watermark_file) == (5, 'captura_3.jpg')
+
+
+def test_rows_shifted_above_watermark_trigger_full_scan():
+    sheet = make_sheet(['COMPLETADO'] * 6)
+    state_path = os.path.join(tempfile.mkdtemp(), 'scan_state.json')
+    PendingRowScanner(sheet, REGISTRO_HEADERS, state_path).scan()
+
+    # clean_sheet.py borra dos filas y una fila pendiente queda antes de la marca
+    sheet.delete_row(2)
+    sheet.delete_row(2)
+    sheet.batch_update([{'range': 'H3', 'values': [['PENDIENTE_OCR']]}])
+
+    scanner = PendingRowScanner(sheet, REGISTRO_HEADERS, state_path)
+    assert pending_files(scanner.scan()) == ['captura_3.jpg']
+    assert scanner.watermark_file == sheet.cell(scanner.watermark, 'NOMBRE_ARCHIVO')
+
@@ -0,0 +1,86 @@
+"""
+Pruebas de RunJournal: reanudar tras una ejecución interrumpida.
+
+Uso:
+    python -m pytest -q test_run_journal.py
+"""
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+from src.ine_processor import Field
+from src.row_worker import error_outcome, result_outcome
+from src.run_journal import RunJournal
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+def journal_path():
+    return os.path.join(tempfile.mkdtemp(), 'run_journal.sqlite3')
+
+
+def ocr_results(curp):
+    return {
+        'fields': {'curp': Field(curp, 95.0), 'nombre': Field('', 0.0), 'sexo': Field('H', 95.0)},
+        'overall_confidence': 95.0,
+        'strategy': 'ROI_First',
+    }
+
+
+def test_interrupted_run_is_resumed():
+    path = journal_path()
+    journal = RunJournal(path)
+    journal.record(2, 'claimed', filename='captura_0.jpg')
+    journal.record(2, 'ocr_done', result_outcome(2, ocr_results('GOMC850312HDFRRL09')),
+                   filename='captura_0.jpg')
+    journal.record(2, 'written', filename='captura_0.jpg')
+    journal.record(3, 'claimed', filename='captura_1.jpg')
+    journal.record(3, 'ocr_done', result_outcome(3, ocr_results('RASS850204HDGMTL06'), ocr_seconds=2.5),
+                   filename='captura_1.jpg')
+    journal.record(4, 'claimed', filename='captura_2.jpg')
+    journal.record(4, 'downloaded', filename='captura_2.jpg')
+    # El job muere aquí: la siguiente ejecución abre la misma bitácora
+
+    journal = RunJournal(path)
+    assert journal.written_rows() == {2: 'captura_0.jpg'}
+    outcomes = journal.unwritten_outcomes()
+    assert [(filename, outcome['row_num']) for filename, outcome in outcomes] == [('captura_1.jpg', 3)]
+    filename, outcome = outcomes[0]
+    assert outcome['results']['fields']['curp'].value == 'RASS850204HDGMTL06'
+    assert outcome['ocr_seconds'] == 2.5
+
+    # Reescrito y confirmado por un flush: se compacta; la fila 4 se vuelve a procesar
+    journal.record(3, 'written', filename=filename)
+    journal.compact()
+    assert journal.written_rows() == {}
+    assert journal.unwritten_outcomes() == []
+
+
+def test_discard_drops_entries_of_moved_rows():
+    journal = RunJournal(journal_path())
+    journal.record(5, 'ocr_done', error_outcome(5, 'Download failed'), filename='captura_3.jpg')
+    journal.record(6, 'written', filename='captura_4.jpg')
+    journal.discard([5, 6])
+    assert journal.unwritten_outcomes() == []
+    assert journal.written_rows() == {}
+
+
+def test_journal_from_previous_version_is_not_trusted():
+    path = journal_path()
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE row_events (id INTEGER PRIMARY KEY AUTOINCREMENT, row_num INTEGER NOT NULL,'
+                 ' stage TEXT NOT NULL, payload TEXT, created REAL NOT NULL)')
+    conn.execute("INSERT INTO row_events (row_num, stage, created) VALUES (7, 'written', 0)")
+    conn.commit()
+    conn.close()
+
+    journal = RunJournal(path)
+    assert journal.written_rows() == {7: None}
+    journal.record(8, 'written', filename='captura_5.jpg')
+    assert journal.written_rows() == {7: None, 8: 'captura_5.jpg'}
+
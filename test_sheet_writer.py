@@ -0,0 +1,102 @@
+"""
+Pruebas de SheetWriteBuffer: reenvío del spool y rangos rechazados por el API.
+
+Uso:
+    python -m pytest -q test_sheet_writer.py
+"""
+import json
+import logging
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+# Add current directory to path
+sys.path.append(os.getcwd())
+
+import src.sheet_writer as sheet_writer
+from fake_worksheet import FakeWorksheet
+from src.api_scheduler import APIScheduler
+from src.sheet_writer import SheetWriteBuffer
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+class APIError(Exception):
+    """Error con código HTTP como gspread.exceptions.APIError"""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.response = SimpleNamespace(status_code=status_code)
+
+
+class StrictWorksheet(FakeWorksheet):
+    """Rechaza el lote completo (400) si trae algún rango fuera de la hoja"""
+
+    def batch_update(self, data, value_input_option=None):
+        bad = [entry['range'] for entry in data if entry['range'].startswith('ZZ')]
+        if bad:
+            self.write_calls += 1
+            raise APIError(400, f"Range exceeds grid limits: {bad[0]}")
+        super().batch_update(data, value_input_option)
+
+
+@pytest.fixture(autouse=True)
+def fast_scheduler(monkeypatch):
+    scheduler = APIScheduler({'sheets_read': 6000, 'sheets_write': 6000}, max_retries=0, backoff_base=0,
+                             backoff_max=0, failure_threshold=5, cooldown=1, max_pause=1)
+    monkeypatch.setattr(sheet_writer, 'get_scheduler', lambda: scheduler)
+
+
+def make_rows(count):
+    return [
+        {'FECHA_HORA': '2025-01-01', 'NOMBRE_ARCHIVO': f'captura_{i}.jpg', 'STATUS': 'EN_PROCESO'}
+        for i in range(count)
+    ]
+
+
+def spool_path():
+    return os.path.join(tempfile.mkdtemp(), 'pending_writes.jsonl')
+
+
+def test_spool_is_replayed_on_next_run():
+    sheet = FakeWorksheet(make_rows(3))
+    path = spool_path()
+    writer = SheetWriteBuffer(sheet, path, max_ranges=100, max_age_seconds=60, filename_col='B')
+    for row_num in range(2, 5):
+        writer.add(f'H{row_num}', [['COMPLETADO']], f'captura_{row_num - 2}.jpg')
+    # El proceso muere antes del flush y clean_sheet.py borra la fila 3
+    sheet.delete_row(3)
+    assert sheet.write_calls == 0
+
+    writer = SheetWriteBuffer(sheet, path, max_ranges=100, max_age_seconds=60, filename_col='B')
+    assert len(writer.pending) == 3
+    writer.add('H2', [['REVISION']], 'captura_0.jpg')
+    assert writer.flush()
+
+    # La fila 2 conserva su archivo; H3/H4 ya no son de captura_1/captura_2 y se descartan
+    assert [sheet.cell(row_num, 'STATUS') for row_num in (2, 3)] == ['REVISION', 'EN_PROCESO']
+    assert sheet.write_calls == 1
+    assert not os.path.exists(path)
+
+
+def test_rejected_ranges_are_isolated():
+    sheet = StrictWorksheet(make_rows(6))
+    path = spool_path()
+    writer = SheetWriteBuffer(sheet, path, max_ranges=100, max_age_seconds=60)
+    for row_num in range(2, 8):
+        a1_range = 'ZZ5' if row_num == 5 else f'H{row_num}'
+        writer.add(a1_range, [['COMPLETADO']], f'captura_{row_num - 2}.jpg')
+    assert writer.flush()
+
+    assert [sheet.cell(row_num, 'STATUS') for row_num in range(2, 8)] == \
+        ['COMPLETADO', 'COMPLETADO', 'COMPLETADO', 'EN_PROCESO', 'COMPLETADO', 'COMPLETADO']
+    assert writer.rejected == 1
+    assert writer.rejected_path == path.replace('.jsonl', '_rejected.jsonl')
+    with open(writer.rejected_path, encoding='utf-8') as f:
+        rejected = [json.loads(line) for line in f]
+    assert [(entry['range'], entry['file']) for entry in rejected] == [('ZZ5', 'captura_3.jpg')]
+    assert 'grid limits' in rejected[0]['error']
+    assert not os.path.exists(path)